@@ -0,0 +1,5 @@
+"""
+Benchmarks for lazydag, run them from the repository root.
+`python -m benchmarks` runs the whole suite and writes the results to JSON, each
+module can also be run on its own, e.g. `python -m benchmarks.scheduler`.
+"""
@@ -0,0 +1,83 @@
+"""
+Runs the benchmark suite and writes the results to JSON, optionally comparing
+them with a previous run.
+
+    python -m benchmarks --output results.json [--compare old.json] [--quick]
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+from pathlib import Path
+import platform
+import sys
+
+from benchmarks import bulk_ops, change_feed, cli_startup, fusion, objects, scheduler, simulator
+
+# Fields identifying a result, the remaining numeric fields are measurements
+KEY_FIELDS = ("benchmark", "shape", "size", "workload", "parallelization", "fusion", "object", "chain_length", "num_processes")
+# Parameters of a run that aren't worth comparing
+IGNORED_FIELDS = ("processes", "tasks", "steps", "runs", "initial_size", "budget_ms")
+
+
+def run_suite(quick: bool) -> list:
+    if quick:
+        results = scheduler.run(sizes=[10, 100], steps=3)
+        results += objects.run(sizes=[1000])
+        results += fusion.run(depths=[10, 100], steps=5)
+        results += simulator.run(sizes=[1000])
+        results += bulk_ops.run(sizes=[1000])
+        results.append(change_feed.run(length=5, initial_size=1000, steps=5))
+        results.append(cli_startup.run(runs=3, num_processes=100))
+    else:
+        results = scheduler.run()
+        results += objects.run()
+        results += fusion.run()
+        results += simulator.run()
+        results += bulk_ops.run()
+        results.append(change_feed.run())
+        results.append(cli_startup.run())
+    return results
+
+
+def _key(result: dict) -> tuple:
+    return tuple((field, result[field]) for field in KEY_FIELDS if field in result)
+
+
+def compare(old: dict, new: dict):
+    old_results = {_key(result): result for result in old["results"]}
+    for result in new["results"]:
+        previous = old_results.get(_key(result))
+        if previous is None:
+            continue
+        label = " ".join(f"{value}" for _, value in _key(result))
+        for field, value in result.items():
+            if field in KEY_FIELDS or field in IGNORED_FIELDS or not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if isinstance(previous.get(field), (int, float)) and previous[field] != 0:
+                print(f"{label:<50} {field:<20} {previous[field]:>12.4g} -> {value:>12.4g} ({value / previous[field]:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=Path("benchmark-results.json"))
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--quick", action="store_true", help="small sizes, for smoke testing")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version,
+            "platform": platform.platform(),
+        },
+        "results": run_suite(args.quick),
+    }
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text()), report)
+
+
+if __name__ == "__main__":
+    main()
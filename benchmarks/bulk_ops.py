@@ -0,0 +1,119 @@
+"""
+Compares per-key calls with the bulk get_many/set_many/remove_many operations of
+the contrib objects, for one step touching `size` keys. Reads are also timed on
+their own, since creating files dominates the step of FSJsonDictObject.
+"""
+import argparse
+import json
+from pathlib import Path
+import tempfile
+import time
+from typing import Callable, List, Tuple
+
+from lazydag.contrib.objects import FSDictObject, FSJsonDictObject, FSListObject
+
+
+# Each run returns the time spent reading
+
+def _per_key(obj, keys: list, values: list) -> float:
+    for key, value in zip(keys, values):
+        obj.set(key, value)
+    obj.save()
+    start = time.perf_counter()
+    for key in keys:
+        obj.get(key)
+    read_s = time.perf_counter() - start
+    for key in keys[::2]:
+        obj.remove(key)
+    obj.save()
+    return read_s
+
+
+def _bulk(obj, keys: list, values: list) -> float:
+    obj.set_many(keys, values)
+    obj.save()
+    start = time.perf_counter()
+    obj.get_many(keys)
+    read_s = time.perf_counter() - start
+    obj.remove_many(keys[::2])
+    obj.save()
+    return read_s
+
+
+def _list_per_key(obj: FSListObject, idxs: list, values: list) -> float:
+    for idx, value in zip(idxs, values):
+        obj.set(idx, value)
+    obj.save()
+    start = time.perf_counter()
+    for idx in idxs:
+        obj.get(idx)
+    return time.perf_counter() - start
+
+
+def _list_bulk(obj: FSListObject, idxs: list, values: list) -> float:
+    obj.set_many(idxs, values)
+    obj.save()
+    start = time.perf_counter()
+    obj.get_many(idxs)
+    return time.perf_counter() - start
+
+
+def _measure_one(cls, run: Callable, size: int, keys: list) -> Tuple[float, float]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        obj = cls("bench", save_path=Path(tmp_dir) / "bench")
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+        if cls is FSListObject:
+            obj.extend([0] * size)
+            obj.save()
+        start = time.perf_counter()
+        read_s = run(obj, keys, list(range(1, size + 1)))
+        return time.perf_counter() - start, read_s
+
+
+def measure(obj_name: str, size: int, repeats: int = 3) -> dict:
+    if obj_name == "FSListObject":
+        cls, per_key, bulk, keys = FSListObject, _list_per_key, _list_bulk, list(range(size))
+    else:
+        cls = FSDictObject if obj_name == "FSDictObject" else FSJsonDictObject
+        per_key, bulk, keys = _per_key, _bulk, [f"key_{i}" for i in range(size)]
+    # File creation times are noisy, the best of a few runs is more stable, and
+    # alternating the variants spreads the background writeback evenly
+    per_key_runs, bulk_runs = [], []
+    for _ in range(repeats):
+        per_key_runs.append(_measure_one(cls, per_key, size, keys))
+        bulk_runs.append(_measure_one(cls, bulk, size, keys))
+    per_key_s, per_key_read_s = min(total for total, _ in per_key_runs), min(read for _, read in per_key_runs)
+    bulk_s, bulk_read_s = min(total for total, _ in bulk_runs), min(read for _, read in bulk_runs)
+    return {
+        "benchmark": "bulk_ops",
+        "object": obj_name,
+        "size": size,
+        "per_key_ms": per_key_s * 1000,
+        "bulk_ms": bulk_s * 1000,
+        "speedup": per_key_s / bulk_s,
+        "per_key_read_ms": per_key_read_s * 1000,
+        "bulk_read_ms": bulk_read_s * 1000,
+        "read_speedup": per_key_read_s / bulk_read_s,
+    }
+
+
+def run(sizes: List[int] = (1000, 100000)) -> List[dict]:
+    return [
+        measure(obj_name, size)
+        for obj_name in ("FSListObject", "FSDictObject", "FSJsonDictObject")
+        for size in sizes
+        # One file per key, keep it reasonable
+        if obj_name != "FSJsonDictObject" or size <= 10000
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Measures the cold start of `lazydag topology validate` on a generated project and
+fails if its median exceeds a fixed budget, to catch import-time regressions.
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SETTINGS = """\
+from pathlib import Path
+
+PROJECT_NAME = "startup_bench"
+DATA_ROOT = Path("./data")
+PY_MODULE = "defs"
+
+FS_OBJECTS = {
+    "save_dir": DATA_ROOT / "objects",
+}
+"""
+
+
+def write_project(project_dir: Path, num_processes: int):
+    (project_dir / "settings.py").write_text(SETTINGS)
+    (project_dir / "defs.py").write_text("objects = []\nprocesses = []\n")
+    configs_dir = project_dir / "data" / "configs"
+    configs_dir.mkdir(parents=True)
+    lines = ["objects:"] + [f"- obj_{i}" for i in range(num_processes + 1)] + ["processes:"]
+    for i in range(num_processes):
+        lines += [
+            f"  proc_{i}:",
+            f"    inputs: {{input: obj_{i}}}",
+            f"    outputs: {{output: obj_{i + 1}}}",
+        ]
+    lines += [
+        "  source:",
+        "    outputs: {output: obj_0}",
+        "  sink:",
+        f"    inputs: {{input: obj_{num_processes}}}",
+    ]
+    (configs_dir / "pipeline.yaml").write_text("\n".join(lines) + "\n")
+
+
+def run(runs: int = 10, num_processes: int = 1000, budget_ms: float = 300) -> dict:
+    command = [sys.executable, "-m", "lazydag.cli.main", "topology", "validate"]
+    repo_root = str(Path(__file__).resolve().parent.parent)
+    # The repo first, without dropping the paths the environment already relies on
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [repo_root, os.environ.get("PYTHONPATH")]))}
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        project_dir = Path(tmp_dir)
+        write_project(project_dir, num_processes)
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=project_dir, check=True, capture_output=True, env=env)
+            timings.append((time.perf_counter() - start) * 1000)
+    median = statistics.median(timings)
+    return {
+        "benchmark": "cli_startup",
+        "num_processes": num_processes,
+        "runs": runs,
+        "median_ms": median,
+        "min_ms": min(timings),
+        "budget_ms": budget_ms,
+        "within_budget": median <= budget_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--num-processes", type=int, default=1000)
+    parser.add_argument("--budget-ms", type=float, default=300)
+    args = parser.parse_args()
+    result = run(args.runs, args.num_processes, args.budget_ms)
+    print(json.dumps(result, indent=2))
+    if not result["within_budget"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Synthetic pipelines of configurable shape and size.
+A DAG is described as a list of (process name, input objects, output objects).
+"""
+import random
+import time
+from typing import Callable, List, Tuple
+
+from lazydag.core.object import Object
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.process import Process
+from lazydag.core.scheduler import Scheduler
+
+DagSpec = List[Tuple[str, List[str], List[str]]]
+
+
+def chain(depth: int) -> DagSpec:
+    spec = [("p_0", [], ["o_0"])]
+    for i in range(1, depth):
+        spec.append((f"p_{i}", [f"o_{i - 1}"], [f"o_{i}"]))
+    return spec
+
+
+def fan_out(width: int) -> DagSpec:
+    spec = [("source", [], ["o_source"])]
+    for i in range(width):
+        spec.append((f"p_{i}", ["o_source"], [f"o_{i}"]))
+    return spec
+
+
+def diamond(width: int) -> DagSpec:
+    spec = fan_out(width)
+    spec.append(("sink", [f"o_{i}" for i in range(width)], ["o_sink"]))
+    return spec
+
+
+def random_dag(size: int, max_inputs: int = 3, seed: int = 0) -> DagSpec:
+    rng = random.Random(seed)
+    spec = [("p_0", [], ["o_0"])]
+    for i in range(1, size):
+        inputs = rng.sample(range(i), min(i, rng.randint(1, max_inputs)))
+        spec.append((f"p_{i}", [f"o_{j}" for j in sorted(inputs)], [f"o_{i}"]))
+    return spec
+
+
+SHAPES = {
+    "chain": chain,
+    "fan_out": fan_out,
+    "diamond": diamond,
+    "random": random_dag,
+}
+
+
+class NullObject(Object):
+    """
+    Object without any state, so that only the scheduler is measured.
+    """
+
+
+class SyntheticProcess(Process):
+    def __init__(self, name: str, inputs: List[str], outputs: List[str], work: Callable[[], None]):
+        super().__init__(name)
+        self.inputs = [f"in_{i}" for i in range(len(inputs))]
+        self.outputs = [f"out_{i}" for i in range(len(outputs))]
+        self.work = work
+
+    def poll(self, **kwargs):
+        self.work()
+
+
+def noop():
+    pass
+
+
+def cpu_work(iterations: int = 20000) -> Callable[[], None]:
+    def work():
+        total = 0
+        for i in range(iterations):
+            total += i * i
+    return work
+
+
+def io_work(seconds: float = 0.001) -> Callable[[], None]:
+    def work():
+        time.sleep(seconds)
+    return work
+
+
+def build_scheduler(spec: DagSpec, work: Callable[[], None], parallelization: int = 4, **kwargs) -> Scheduler:
+    pipeline = Pipeline()
+    objects = []
+    for _, _, outputs in spec:
+        for obj_name in outputs:
+            pipeline.add_object(obj_name)
+            objects.append(NullObject(obj_name))
+    processes = []
+    for proc_name, inputs, outputs in spec:
+        proc = SyntheticProcess(proc_name, inputs, outputs, work)
+        pipeline.add_process(
+            proc_name,
+            inputs=dict(zip(proc.inputs, inputs)),
+            outputs=dict(zip(proc.outputs, outputs)),
+        )
+        processes.append(proc)
+    return Scheduler(pipeline, processes, objects, parallelization=parallelization, **kwargs)
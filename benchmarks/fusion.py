@@ -0,0 +1,47 @@
+"""
+Compares the per-step overhead of chains of cheap processes with and without
+operator fusion.
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from benchmarks.dags import build_scheduler, chain, noop
+
+
+def measure(depth: int, fusion: bool, steps: int) -> dict:
+    scheduler = build_scheduler(chain(depth), noop, fusion=fusion)
+    scheduler.step()
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        scheduler.step()
+    elapsed = time.perf_counter() - start
+    scheduler.thread_pool.shutdown()
+    scheduler.io_pool.shutdown()
+    return {
+        "benchmark": "fusion",
+        "shape": "chain",
+        "size": depth,
+        "fusion": fusion,
+        "tasks": len(scheduler._tasks),
+        "step_ms": elapsed / steps * 1000,
+        "per_process_us": elapsed / steps / depth * 1e6,
+    }
+
+
+def run(depths: List[int] = (10, 100, 1000), steps: int = 20) -> List[dict]:
+    return [measure(depth, fusion, steps) for depth in depths for fusion in (False, True)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depths", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--steps", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.depths, args.steps), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Measures save, load and get throughput of each contrib object at several sizes.
+"""
+import argparse
+import json
+from pathlib import Path
+import random
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from lazydag.contrib.objects import FSDictObject, FSJsonDictObject, FSListObject, FSStreamObject
+from lazydag.core.object import Object
+
+
+def _fill_list(obj: FSListObject, size: int):
+    for i in range(size):
+        obj.push({"id": i, "value": i * 0.5})
+
+
+def _fill_dict(obj: Object, size: int):
+    for i in range(size):
+        obj.set(f"key_{i}", {"id": i, "value": i * 0.5})
+
+
+def _fill_stream(obj: FSStreamObject, size: int):
+    obj.extend({"id": i, "value": i * 0.5} for i in range(size))
+
+
+def _get_index(obj: Object, i: int):
+    return obj.get(i)
+
+
+def _get_key(obj: Object, i: int):
+    return obj.get(f"key_{i}")
+
+
+OBJECTS: Dict[str, tuple] = {
+    "FSListObject": (FSListObject, _fill_list, _get_index),
+    "FSDictObject": (FSDictObject, _fill_dict, _get_key),
+    "FSJsonDictObject": (FSJsonDictObject, _fill_dict, _get_key),
+    "FSStreamObject": (FSStreamObject, _fill_stream, _get_index),
+}
+
+
+def _timed(func: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure(obj_name: str, size: int, gets: int = 10000) -> dict:
+    cls, fill, get = OBJECTS[obj_name]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        obj = cls("bench", save_path=Path(tmp_dir) / "bench")
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+        fill(obj, size)
+        save_s = _timed(obj.save)
+
+        def load():
+            obj.on_pipeline_start()
+            obj.preload()
+        load_s = _timed(load)
+
+        indices = [random.randrange(size) for _ in range(gets)]
+        # The first pass may load from disk, the second one measures hot gets
+        cold_get_s = _timed(lambda: [get(obj, i) for i in indices])
+        hot_get_s = _timed(lambda: [get(obj, i) for i in indices])
+
+    return {
+        "benchmark": "objects",
+        "object": obj_name,
+        "size": size,
+        "save_s": save_s,
+        "load_s": load_s,
+        "saved_items_per_s": size / save_s,
+        "cold_gets_per_s": gets / cold_get_s,
+        "hot_gets_per_s": gets / hot_get_s,
+    }
+
+
+def run(sizes: List[int] = (1000, 10000, 100000), objects: List[str] = tuple(OBJECTS)) -> List[dict]:
+    return [measure(obj_name, size) for obj_name in objects for size in sizes]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--objects", nargs="+", default=list(OBJECTS), choices=list(OBJECTS))
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.objects), indent=2))
+
+
+if __name__ == "__main__":
+    main()
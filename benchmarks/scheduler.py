@@ -0,0 +1,66 @@
+"""
+Measures `Scheduler.step` on synthetic pipelines: the per-step overhead with no-op
+processes and the throughput with CPU- and I/O-bound ones.
+"""
+import argparse
+import json
+import time
+from typing import List
+
+from benchmarks.dags import SHAPES, build_scheduler, cpu_work, io_work, noop
+
+WORKLOADS = {
+    "noop": noop,
+    "cpu": cpu_work(),
+    "io": io_work(),
+}
+
+
+def measure(shape: str, size: int, workload: str, steps: int, parallelization: int = 4) -> dict:
+    scheduler = build_scheduler(SHAPES[shape](size), WORKLOADS[workload], parallelization)
+    scheduler.step()  # warm up the thread pool
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        scheduler.step()
+    elapsed = time.perf_counter() - start
+    scheduler.thread_pool.shutdown()
+    scheduler.io_pool.shutdown()
+
+    num_processes = len(scheduler.processes)
+    return {
+        "benchmark": "scheduler",
+        "shape": shape,
+        "size": size,
+        "workload": workload,
+        "parallelization": parallelization,
+        "processes": num_processes,
+        "step_ms": elapsed / steps * 1000,
+        "per_process_us": elapsed / steps / num_processes * 1e6,
+        "polls_per_s": num_processes * steps / elapsed,
+    }
+
+
+def run(sizes: List[int] = (10, 100, 1000), steps: int = 10, workloads: List[str] = tuple(WORKLOADS)) -> List[dict]:
+    results = []
+    for workload in workloads:
+        for shape in SHAPES:
+            for size in sizes:
+                # Heavy workloads on big DAGs only measure the workload itself
+                if workload != "noop" and size > 100:
+                    continue
+                results.append(measure(shape, size, workload, steps))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--steps", type=int, default=10)
+    parser.add_argument("--workloads", nargs="+", default=list(WORKLOADS), choices=list(WORKLOADS))
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.steps, args.workloads), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Measures how long the scheduler simulator takes to build its model of a pipeline
+and to simulate a step, for large random pipelines.
+"""
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from benchmarks.dags import random_dag
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.simulator import Simulator
+
+
+def measure(size: int, workers: int, policy: str) -> dict:
+    spec = random_dag(size)
+    pipeline = Pipeline()
+    for _, _, outputs in spec:
+        for obj_name in outputs:
+            pipeline.add_object(obj_name)
+    for proc_name, inputs, outputs in spec:
+        pipeline.add_process(
+            proc_name,
+            inputs={f"in_{i}": obj for i, obj in enumerate(inputs)},
+            outputs={f"out_{i}": obj for i, obj in enumerate(outputs)},
+        )
+    rng = random.Random(0)
+    polls = {proc_name: rng.expovariate(1000) for proc_name, _, _ in spec}
+
+    start = time.perf_counter()
+    simulator = Simulator(pipeline, polls, {})
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    simulator.run(workers, policy)
+    simulator.critical_path()
+    elapsed = time.perf_counter() - start
+    return {
+        "benchmark": "simulator",
+        "shape": "random",
+        "size": size,
+        "parallelization": workers,
+        "workload": policy,
+        "build_ms": build * 1000,
+        "simulate_ms": elapsed * 1000,
+    }
+
+
+def run(sizes: List[int] = (1000, 20000), workers: int = 8) -> List[dict]:
+    return [measure(size, workers, policy) for size in sizes for policy in Simulator.POLICIES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 20000])
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    print(json.dumps(run(args.sizes, args.workers), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -37,37 +37,124 @@ class RandomNumberGeneratorProcess(Process):
             except queue.Empty:
                 break
 
+class _ParityNode:
+    __slots__ = ("even", "priority", "size", "evens", "left", "right")
+
+    def __init__(self, even):
+        self.even = even
+        self.priority = random.random()
+        self.size = 1
+        self.evens = int(even)
+        self.left = None
+        self.right = None
+
+    def update(self):
+        self.size = 1
+        self.evens = int(self.even)
+        for child in (self.left, self.right):
+            if child is not None:
+                self.size += child.size
+                self.evens += child.evens
+        return self
+
+
+class ParityIndex:
+    """
+    The parities of a list of numbers, in a treap keyed by position that counts
+    the even numbers of each subtree, so that finding where a number goes among
+    the numbers of its parity takes O(log n) on average.
+    """
+    def __init__(self):
+        self.root = None
+
+    def insert(self, idx, even):
+        """
+        Inserts a parity at idx, and returns the position of the number among the
+        numbers of the same parity.
+        """
+        left, right = self._split(self.root, idx)
+        position = self._count(left, even)
+        self.root = self._merge(self._merge(left, _ParityNode(even)), right)
+        return position
+
+    def pop(self, idx):
+        """
+        Removes the parity at idx, and returns it with the position the number had
+        among the numbers of the same parity.
+        """
+        left, right = self._split(self.root, idx)
+        node, right = self._split(right, 1)
+        position = self._count(left, node.even)
+        self.root = self._merge(left, right)
+        return node.even, position
+
+    @staticmethod
+    def _count(node, even):
+        if node is None:
+            return 0
+        return node.evens if even else node.size - node.evens
+
+    @classmethod
+    def _split(cls, node, idx):
+        # The first idx parities, and the rest
+        if node is None:
+            return None, None
+        left_size = node.left.size if node.left is not None else 0
+        if idx <= left_size:
+            left, node.left = cls._split(node.left, idx)
+            return left, node.update()
+        node.right, right = cls._split(node.right, idx - left_size - 1)
+        return node.update(), right
+
+    @classmethod
+    def _merge(cls, left, right):
+        if left is None or right is None:
+            return left if right is None else right
+        if left.priority > right.priority:
+            left.right = cls._merge(left.right, right)
+            return left.update()
+        right.left = cls._merge(left, right.left)
+        return right.update()
+
+
 class FilterProcess(Process):
     inputs = ["input_nums"]
     outputs = ["even_nums", "odd_nums"]
 
     def __init__(self, name):
         super().__init__(name)
-        self.processed_idx = 0
+        # Whether each input number is even, to find where it went
+        self.parities = None
 
     def poll(self, input_nums: FSListObject, even_nums: FSListObject, odd_nums: FSListObject):
-        if not input_nums.changed():
+        if self.parities is None:
+            # Nothing is known after a restart, so start over from the whole input
+            input_nums.forget_consumer(self.name)
+            self.parities = ParityIndex()
+        elif not input_nums.changed():
             return
-        # Process new items from input_nums
-        even_ptr = 0
-        odd_ptr = 0
-        for num in input_nums:
-            if num % 2 == 0:
-                if even_ptr < len(even_nums):
-                    even_nums.set(even_ptr, num)
-                else:
-                    even_nums.push(num)
-                even_ptr += 1
-            else:
-                if odd_ptr < len(odd_nums):
-                    odd_nums.set(odd_ptr, num)
-                else:
-                    odd_nums.push(num)
-                odd_ptr += 1
-        while len(even_nums) > even_ptr:
-            even_nums.remove(even_ptr)
-        while len(odd_nums) > odd_ptr:
-            odd_nums.remove(odd_ptr)
+        for change in input_nums.iter_changes(self.name):
+            if change[0] == "clear":
+                even_nums.clear()
+                odd_nums.clear()
+                self.parities = ParityIndex()
+            elif change[0] == "insert":
+                self._insert(change[1], change[2], even_nums, odd_nums)
+            elif change[0] == "remove":
+                self._remove(change[1], even_nums, odd_nums)
+            elif change[0] == "set":
+                self._remove(change[1], even_nums, odd_nums)
+                self._insert(change[1], change[2], even_nums, odd_nums)
+        input_nums.ack(self.name)
+
+    def _insert(self, idx, num, even_nums, odd_nums):
+        even = num % 2 == 0
+        position = self.parities.insert(idx, even)
+        (even_nums if even else odd_nums).insert(position, num)
+
+    def _remove(self, idx, even_nums, odd_nums):
+        even, position = self.parities.pop(idx)
+        (even_nums if even else odd_nums).remove(position)
 
 class MapProcess(Process):
     inputs = ["input_nums"]
@@ -78,17 +165,17 @@ class MapProcess(Process):
         self.processed_idx = 0
 
     def poll(self, input_nums, output_nums):
-        if not input_nums.changed():
-            return
-        ptr = 0
-        for num in input_nums:
-            if ptr < len(output_nums):
-                output_nums.set(ptr, num // 2)
-            else:
-                output_nums.push(num // 2)
-            ptr += 1
-        while len(output_nums) > ptr:
-            output_nums.remove(ptr)
+        # Only apply what changed since the last poll instead of rescanning the input
+        for change in input_nums.iter_changes(self.name):
+            if change[0] == "clear":
+                output_nums.clear()
+            elif change[0] == "insert":
+                output_nums.insert(change[1], change[2] // 2)
+            elif change[0] == "set":
+                output_nums.set(change[1], change[2] // 2)
+            elif change[0] == "remove":
+                output_nums.remove(change[1])
+        input_nums.ack(self.name)
 
 
 class PrintProcess(Process):
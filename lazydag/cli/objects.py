@@ -0,0 +1,90 @@
+from datetime import datetime
+from typing import List, Optional
+import typer
+from lazydag.cli.utils import get_object_by_name
+from lazydag.core.misc import get_processes_and_objects
+
+
+objects_app = typer.Typer()
+
+
+def _get_store():
+    from lazydag.contrib.versions import get_version_store
+
+    store = get_version_store()
+    if store is None:
+        typer.echo('Error: versioning is disabled, set FS_OBJECTS["versions_dir"] to enable it')
+        raise typer.Exit(1)
+    return store
+
+
+@objects_app.command()
+def versions(ctx: typer.Context, object_name: str):
+    store = _get_store()
+    for version in store.versions(object_name):
+        info = store.version_info(object_name, version)
+        created = datetime.fromtimestamp(info["created"]).isoformat(sep=" ", timespec="seconds")
+        step = info["step"] if info["step"] is not None else "-"
+        typer.echo(f"{version}\tstep {step}\t{created}\t{info['files']} files\t{info['chunks']} chunks")
+
+
+@objects_app.command()
+def checkout(
+    ctx: typer.Context,
+    object_name: str,
+    version: Optional[int] = typer.Argument(None),
+    step: Optional[int] = typer.Option(None, help="Check out the version the object had at the end of this step instead"),
+):
+    if (version is None) == (step is None):
+        typer.echo("Error: give either a version or --step")
+        raise typer.Exit(1)
+    store = _get_store()
+    obj = get_object_by_name(object_name)
+    if step is not None:
+        version = store.version_at_step(object_name, step)
+    store.checkout(object_name, version, obj.save_path)
+    typer.echo(f"Checked out version {version} of {object_name}")
+
+
+@objects_app.command()
+def rollback(ctx: typer.Context, step: int):
+    """
+    Checks out every versioned object as it was at the end of the step.
+    """
+    store = _get_store()
+    _, objects = get_processes_and_objects()
+    # Nothing is touched unless every object can be rolled back
+    targets = []
+    for obj in objects:
+        save_path = getattr(obj, "save_path", None)
+        versions = store.versions(obj.name)
+        if save_path is None or not versions:
+            continue
+        try:
+            targets.append((obj, store.version_at_step(obj.name, step)))
+        except ValueError:
+            # Versions are numbered from 1, so a pruned history starts later
+            if versions[0] != 1:
+                typer.echo(f"Error: the versions {obj.name} had at step {step} were pruned")
+                raise typer.Exit(1)
+            # Only written after that step
+            targets.append((obj, None))
+
+    for obj, version in targets:
+        if version is None:
+            obj.purge()
+            typer.echo(f"Purged {obj.name}, it has no version at step {step}")
+        else:
+            store.checkout(obj.name, version, obj.save_path)
+            typer.echo(f"Checked out version {version} of {obj.name}")
+
+
+@objects_app.command()
+def prune(ctx: typer.Context, keep: int, object_names: List[str] = []):
+    store = _get_store()
+    removed = store.prune(keep, object_names or None)
+    typer.echo(f"Removed {removed} unreferenced chunks")
+
+
+if __name__ == "__main__":
+    objects_app()
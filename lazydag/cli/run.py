@@ -1,20 +1,87 @@
+from pathlib import Path
+from typing import Dict, List, Optional
 import typer
 from lazydag.core.misc import get_processes_and_objects
 from lazydag.core.pipeline import Pipeline
-from lazydag.core.scheduler import Scheduler
+from lazydag.cli.utils import get_pipeline
 
 run_app = typer.Typer()
 
 
+def _parse_workers(workers: List[str]) -> Dict[str, int]:
+    capacities = {}
+    for item in workers:
+        name, sep, capacity = item.partition("=")
+        if not sep or not capacity.isdigit():
+            raise typer.BadParameter(f"{item!r} is not of the form CLASS=N")
+        capacities[name] = int(capacity)
+    return capacities
+
+
 @run_app.command()
-def run(ctx: typer.Context):
-    pipeline: Pipeline = ctx.obj["pipeline"]
+def run(
+    ctx: typer.Context,
+    fuse: bool = typer.Option(False, help="Run linear chains of processes as single tasks"),
+    reload: bool = typer.Option(False, help="Swap in changed process code without restarting"),
+    trace: Optional[Path] = typer.Option(None, help="Append the poll and save durations of each step to this file, see lazydag simulate"),
+    parallelization: Optional[int] = typer.Option(None, help="Workers of the default resource class"),
+    workers: List[str] = typer.Option([], help="Capacity of a resource class as CLASS=N, can be repeated"),
+    autotune: bool = typer.Option(False, help="Resize the resource class pools as the load shifts"),
+    target_latency: Optional[float] = typer.Option(None, help="Step duration in seconds the autotuner aims for, instead of throughput"),
+    autotune_log: Optional[Path] = typer.Option(None, help="Append the autotuner's decisions to this file"),
+    record: Optional[Path] = typer.Option(None, help="Record the changes of the source processes to this directory"),
+    replay: Optional[Path] = typer.Option(None, help="Replay a recording instead of running the source processes and the daemons, then stop"),
+    sweep: Optional[Path] = typer.Option(None, help="Run the variants of a parameter sweep described in this yaml file side by side"),
+):
+    from lazydag.conf import settings
+    from lazydag.core.scheduler import Scheduler
+    from lazydag.contrib.versions import get_version_store
+
+    if record is not None and replay is not None:
+        typer.echo("Error: --record and --replay can't be used together")
+        return
+    pipeline: Pipeline = get_pipeline(ctx)
     if pipeline is None:
         typer.echo("Error: pipeline not found, have you built it?")
         return
     processes, objects = get_processes_and_objects()
-    scheduler = Scheduler(pipeline, processes, objects)
-    scheduler.start()
+    if sweep is not None:
+        from lazydag.core.sweep import Sweep
+        sweep_spec = Sweep.from_yaml_file(sweep)
+        pipeline, processes, objects = sweep_spec.expand(pipeline, processes, objects)
+        sweep_spec.print_variants()
+    resource_classes = dict(getattr(settings, "RESOURCE_CLASSES", {}))
+    resource_classes.update(_parse_workers(workers))
+    if parallelization is not None:
+        resource_classes["default"] = parallelization
+    autotuner = None
+    if autotune:
+        from lazydag.core.autotune import Autotuner
+        autotuner = Autotuner(
+            target_latency=target_latency,
+            bounds=getattr(settings, "AUTOTUNE_BOUNDS", None),
+            log_path=autotune_log,
+        )
+    try:
+        scheduler = Scheduler(
+            pipeline, processes, objects,
+            version_store=get_version_store(),
+            fusion=fuse,
+            memory_budget=getattr(settings, "MEMORY_BUDGET", None),
+            trace_path=trace,
+            resource_classes=resource_classes,
+            autotuner=autotuner,
+            record_path=record,
+            replay_path=replay,
+        )
+    except ValueError as e:
+        typer.echo(f"Error: {e}")
+        return
+    reloader = None
+    if reload:
+        from lazydag.core.reloader import ModuleReloader
+        reloader = ModuleReloader(settings.PY_MODULE, Path.cwd())
+    scheduler.start(reloader=reloader)
 
 
 if __name__ == "__main__":
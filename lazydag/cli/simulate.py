@@ -0,0 +1,44 @@
+from pathlib import Path
+from typing import List
+import typer
+from lazydag.cli.utils import callback, get_pipeline
+
+
+def simulate(
+    ctx: typer.Context,
+    trace_path: Path = typer.Argument(..., help="Trace recorded with lazydag run run --trace"),
+    workers: List[int] = typer.Option([1, 2, 4, 8, 16], help="Worker counts to simulate"),
+    policy: List[str] = typer.Option(["fifo", "critical-path"], help="fifo, critical-path or longest-first"),
+    statistic: str = typer.Option("mean", help="Duration of a process over the traced steps: mean, median or max"),
+    overhead_us: float = typer.Option(0, help="Scheduling overhead added to every poll, in microseconds"),
+    path_length: int = typer.Option(10, help="Number of processes of the critical path to show"),
+):
+    """
+    Predict the step time of the pipeline for other worker counts and policies.
+    """
+    from lazydag.core.simulator import Simulator, load_trace
+
+    callback(ctx)
+    pipeline = get_pipeline(ctx)
+    if pipeline is None:
+        typer.echo("Error: pipeline not found, have you built it?")
+        return
+    poll_durations, save_durations = load_trace(trace_path, statistic)
+    simulator = Simulator(pipeline, poll_durations, save_durations, overhead=overhead_us / 1e6)
+
+    typer.echo(f"{'workers':>8} {'policy':<14} {'makespan':>12} {'steps/s':>10} {'utilization':>12}")
+    for policy_name in policy:
+        for worker_count in workers:
+            result = simulator.run(worker_count, policy_name)
+            typer.echo(
+                f"{worker_count:>8} {policy_name:<14} {result.makespan * 1000:>10.2f}ms"
+                f" {result.throughput:>10.2f} {result.utilization:>12.1%}"
+            )
+
+    length, path = simulator.critical_path()
+    typer.echo(f"Saves: {simulator.save_time * 1000:.2f}ms per step")
+    typer.echo(f"Critical path: {length * 1000:.2f}ms over {len(path)} processes")
+    for proc_name in path[:path_length]:
+        typer.echo(f"    {proc_name}: {poll_durations.get(proc_name, 0) * 1000:.2f}ms")
+    if len(path) > path_length:
+        typer.echo(f"    ... {len(path) - path_length} more")
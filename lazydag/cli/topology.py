@@ -5,7 +5,7 @@ from lazydag.core.object import Object
 from lazydag.core.process import Process
 from lazydag.core.pipeline import Pipeline
 from lazydag.core.paths import get_pipeline_path
-from lazydag.cli.utils import get_object_by_name, get_process_by_name
+from lazydag.cli.utils import get_object_by_name, get_process_by_name, get_pipeline
 
 
 topology_app = typer.Typer()
@@ -13,7 +13,7 @@ topology_app = typer.Typer()
 
 @topology_app.command()
 def add_process(ctx: typer.Context, process_name: str, inputs: List[str] = [], outputs: List[str] = []):
-    pipeline: Pipeline = ctx.obj["pipeline"]
+    pipeline: Pipeline = get_pipeline(ctx)
     inputs: Dict[str, str] = {inp.split(":")[0]: inp.split(":")[1] for inp in inputs}
     outputs: Dict[str, str] = {out.split(":")[0]: out.split(":")[1] for out in outputs}
     pipeline.add_process(process_name, inputs, outputs)
@@ -25,7 +25,7 @@ def add_process(ctx: typer.Context, process_name: str, inputs: List[str] = [], o
 
 @topology_app.command()
 def remove_process(ctx: typer.Context, process_name: str):
-    pipeline: Pipeline = ctx.obj["pipeline"]
+    pipeline: Pipeline = get_pipeline(ctx)
     pipeline.remove_process(process_name)
     pipeline.to_yaml_file(get_pipeline_path())
 
@@ -35,7 +35,7 @@ def remove_process(ctx: typer.Context, process_name: str):
 
 @topology_app.command()
 def add_object(ctx: typer.Context, object_name: str):
-    pipeline: Pipeline = ctx.obj["pipeline"]
+    pipeline: Pipeline = get_pipeline(ctx)
     pipeline.add_object(object_name)
     pipeline.to_yaml_file(get_pipeline_path())
 
@@ -45,7 +45,7 @@ def add_object(ctx: typer.Context, object_name: str):
 
 @topology_app.command()
 def remove_object(ctx: typer.Context, object_name: str):
-    pipeline: Pipeline = ctx.obj["pipeline"]
+    pipeline: Pipeline = get_pipeline(ctx)
     pipeline.remove_object(object_name)
     pipeline.to_yaml_file(get_pipeline_path())
 
@@ -59,7 +59,7 @@ def from_yaml(ctx: typer.Context, yaml_addr: Path):
         typer.echo(f"Error: topology file {yaml_addr} does not exist")
         return
 
-    pipeline: Pipeline = ctx.obj["pipeline"]
+    pipeline: Pipeline = get_pipeline(ctx)
     if pipeline is not None:
         typer.echo("Error: pipeline already exists, remove it first")
         return
@@ -79,7 +79,7 @@ def from_yaml(ctx: typer.Context, yaml_addr: Path):
 
 @topology_app.command()
 def validate(ctx: typer.Context):
-    pipeline: Pipeline = ctx.obj["pipeline"]
+    pipeline: Pipeline = get_pipeline(ctx)
     errors = pipeline.validate()
     if len(errors) > 0:
         for err in errors:
@@ -1,16 +1,47 @@
+from functools import lru_cache
+import os
+import sys
+from typing import Dict, Tuple
+import typer
 from lazydag.core.misc import get_processes_and_objects
 
 
+def callback(ctx: typer.Context):
+    sys.path.insert(0, os.getcwd())
+    ctx.ensure_object(dict)
+
+
+def get_pipeline(ctx: typer.Context):
+    """
+    Loads the pipeline on first use, so that --help and commands that don't need
+    it don't pay for scaffolding and parsing.
+    """
+    if "pipeline" not in ctx.obj:
+        from lazydag.conf import settings
+        from lazydag.core.misc import scaffold_data_dir
+        from lazydag.core.pipeline import Pipeline
+        from lazydag.core.paths import get_pipeline_path, get_pipeline_cache_path
+
+        scaffold_data_dir(settings.DATA_ROOT)
+        ctx.obj["pipeline"] = Pipeline.from_yaml_file(get_pipeline_path(), cache_path=get_pipeline_cache_path())
+    return ctx.obj["pipeline"]
+
+
+@lru_cache(maxsize=None)
+def _get_name_index() -> Tuple[Dict, Dict]:
+    # Imports the user's module once per invocation, and only when a hook needs it
+    processes, objects = get_processes_and_objects()
+    return {proc.name: proc for proc in processes}, {obj.name: obj for obj in objects}
+
+
 def get_process_by_name(process_name: str):
-    processes, _ = get_processes_and_objects()
-    for proc in processes:
-        if proc.name == process_name:
-            return proc
-    raise ValueError(f"Process {process_name} does not exist")
+    processes, _ = _get_name_index()
+    if process_name not in processes:
+        raise ValueError(f"Process {process_name} does not exist")
+    return processes[process_name]
 
 def get_object_by_name(object_name: str):
-    _, objects = get_processes_and_objects()
-    for obj in objects:
-        if obj.name == object_name:
-            return obj
-    raise ValueError(f"Object {object_name} does not exist")
+    _, objects = _get_name_index()
+    if object_name not in objects:
+        raise ValueError(f"Object {object_name} does not exist")
+    return objects[object_name]
@@ -0,0 +1,202 @@
+import json
+import os
+from pathlib import Path
+import pickle
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+Change = Tuple[Any, ...]
+
+
+def expand_changes(changes: Iterable[Change]) -> Iterator[Change]:
+    """
+    Expands the batched entries recorded by the bulk operations of the objects
+    into the individual changes they stand for:
+    ('insert_many', start, values), ('set_many', keys, values) and
+    ('remove_many', keys, removed values or None).
+    """
+    for change in changes:
+        kind = change[0]
+        if kind == "insert_many":
+            for i, value in enumerate(change[2]):
+                yield ("insert", change[1] + i, value)
+        elif kind == "set_many":
+            for key, value in zip(change[1], change[2]):
+                yield ("set", key, value)
+        elif kind == "remove_many":
+            if change[2] is None:
+                for key in change[1]:
+                    yield ("remove", key)
+            else:
+                for key, value in zip(change[1], change[2]):
+                    yield ("remove", key, value)
+        else:
+            yield change
+
+
+def count_changes(changes: Iterable[Change]) -> int:
+    """
+    Number of individual changes, without expanding the batched entries.
+    """
+    count = 0
+    for change in changes:
+        if change[0] == "insert_many":
+            count += len(change[2])
+        elif change[0] in ("set_many", "remove_many"):
+            count += len(change[1])
+        else:
+            count += 1
+    return count
+
+
+class ChangeFeed:
+    """
+    Persistent log of the changes committed to an object, with one read offset per
+    consumer.
+
+    Changes are only logged while some consumer is subscribed, i.e. has acknowledged
+    at least once, and entries are dropped once every consumer has read past them
+    (or when more than `max_retained` commits are pending, in which case the slow
+    consumers have to start over from a full copy of the object).
+
+    Without a path, the feed only lives in memory.
+    """
+    MAX_RETAINED = 1000
+
+    def __init__(self, path: Optional[Path], max_retained: int = MAX_RETAINED):
+        self.path = path
+        self.max_retained = max_retained
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._entries: List[Tuple[int, List[Change]]] = []
+        self._next_seq = 0
+        self._offsets: Dict[str, int] = {}
+        self._acked: Set[str] = set()
+        self._dirty = False
+
+    def read(self, consumer: str) -> Optional[List[Change]]:
+        """
+        Returns the committed changes the consumer hasn't acknowledged yet, or None if
+        they are not available (new consumer, or changes already dropped).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            offset = self._offsets.get(consumer)
+            if offset is None:
+                return None
+            first_seq = self._entries[0][0] if self._entries else self._next_seq
+            if offset < first_seq:
+                return None
+            return [change for seq, changes in self._entries if seq >= offset for change in changes]
+
+    def ack(self, consumer: str):
+        """
+        Marks everything up to the next commit as read by the consumer.
+        """
+        with self._lock:
+            self._acked.add(consumer)
+
+    def offset(self, consumer: str, committing: bool) -> Optional[int]:
+        """
+        The offset of the consumer as the next flush persists it, given whether a
+        commit comes before that flush.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if consumer in self._acked:
+                return self._next_seq + 1 if committing else self._next_seq
+            return self._offsets.get(consumer)
+
+    def restore(self, consumer: str, offset: int):
+        """
+        Moves the consumer forward to the offset, if the log has the changes up to it.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            current = self._offsets.get(consumer)
+            if (current is None or current < offset) and offset <= self._next_seq:
+                self._offsets[consumer] = offset
+                self._dirty = True
+
+    def forget(self, consumer: str):
+        with self._lock:
+            self._ensure_loaded()
+            self._acked.discard(consumer)
+            if self._offsets.pop(consumer, None) is not None:
+                self._dirty = True
+
+    def commit(self, changes: Iterable[Change]):
+        with self._lock:
+            self._ensure_loaded()
+            if not self._offsets and not self._acked:
+                return
+            entry = (self._next_seq, list(changes))
+            self._entries.append(entry)
+            self._next_seq += 1
+            self._dirty = True
+            if self.path is None:
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            with self._get_log_path().open("ab") as f:
+                pickle.dump(entry, f)
+
+    def flush(self):
+        """
+        Persists the acknowledgements of this step and drops the entries nobody needs.
+        """
+        with self._lock:
+            if not self._acked and not self._dirty:
+                return
+            self._ensure_loaded()
+            for consumer in self._acked:
+                self._offsets[consumer] = self._next_seq
+            self._acked.clear()
+
+            min_offset = min(self._offsets.values(), default=self._next_seq)
+            min_offset = max(min_offset, self._next_seq - self.max_retained)
+            if self._entries and self._entries[0][0] < min_offset:
+                self._entries = [entry for entry in self._entries if entry[0] >= min_offset]
+                if self.path is not None:
+                    self._rewrite_log()
+
+            self._dirty = False
+            if self.path is None:
+                return
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path / "offsets.json.tmp"
+            tmp_path.write_text(json.dumps({"next_seq": self._next_seq, "offsets": self._offsets}))
+            os.replace(tmp_path, self._get_offsets_path())
+
+    def _ensure_loaded(self):
+        if self._loaded or self.path is None:
+            return
+        offsets_path = self._get_offsets_path()
+        if offsets_path.exists():
+            state = json.loads(offsets_path.read_text())
+            self._next_seq = state["next_seq"]
+            self._offsets = state["offsets"]
+        log_path = self._get_log_path()
+        if log_path.exists():
+            with log_path.open("rb") as f:
+                while True:
+                    try:
+                        entry = pickle.load(f)
+                    except EOFError:
+                        break
+                    self._entries.append(entry)
+                    # The log is appended before the offsets are written
+                    self._next_seq = max(self._next_seq, entry[0] + 1)
+        self._loaded = True
+
+    def _rewrite_log(self):
+        tmp_path = self.path / "log.pkl.tmp"
+        with tmp_path.open("wb") as f:
+            for entry in self._entries:
+                pickle.dump(entry, f)
+        os.replace(tmp_path, self._get_log_path())
+
+    def _get_log_path(self) -> Path:
+        return self.path / "log.pkl"
+
+    def _get_offsets_path(self) -> Path:
+        return self.path / "offsets.json"
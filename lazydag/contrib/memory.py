@@ -0,0 +1,118 @@
+"""
+In-memory counterparts of the FS objects, for intermediate results that are
+cheaper to recompute than to persist, and for tests.
+"""
+import copy
+import functools
+import threading
+from typing import Callable, List, Tuple
+
+from lazydag.core.object import Object
+from lazydag.core.misc import approximate_size
+from lazydag.contrib.feed import ChangeFeed
+from lazydag.contrib.objects import FSDictObject, FSListObject
+
+
+def _copy_on_write(method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._shared:
+            self._current = copy.copy(self._current)
+            self._shared = False
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _InMemoryMixin:
+    """
+    Keeps the API and the `changed()`/`old` semantics of the FS object it is mixed
+    into, but nothing is written anywhere: the state starts empty on every
+    pipeline start, and the change feed only lives in memory.
+
+    Saving shares the current copy as the committed one instead of copying it, and
+    the first change after a save copies it back (shallowly), so saves are O(1) and
+    steps that don't change the object copy nothing.
+
+    With `rebuild_on_start`, the scheduler re-runs the producer from scratch on
+    start to recompute the state lost with the previous run.
+    """
+    # Nothing is stored, input offsets included
+    DATA_KEY = None
+
+    def __init__(self, name: str, rebuild_on_start: bool = False):
+        Object.__init__(self, name)
+        self.save_path = None
+        self.storage = None
+        self.load_time = None
+        self._load_lock = threading.Lock()
+        self.rebuild_on_start = rebuild_on_start
+
+    def on_add_to_pipeline(self):
+        pass
+
+    def clone(self, name: str) -> "_InMemoryMixin":
+        clone = Object.clone(self, name)
+        clone._load_lock = threading.Lock()
+        return clone
+
+    def on_pipeline_start(self):
+        super().on_pipeline_start()
+        self._shared = False
+
+    def _create_feed(self) -> ChangeFeed:
+        return ChangeFeed(None)
+
+    def _load(self, attrs: Tuple[str, ...]):
+        for attr in attrs:
+            setattr(self, attr, self._get_empty_structure())
+
+    def clear(self):
+        if len(self) == 0:
+            return
+        # No need to copy what is about to be dropped
+        self._current = self._get_empty_structure()
+        self._shared = False
+        self._changelog.append(('clear',))
+
+    def _save(self):
+        self._data = self._current
+        self._shared = True
+        self._version += 1
+
+    def memory_footprint(self) -> int:
+        if not self.is_loaded():
+            return 0
+        size = approximate_size(self._current)
+        if self._data is not self._current:
+            size += approximate_size(self._data)
+        return size
+
+    def _spillable_attributes(self) -> List[str]:
+        # Nothing can be recovered
+        return []
+
+    def on_remove_from_pipeline(self):
+        pass
+
+    def purge(self):
+        self.on_pipeline_start()
+
+
+class ListObject(_InMemoryMixin, FSListObject):
+    insert = _copy_on_write(FSListObject.insert)
+    remove = _copy_on_write(FSListObject.remove)
+    set = _copy_on_write(FSListObject.set)
+    set_many = _copy_on_write(FSListObject.set_many)
+    extend = _copy_on_write(FSListObject.extend)
+    remove_many = _copy_on_write(FSListObject.remove_many)
+
+
+class DictObject(_InMemoryMixin, FSDictObject):
+    def __init__(self, name: str, rebuild_on_start: bool = False):
+        super().__init__(name, rebuild_on_start)
+        self._changelog = []
+
+    set = _copy_on_write(FSDictObject.set)
+    remove = _copy_on_write(FSDictObject.remove)
+    set_many = _copy_on_write(FSDictObject.set_many)
+    remove_many = _copy_on_write(FSDictObject.remove_many)
@@ -1,55 +1,408 @@
+import bisect
 import json
-import copy
 from enum import Enum
+import io
+import itertools
 import os
 from pathlib import Path
 import pickle
 import re
 import shutil
-from typing import Any, List, Tuple, Iterable
+import struct
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Set, Tuple, Iterable, Iterator
 
 from lazydag.core.object import Object
+from lazydag.core.misc import approximate_size
 from lazydag.conf import settings
+from lazydag.contrib.feed import Change, ChangeFeed, count_changes, expand_changes
+from lazydag.contrib.storage import LocalStorage, Storage, get_storage
+
+
+# Ends the pickled data files that carry the input offsets of their producer, see
+# FSBackedObject.set_input_offsets
+_OFFSETS_MAGIC = b"LZOF"
+
+
+def _with_offsets(raw: bytes, offsets: Dict[str, int]) -> bytes:
+    """
+    Appends the offsets to pickled data, which unpickling ignores.
+    """
+    if not offsets:
+        return raw
+    trailer = pickle.dumps(offsets)
+    return raw + trailer + struct.pack("<Q", len(trailer)) + _OFFSETS_MAGIC
+
+
+def _read_offsets(raw: Optional[bytes]) -> Dict[str, int]:
+    # Pickles end with a STOP opcode, so plain data never ends with the magic
+    if raw is None or not raw.endswith(_OFFSETS_MAGIC):
+        return {}
+    (size,) = struct.unpack("<Q", raw[-12:-4])
+    return pickle.loads(raw[-12 - size:-12])
+
+
+def _dumps_stable(items: Iterable[Any]) -> bytes:
+    """
+    Pickles items as a flat tuple whose bytes don't depend on the positions of the
+    items: no memo (its indices shift after an insert) and no framing (the frame
+    boundaries move). Inserting or removing items then only changes the bytes
+    around them, so the version store shares the rest of the file between
+    versions. Without the memo, an object referenced twice is pickled twice and
+    cyclic items can't be pickled, hence only versioned objects use it (see
+    FSBackedObject.stable_pickling).
+    """
+    f = io.BytesIO()
+    pickler = pickle.Pickler(f, protocol=3)
+    pickler.fast = True
+    pickler.dump(tuple(items))
+    return f.getvalue()
 
 class FSBackedObject(Object):
     """
     Base class for all objects stored on the filesystem.
     Manages filesystem path and abstract save/load mechanism.
+
+    The data itself goes through `storage`: the save_path by default, or a shared
+    object store if FS_OBJECTS["remote"] is set (see contrib.storage). The
+    save_path always holds the local bookkeeping, like the change feed.
+
+    Loading is lazy: the attributes listed in `_lazy_attributes` are dropped on
+    pipeline start and materialized by `_load` on their first access, one at a
+    time (or all at once by an explicit `preload`, which the scheduler runs on its
+    I/O pool). `spill` drops the ones listed by `_spillable_attributes` the same
+    way, under memory pressure, and `on_load` is called after each load.
+
+    Subclasses implement `_save` and describe their changes through
+    `_pending_changes` and `_full_state_changes`, which feed `iter_changes`.
     """
-    def __init__(self, name: str, save_path: Path = None):
+    _lazy_attributes: Tuple[str, ...] = ()
+    # Lazy attributes holding the committed state, which always match the stored
+    # data; the others only do while the object has no unsaved changes
+    _committed_attributes: Tuple[str, ...] = ()
+    # Storage key of the data, for the objects saved as a single pickle, which then
+    # also carries their input offsets
+    DATA_KEY: Optional[str] = None
+    # Set by the version store, for the objects whose pickles should stay stable
+    # under edits (see _dumps_stable)
+    stable_pickling: bool = False
+
+    def __init__(self, name: str, save_path: Path = None, storage: Optional[Storage] = None):
         super().__init__(name)
         self.save_path: Path = save_path or Path(settings.FS_OBJECTS["save_dir"]) / name
+        if storage is None:
+            # An explicit save_path means local data
+            storage = LocalStorage(save_path) if save_path is not None else get_storage(name, self.save_path)
+        self.storage: Storage = storage
+        self.load_time: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for missing attributes, so loaded objects pay nothing here
+        if name in type(self)._lazy_attributes:
+            self._load_attributes((name,))
+            return self.__dict__[name]
+        raise AttributeError(f"{self.__class__.__name__!r} object has no attribute {name!r}")
 
     def on_add_to_pipeline(self):
-        self.save_path.mkdir(parents=True)
+        self.save_path.mkdir(parents=True, exist_ok=True)
+
+    def on_pipeline_start(self):
+        for attr in self._lazy_attributes:
+            self.__dict__.pop(attr, None)
+        self.load_time = None
+        self._feed = self._create_feed()
+        self._input_offsets: Dict[str, int] = {}
+        self._prefetch_stats = {"prefetched": 0, "hits": 0, "misses": 0, "wasted": 0}
+        self._prefetch_stats_lock = threading.Lock()
+
+    def _create_feed(self) -> ChangeFeed:
+        return ChangeFeed(self.save_path / ".feed")
+
+    def clone(self, name: str) -> "FSBackedObject":
+        """
+        The clone is stored next to the object, on the default storage for its name
+        unless the object is stored locally.
+        """
+        clone = super().clone(name)
+        clone.save_path = self.save_path.parent / name
+        if isinstance(self.storage, LocalStorage):
+            clone.storage = LocalStorage(clone.save_path)
+        else:
+            clone.storage = get_storage(name, clone.save_path)
+        clone._load_lock = threading.Lock()
+        for attr in self._lazy_attributes:
+            clone.__dict__.pop(attr, None)
+        return clone
+
+    def prefetch_stats(self) -> Optional[Dict[str, int]]:
+        with self._prefetch_stats_lock:
+            return dict(self._prefetch_stats)
+
+    def _count_prefetch(self, counter: str, n: int = 1):
+        with self._prefetch_stats_lock:
+            self._prefetch_stats[counter] += n
+
+    def preload(self):
+        self._load_attributes(self._lazy_attributes)
+
+    def _load_attributes(self, attrs: Iterable[str]):
+        with self._load_lock:
+            missing = tuple(attr for attr in attrs if attr not in self.__dict__)
+            if not missing:
+                return
+            start = time.perf_counter()
+            self._load(missing)
+            self.load_time = (self.load_time or 0) + time.perf_counter() - start
+        if self.on_load is not None:
+            self.on_load(self)
+
+    def is_loaded(self) -> bool:
+        return all(attr in self.__dict__ for attr in self._lazy_attributes)
+
+    def _load(self, attrs: Tuple[str, ...]):
+        """
+        Materializes the given lazy attributes, which are missing.
+        """
+        pass
+
+    def _load_pickled(self, data_key: str, attrs: Tuple[str, ...]):
+        """
+        Materializes the given lazy attributes, each as a separate copy of the
+        pickled data stored under data_key.
+        """
+        raw = self.storage.read(data_key)
+        for attr in attrs:
+            # Unpickling again is considerably cheaper than a deepcopy
+            setattr(self, attr, self._loads(raw) if raw is not None else self._get_empty_structure())
+
+    def _dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value)
+
+    def _loads(self, raw: bytes) -> Any:
+        return pickle.loads(raw)
+
+    def memory_footprint(self) -> int:
+        return sum(approximate_size(self.__dict__[attr]) for attr in self._lazy_attributes if attr in self.__dict__)
+
+    def spill(self, target: Optional[int] = None) -> int:
+        freed = 0
+        with self._load_lock:
+            for attr in self._spillable_attributes():
+                if target is not None and freed >= target:
+                    break
+                if attr in self.__dict__:
+                    freed += approximate_size(self.__dict__.pop(attr))
+        return freed
+
+    def _spillable_attributes(self) -> List[str]:
+        """
+        The lazy attributes that can be loaded back from storage, coldest first:
+        the committed state, then the current one if nothing changed.
+        """
+        if self.changed():
+            return list(self._committed_attributes)
+        return list(self._committed_attributes) + [
+            attr for attr in self._lazy_attributes if attr not in self._committed_attributes
+        ]
+
+    def save(self):
+        if self.changed():
+            changes = self._pending_changes()
+            self._save()
+            self._feed.commit(changes)
+        self._clear_pending_changes()
+        self._feed.flush()
+
+    def _save(self):
+        pass
+
+    def iter_changes(self, consumer: str) -> Iterator[Change]:
+        """
+        Yields the changes made to the object since the consumer (usually the name
+        of the reading process) last called `ack`, including the uncommitted ones.
+        A consumer seen for the first time, or one that lagged too far behind,
+        gets a ('clear',) followed by the whole current state instead.
+
+        Changes are ('insert', idx, value), ('set', idx_or_key, value),
+        ('remove', idx_or_key), ('append', offset, value) and ('clear',);
+        removals may carry extra items. Batches recorded by the bulk operations
+        are yielded as individual changes.
+        """
+        committed = self._feed.read(consumer)
+        if committed is None:
+            yield ("clear",)
+            yield from self._full_state_changes()
+            return
+        yield from expand_changes(committed)
+        yield from expand_changes(self._pending_changes())
+
+    def ack(self, consumer: str):
+        """
+        Acknowledges every change of the object up to its next save. Consumers run
+        after the producer within a step, so this covers everything `iter_changes`
+        yielded. The offset is persisted by the save, so it survives restarts; the
+        scheduler saves the outputs of the consumer first, and those saved as a
+        single pickle carry the offset too, see `set_input_offsets`.
+        """
+        self._feed.ack(consumer)
+
+    def consumer_offset(self, consumer: str) -> Optional[int]:
+        return self._feed.offset(consumer, committing=self.changed())
+
+    def restore_consumer_offset(self, consumer: str, offset: int):
+        self._feed.restore(consumer, offset)
+
+    def set_input_offsets(self, offsets: Dict[str, int]):
+        self._input_offsets = dict(offsets)
+
+    def saved_input_offsets(self) -> Dict[str, int]:
+        if self.DATA_KEY is None:
+            return {}
+        return _read_offsets(self.storage.read(self.DATA_KEY))
+
+    def forget_consumer(self, consumer: str):
+        """
+        Drops the offset of the consumer, its next `iter_changes` starts over.
+        """
+        self._feed.forget(consumer)
+
+    def change_count(self) -> int:
+        return count_changes(self._pending_changes())
+
+    def pending_changes(self) -> Optional[List[Change]]:
+        return self._pending_changes()
+
+    def apply_changes(self, changes: Iterable[Change]):
+        for change in changes:
+            kind = change[0]
+            if kind == "remove":
+                # Removals may carry the removed value
+                self.remove(change[1])
+            elif kind == "remove_many":
+                self.remove_many(change[1])
+            elif kind == "append":
+                self.append(change[2])
+            elif kind == "insert_many":
+                # Only recorded by extend
+                self.extend(change[2])
+            else:
+                getattr(self, kind)(*change[1:])
+
+    def _pending_changes(self) -> List[Change]:
+        return []
+
+    def _clear_pending_changes(self):
+        pass
+
+    def _full_state_changes(self) -> Iterable[Change]:
+        return []
 
     def on_remove_from_pipeline(self):
         shutil.rmtree(self.save_path)
+        self.storage.clear()
 
     def purge(self):
-        for child in os.listdir(self.save_path):
-            shutil.rmtree(self.save_path / child)
+        self.storage.clear()
+        for child in self.save_path.iterdir():
+            if child.is_dir():
+                shutil.rmtree(child)
+            else:
+                child.unlink()
 
     def __str__(self):
         return f"{self.__class__.__name__}<{self.name}>"
 
 
+def _as_list(values: Iterable[Any]) -> List[Any]:
+    # NumPy arrays (and the like) convert their items to plain Python values
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+class ListSnapshot:
+    """
+    Read-only view of a committed version of an FSListObject.
+    Committed lists are never mutated in place, so pinning one is O(1) and readers
+    never block the writer or each other. Old versions are reclaimed once no
+    snapshot refers to them.
+    """
+    def __init__(self, data: List[Any], version: int):
+        self._data = data
+        self.version = version
+
+    def get(self, idx: int) -> Any:
+        return self._data[idx]
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __getitem__(self, idx: int):
+        return self._data[idx]
+
+
+class DictSnapshot:
+    """
+    Read-only view of a committed version of an FSDictObject, see `ListSnapshot`.
+    """
+    def __init__(self, data: Dict[Any, Any], version: int):
+        self._data = data
+        self.version = version
+
+    def get(self, key: Any) -> Any:
+        return self._data.get(key)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __contains__(self, key: Any):
+        return key in self._data
+
+    def keys(self):
+        return self._data.keys()
+
+    def values(self):
+        return self._data.values()
+
+    def items(self):
+        return self._data.items()
+
+    def __getitem__(self, key: Any):
+        return self._data[key]
+
+
 class FSListObject(FSBackedObject):
-    def _get_data_path(self) -> Path:
-        return self.save_path / "data.pkl"
+    _lazy_attributes = ("_data", "_current")
+    _committed_attributes = ("_data",)
+
+    DATA_KEY = "data.pkl"
 
     def _get_empty_structure(self) -> Any:
         return []
 
     def on_pipeline_start(self):
-        data_path = self._get_data_path()
-        if data_path.exists():
-            with data_path.open("rb") as f:
-                self._data = pickle.load(f)
-        else:
-            self._data = self._get_empty_structure()
-        self._current = copy.deepcopy(self._data)
+        super().on_pipeline_start()
         self._changelog: List[Tuple[str, int, Any]] = []
+        self._version = 0
+
+    def _load(self, attrs: Tuple[str, ...]):
+        self._load_pickled(self.DATA_KEY, attrs)
+
+    def _dumps(self, value: List[Any]) -> bytes:
+        return _dumps_stable(value) if self.stable_pickling else pickle.dumps(value)
+
+    def _loads(self, raw: bytes) -> List[Any]:
+        # A tuple if pickled stably
+        return list(pickle.loads(raw))
 
     def get(self, idx: int, old: bool = False) -> Any:
         if old:
@@ -81,17 +434,80 @@ class FSListObject(FSBackedObject):
         self._current[idx] = value
         self._changelog.append(('set', idx, value))
 
-    def save(self):
+    def clear(self):
+        if len(self) == 0:
+            return
+        self._current.clear()
+        self._changelog.append(('clear',))
+
+    def get_many(self, idxs: Iterable[int], old: bool = False) -> List[Any]:
+        data = self._data if old else self._current
+        return [data[idx] for idx in _as_list(idxs)]
+
+    def set_many(self, idxs: Iterable[int], values: Iterable[Any]):
+        """
+        Sets every index to the matching value, recorded as a single change. Unlike
+        `set`, values aren't compared with the current ones.
+        """
+        idxs, values = _as_list(idxs), _as_list(values)
+        if len(idxs) != len(values):
+            raise ValueError("Indices and values must have the same length")
+        if not idxs:
+            return
+        if min(idxs) < 0 or max(idxs) >= len(self):
+            raise ValueError("Index out of bounds")
+        current = self._current
+        for idx, value in zip(idxs, values):
+            current[idx] = value
+        self._changelog.append(('set_many', idxs, values))
+
+    def extend(self, values: Iterable[Any]):
+        values = _as_list(values)
+        if not values:
+            return
+        start = len(self)
+        self._current.extend(values)
+        self._changelog.append(('insert_many', start, values))
+
+    def remove_many(self, idxs: Iterable[int]):
+        """
+        Removes the items at the given indices, all of them referring to the list
+        before the removal.
+        """
+        idxs = sorted(set(_as_list(idxs)), reverse=True)
+        if not idxs:
+            return
+        if idxs[-1] < 0 or idxs[0] >= len(self):
+            raise ValueError("Index out of bounds")
+        # Removing from the end keeps the remaining indices valid
+        values = [self._current.pop(idx) for idx in idxs]
+        self._changelog.append(('remove_many', idxs, values))
+
+    def _save(self):
         # Update persistent data
-        self._data = copy.deepcopy(self._current)
+        raw = self._dumps(self._current)
+        self.storage.write(self.DATA_KEY, _with_offsets(raw, self._input_offsets))
+        # Rebinding (never mutating) the committed copy keeps snapshots isolated
+        self._data = self._loads(raw)
+        self._version += 1
 
-        data_path = self._get_data_path()
-        with data_path.open("wb") as f:
-            pickle.dump(self._data, f)
+    def _pending_changes(self) -> List[Change]:
+        return list(self._changelog)
 
+    def _clear_pending_changes(self):
         # Clear change history
         self._changelog.clear()
 
+    def _full_state_changes(self) -> Iterable[Change]:
+        for idx, value in enumerate(self._current):
+            yield ('insert', idx, value)
+
+    def snapshot(self) -> ListSnapshot:
+        """
+        Pin the last committed version, e.g. for reading from a daemon thread.
+        """
+        return ListSnapshot(self._data, self._version)
+
     def changed(self) -> bool:
         return len(self._changelog) > 0
 
@@ -106,24 +522,33 @@ class FSListObject(FSBackedObject):
 
 
 class FSDictObject(FSBackedObject):
+    _lazy_attributes = ("_data", "_current")
+    _committed_attributes = ("_data",)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._changelog: List[Tuple[str, Any, Any]] = []
 
-    def _get_data_path(self) -> Path:
-        return self.save_path / "data.pkl"
+    DATA_KEY = "data.pkl"
 
     def _get_empty_structure(self) -> Any:
         return {}
 
     def on_pipeline_start(self):
-        data_path = self._get_data_path()
-        if data_path.exists():
-            with data_path.open("rb") as f:
-                self._data = pickle.load(f)
-        else:
-            self._data = self._get_empty_structure()
-        self._current = copy.deepcopy(self._data)
+        super().on_pipeline_start()
+        # A new list rather than clearing, which clones share until they start
+        self._changelog = []
+        self._version = 0
+
+    def _load(self, attrs: Tuple[str, ...]):
+        self._load_pickled(self.DATA_KEY, attrs)
+
+    def _dumps(self, value: Dict[Any, Any]) -> bytes:
+        return _dumps_stable(value.items()) if self.stable_pickling else pickle.dumps(value)
+
+    def _loads(self, raw: bytes) -> Dict[Any, Any]:
+        # Pairs if pickled stably
+        return dict(pickle.loads(raw))
 
     def on_pipeline_end(self):
         pass
@@ -143,16 +568,56 @@ class FSDictObject(FSBackedObject):
             del self._current[key]
             self._changelog.append(('remove', key))
 
-    def save(self):
-        self._data = copy.deepcopy(self._current)
+    def clear(self):
+        if len(self) == 0:
+            return
+        self._current.clear()
+        self._changelog.append(('clear',))
+
+    def get_many(self, keys: Iterable[Any], old: bool = False) -> List[Any]:
+        data = self._data if old else self._current
+        return [data.get(key) for key in _as_list(keys)]
 
-        os.makedirs(os.path.dirname(self.save_path), exist_ok=True)
+    def set_many(self, keys: Iterable[Any], values: Iterable[Any]):
+        keys, values = _as_list(keys), _as_list(values)
+        if len(keys) != len(values):
+            raise ValueError("Keys and values must have the same length")
+        if not keys:
+            return
+        self._current.update(zip(keys, values))
+        self._changelog.append(('set_many', keys, values))
 
-        with open(self.save_path, 'wb') as f:
-            pickle.dump(self._data, f)
+    def remove_many(self, keys: Iterable[Any]):
+        current = self._current
+        keys = [key for key in _as_list(keys) if key in current]
+        if not keys:
+            return
+        for key in keys:
+            del current[key]
+        self._changelog.append(('remove_many', keys, None))
 
+    def _save(self):
+        raw = self._dumps(self._current)
+        self.storage.write(self.DATA_KEY, _with_offsets(raw, self._input_offsets))
+        self._data = self._loads(raw)
+        self._version += 1
+
+    def _pending_changes(self) -> List[Change]:
+        return list(self._changelog)
+
+    def _clear_pending_changes(self):
         self._changelog.clear()
 
+    def _full_state_changes(self) -> Iterable[Change]:
+        for key, value in self._current.items():
+            yield ('set', key, value)
+
+    def snapshot(self) -> DictSnapshot:
+        """
+        Pin the last committed version, e.g. for reading from a daemon thread.
+        """
+        return DictSnapshot(self._data, self._version)
+
     def changed(self) -> bool:
         return len(self._changelog) > 0
 
@@ -179,6 +644,16 @@ class FSDictObject(FSBackedObject):
 
 
 class FSJsonDictObject(FSBackedObject):
+    """
+    Dict with one JSON file per key, so that reading or writing a key doesn't touch
+    the others. Scans through `items` and `values` (or an explicit `prefetch`) read
+    keys in batches, which remote storages serve concurrently.
+    """
+    PREFETCH_BATCH = 64
+    _KEY_PATTERN = re.compile(r"[a-zA-Z0-9_]+")
+    # Keys are validated in bulk by joining them with a character keys can't contain
+    _KEYS_PATTERN = re.compile(r"[a-zA-Z0-9_]+(?:\n[a-zA-Z0-9_]+)*")
+
     class _SpecialValues(Enum):
         NON_EXISTENT = 0
 
@@ -189,17 +664,60 @@ class FSJsonDictObject(FSBackedObject):
         super().on_pipeline_start()
         self._overlay: Dict[str, Any] = {}
         self._underlay: Dict[str, Any] = {}
+        self._version = 0
+        self._snapshots: weakref.WeakSet = weakref.WeakSet()
+        self._snapshots_lock = threading.Lock()
+        # Prefetched keys that weren't read yet, added to from the scheduler's I/O pool
+        self._prefetched: Set[str] = set()
+        self._prefetched_lock = threading.Lock()
 
-    def save(self):
-        for key, value in self._overlay.items():
-            key_path = self._get_key_path(key)
-            if value == self._SpecialValues.NON_EXISTENT:
-                key_path.unlink(missing_ok=True)
-            else:
-                with key_path.open('w') as f:
-                    json.dump(value, f)
+    def _save(self):
+        with self._snapshots_lock:
+            snapshots = list(self._snapshots)
+        # Live snapshots must keep seeing the committed values, so hand them the
+        # values we're about to overwrite before touching any file
+        if snapshots:
+            self._fetch_committed(self._overlay)
+        for snapshot in snapshots:
+            for key in self._overlay:
+                if key not in snapshot._preimage:
+                    snapshot._preimage[key] = self._try_to_load(key)
+
+        self.storage.write_many({
+            key: None if value == self._SpecialValues.NON_EXISTENT else json.dumps(value).encode()
+            for key, value in self._overlay.items()
+        })
+        self._version += 1
+
+    def memory_footprint(self) -> int:
+        return approximate_size(self._overlay) + approximate_size(self._underlay)
+
+    def _pending_changes(self) -> List[Change]:
+        return [
+            ('remove', key) if value == self._SpecialValues.NON_EXISTENT else ('set', key, value)
+            for key, value in self._overlay.items()
+        ]
+
+    def _clear_pending_changes(self):
         self._overlay.clear()
         self._underlay.clear()
+        with self._prefetched_lock:
+            wasted = len(self._prefetched)
+            self._prefetched.clear()
+        self._count_prefetch("wasted", wasted)
+
+    def _full_state_changes(self) -> Iterable[Change]:
+        for key, value in self.items():
+            yield ('set', key, value)
+
+    def snapshot(self) -> "JsonDictSnapshot":
+        """
+        Pin the last committed version, e.g. for reading from a daemon thread.
+        """
+        snapshot = JsonDictSnapshot(self, self._version)
+        with self._snapshots_lock:
+            self._snapshots.add(snapshot)
+        return snapshot
 
     def changed(self) -> bool:
         return len(self._overlay) > 0
@@ -222,10 +740,48 @@ class FSJsonDictObject(FSBackedObject):
         self._validate_key(key)
         self._overlay[key] = self._SpecialValues.NON_EXISTENT
 
+    def get_many(self, keys: Iterable[str], old: bool = False) -> List[Any]:
+        """
+        Like `get` for each key, with the committed values read in one batch.
+        """
+        keys = _as_list(keys)
+        self._validate_keys(keys)
+        overlay = {} if old else self._overlay
+        missing = [key for key in keys if key not in overlay and key not in self._underlay]
+        self._count_prefetch("misses", len(missing))
+        self._fetch_committed(missing)
+        with self._prefetched_lock:
+            hits = self._prefetched.intersection(keys)
+            self._prefetched -= hits
+        if hits:
+            self._count_prefetch("hits", len(hits))
+
+        result = []
+        for key in keys:
+            value = overlay[key] if key in overlay else self._underlay[key]
+            if value == self._SpecialValues.NON_EXISTENT:
+                raise KeyError(key)
+            result.append(value)
+        return result
+
+    def set_many(self, keys: Iterable[str], values: Iterable[Any]):
+        keys, values = _as_list(keys), _as_list(values)
+        if len(keys) != len(values):
+            raise ValueError("Keys and values must have the same length")
+        self._validate_keys(keys)
+        self._overlay.update(zip(keys, values))
+
+    def remove_many(self, keys: Iterable[str]):
+        keys = _as_list(keys)
+        self._validate_keys(keys)
+        self._overlay.update(dict.fromkeys(keys, self._SpecialValues.NON_EXISTENT))
+
+    def __getitem__(self, key: str) -> Any:
+        return self.get(key)
+
     def keys(self) -> Iterable[str]:
         overlay_keys = set(self._overlay.keys())
-        for file in self.save_path.iterdir():
-            key = file.name
+        for key in self._list_committed_keys():
             if key not in overlay_keys:
                 yield key
             else:
@@ -233,25 +789,387 @@ class FSJsonDictObject(FSBackedObject):
                 if self._overlay[key] != self._SpecialValues.NON_EXISTENT:
                     yield key
         for key in overlay_keys:
-            yield key
+            if self._overlay[key] != self._SpecialValues.NON_EXISTENT:
+                yield key
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        keys = iter(self.keys())
+        while batch := list(itertools.islice(keys, self.PREFETCH_BATCH)):
+            self._fetch_committed(batch)
+            for key in batch:
+                yield key, self.get(key)
+
+    def values(self) -> Iterator[Any]:
+        return (value for _, value in self.items())
+
+    def prefetch(self, keys: Iterable[str]):
+        """
+        Reads the committed values of the given keys in one batch, so that the
+        following `get`s are served from memory.
+        """
+        fetched = self._fetch_committed(keys)
+        with self._prefetched_lock:
+            self._prefetched.update(fetched)
+        self._count_prefetch("prefetched", len(fetched))
+
+    def _fetch_committed(self, keys: Iterable[str]) -> List[str]:
+        missing = [key for key in keys if key not in self._underlay]
+        for key, raw in self.storage.read_many(missing).items():
+            self._underlay[key] = self._parse_committed(raw)
+        return missing
+
+    def _list_committed_keys(self) -> Iterable[str]:
+        return self.storage.list()
 
     def _validate_key(self, key: str):
         if not isinstance(key, str):
             raise ValueError("Key must be a string")
-        if not re.fullmatch(r"[a-zA-Z0-9_]+", key):
+        if not self._KEY_PATTERN.fullmatch(key):
+            raise ValueError("Key must contain only English letters, numbers, and underscores")
+
+    def _validate_keys(self, keys: List[str]):
+        if not keys:
+            return
+        try:
+            joined = "\n".join(keys)
+        except TypeError:
+            raise ValueError("Key must be a string")
+        # A key containing the separator would pass as two keys, hence the count
+        if joined.count("\n") != len(keys) - 1 or not self._KEYS_PATTERN.fullmatch(joined):
             raise ValueError("Key must contain only English letters, numbers, and underscores")
 
     def _try_to_load(self, key: str) -> Any:
         if key in self._underlay:
+            with self._prefetched_lock:
+                hit = key in self._prefetched
+                self._prefetched.discard(key)
+            if hit:
+                self._count_prefetch("hits")
             return self._underlay[key]
-        try:
-            with open(self._get_key_path(key), 'r') as f:
-                val = json.load(f)
-            self._underlay[key] = val
-            return val
-        except FileNotFoundError:
-            self._underlay[key] = self._SpecialValues.NON_EXISTENT
+        self._count_prefetch("misses")
+        val = self._read_committed(key)
+        self._underlay[key] = val
+        return val
+
+    def _read_committed(self, key: str) -> Any:
+        return self._parse_committed(self.storage.read(key))
+
+    def _parse_committed(self, raw: Optional[bytes]) -> Any:
+        if raw is None:
             return self._SpecialValues.NON_EXISTENT
+        return json.loads(raw)
+
+
+class JsonDictSnapshot:
+    """
+    Read-only view of a committed version of an FSJsonDictObject.
+    Values are read from disk lazily. When the object saves while the snapshot is
+    alive, the overwritten values are handed to the snapshot first, so readers keep
+    seeing the pinned version without ever taking a lock on the read path.
+    """
+    def __init__(self, obj: FSJsonDictObject, version: int):
+        self._obj = obj
+        self._preimage: Dict[str, Any] = {}
+        self.version = version
+
+    def get(self, key: str) -> Any:
+        self._obj._validate_key(key)
+        if key in self._preimage:
+            result = self._preimage[key]
+        else:
+            result = self._obj._read_committed(key)
+            # The preimage is published before the file is replaced, so if the
+            # key was overwritten meanwhile, the preimage holds the pinned value
+            if key in self._preimage:
+                result = self._preimage[key]
+        if result == FSJsonDictObject._SpecialValues.NON_EXISTENT:
+            raise KeyError(key)
+        return result
+
+    def keys(self) -> Iterable[str]:
+        listed = set(self._obj._list_committed_keys())
+        preimage = dict(self._preimage)
+        for key in listed - preimage.keys():
+            yield key
+        for key, value in preimage.items():
+            if value != FSJsonDictObject._SpecialValues.NON_EXISTENT:
+                yield key
+
+    def __getitem__(self, key: str):
+        return self.get(key)
+
+
+class FSStreamObject(FSBackedObject):
+    """
+    Append-only stream of records with monotonically increasing offsets.
+
+    Records are stored as pickle frames in segment files named after the offset of
+    their first record. Appends are buffered and written to the last segment on
+    save, so they are amortized O(1). Retention deletes whole segments, never the
+    last one, once the stream exceeds `retention_bytes` or once their newest record
+    is older than `retention_seconds`.
+
+    Consumers read batches with `read`, which advances a per-consumer cursor that
+    is persisted on save.
+
+    Segments are appended to in place, which the Storage interface can't express,
+    so streams are always stored locally under their save_path, even when
+    FS_OBJECTS["remote"] is set.
+    """
+    SEGMENT_BYTES = 16 << 20
+
+    _lazy_attributes = ("_index", "_cursors")
+
+    def __init__(self, name: str, save_path: Path = None, segment_bytes: int = SEGMENT_BYTES,
+                 retention_bytes: Optional[int] = None, retention_seconds: Optional[float] = None,
+                 storage: Optional[Storage] = None):
+        save_path = save_path or Path(settings.FS_OBJECTS["save_dir"]) / name
+        if storage is None:
+            storage = LocalStorage(save_path)
+        elif not isinstance(storage, LocalStorage) or storage.root.resolve() != Path(save_path).resolve():
+            raise ValueError(f"Stream {name} can only be stored locally, under its save_path")
+        super().__init__(name, save_path, storage=storage)
+        self.segment_bytes = segment_bytes
+        self.retention_bytes = retention_bytes
+        self.retention_seconds = retention_seconds
+
+    def on_pipeline_start(self):
+        super().on_pipeline_start()
+        self._pending: List[Any] = []
+        self._cursors_changed = False
+        # (base offset, record count) -> decoded records of the last segment read
+        self._segment_cache: Tuple[Optional[Tuple[int, int]], List[Any]] = (None, [])
+        # Same, for the prefetched segments that weren't read yet, added to from the
+        # scheduler's I/O pool
+        self._prefetched_segments: Dict[Tuple[int, int], List[Any]] = {}
+        self._prefetched_lock = threading.Lock()
+
+    def _get_index_path(self) -> Path:
+        return self.save_path / "index.json"
+
+    def _get_cursors_path(self) -> Path:
+        return self.save_path / "cursors.json"
+
+    def _get_segment_path(self, base: int) -> Path:
+        return self.save_path / "segments" / f"{base:020d}.log"
+
+    def _load(self, attrs: Tuple[str, ...]):
+        if "_index" in attrs:
+            # Index entries are [base offset, record count, size in bytes, last append time]
+            index_path = self._get_index_path()
+            self._index = json.loads(index_path.read_text()) if index_path.exists() else []
+            if self._index:
+                # Drop the tail of an append that wasn't recorded in the index
+                base, _, size, _ = self._index[-1]
+                with self._get_segment_path(base).open("r+b") as f:
+                    f.truncate(size)
+        if "_cursors" in attrs:
+            cursors_path = self._get_cursors_path()
+            self._cursors = json.loads(cursors_path.read_text()) if cursors_path.exists() else {}
+
+    @property
+    def start_offset(self) -> int:
+        return self._index[0][0] if self._index else 0
+
+    @property
+    def committed_offset(self) -> int:
+        if not self._index:
+            return 0
+        base, count, _, _ = self._index[-1]
+        return base + count
+
+    @property
+    def end_offset(self) -> int:
+        return self.committed_offset + len(self._pending)
+
+    def append(self, value: Any) -> int:
+        self._pending.append(value)
+        return self.end_offset - 1
+
+    def extend(self, values: Iterable[Any]):
+        self._pending.extend(_as_list(values))
+
+    def get(self, offset: int) -> Any:
+        if offset < self.start_offset or offset >= self.end_offset:
+            raise ValueError("Offset out of bounds")
+        if offset >= self.committed_offset:
+            return self._pending[offset - self.committed_offset]
+        return next(iter(self._iter_committed(offset, offset + 1)))
+
+    def get_many(self, offsets: Iterable[int]) -> List[Any]:
+        """
+        Like `get` for each offset, reading each committed segment once.
+        """
+        offsets = _as_list(offsets)
+        if not offsets:
+            return []
+        start, end, committed = self.start_offset, self.end_offset, self.committed_offset
+        if min(offsets) < start or max(offsets) >= end:
+            raise ValueError("Offset out of bounds")
+        bases = [entry[0] for entry in self._index]
+        records: Dict[int, Any] = {}
+        for offset in sorted(set(offsets)):
+            if offset >= committed:
+                records[offset] = self._pending[offset - committed]
+            else:
+                base, count, _, _ = self._index[bisect.bisect_right(bases, offset) - 1]
+                records[offset] = self._read_segment(base, count)[offset - base]
+        return [records[offset] for offset in offsets]
+
+    def read(self, consumer: str, max_records: Optional[int] = None) -> List[Tuple[int, Any]]:
+        """
+        Returns the next batch of (offset, record) pairs for the consumer, including
+        the unsaved ones, and moves its cursor past them. A new consumer starts from
+        the oldest retained record.
+        """
+        start = max(self._cursors.get(consumer, self.start_offset), self.start_offset)
+        end = self.end_offset if max_records is None else min(self.end_offset, start + max_records)
+        records = list(zip(range(start, end), self._iter_range(start, end)))
+        self.seek(consumer, end)
+        return records
+
+    def seek(self, consumer: str, offset: int):
+        self._cursors[consumer] = offset
+        self._cursors_changed = True
+
+    def lag(self, consumer: str) -> int:
+        return self.end_offset - max(self._cursors.get(consumer, self.start_offset), self.start_offset)
+
+    def _iter_range(self, start: int, end: int) -> Iterator[Any]:
+        committed = self.committed_offset
+        if start < committed:
+            yield from self._iter_committed(start, min(end, committed))
+        for offset in range(max(start, committed), end):
+            yield self._pending[offset - committed]
+
+    def _iter_committed(self, start: int, end: int) -> Iterator[Any]:
+        for base, count, _, _ in self._index:
+            if base + count <= start:
+                continue
+            if base >= end:
+                break
+            records = self._read_segment(base, count)
+            yield from records[max(start - base, 0):min(end - base, count)]
+
+    def prefetch(self, keys: Iterable[Any]):
+        """
+        Decodes the committed segments holding the given offsets or ranges of offsets
+        ahead of time.
+        """
+        for offsets in keys:
+            if isinstance(offsets, int):
+                offsets = range(offsets, offsets + 1)
+            for base, count, _, _ in list(self._index):
+                if base + count <= offsets.start or base >= offsets.stop:
+                    continue
+                with self._prefetched_lock:
+                    cached = (base, count) in self._prefetched_segments or self._segment_cache[0] == (base, count)
+                if not cached:
+                    records = self._decode_segment(base, count)
+                    with self._prefetched_lock:
+                        self._prefetched_segments[(base, count)] = records
+                    self._count_prefetch("prefetched")
+
+    def _read_segment(self, base: int, count: int) -> List[Any]:
+        key, records = self._segment_cache
+        if key == (base, count):
+            return records
+        with self._prefetched_lock:
+            records = self._prefetched_segments.pop((base, count), None)
+        if records is not None:
+            self._count_prefetch("hits")
+        else:
+            self._count_prefetch("misses")
+            records = self._decode_segment(base, count)
+        self._segment_cache = ((base, count), records)
+        return records
+
+    def _decode_segment(self, base: int, count: int) -> List[Any]:
+        records = []
+        with self._get_segment_path(base).open("rb") as f:
+            for _ in range(count):
+                records.append(pickle.load(f))
+        return records
+
+    def changed(self) -> bool:
+        return len(self._pending) > 0
+
+    def memory_footprint(self) -> int:
+        return super().memory_footprint() + approximate_size(self._pending) + approximate_size(self._segment_cache[1])
+
+    def spill(self, target: Optional[int] = None) -> int:
+        with self._prefetched_lock:
+            prefetched, self._prefetched_segments = self._prefetched_segments, {}
+        freed = approximate_size(self._segment_cache[1]) + approximate_size(prefetched)
+        self._segment_cache = (None, [])
+        return freed
+
+    def save(self):
+        super().save()
+        if self._cursors_changed:
+            self._write_json_atomic(self._get_cursors_path(), self._cursors)
+            self._cursors_changed = False
+
+    def _save(self):
+        (self.save_path / "segments").mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        if not self._index or self._index[-1][2] >= self.segment_bytes:
+            self._index.append([self.committed_offset, 0, 0, now])
+
+        base, count, size, _ = self._index[-1]
+        raw = b"".join(pickle.dumps(value) for value in self._pending)
+        with self._get_segment_path(base).open("ab") as f:
+            f.write(raw)
+        self._index[-1] = [base, count + len(self._pending), size + len(raw), now]
+
+        expired = self._apply_retention(now)
+        self._write_json_atomic(self._get_index_path(), self._index)
+        # Only once the index no longer lists them, so that a crash in between
+        # leaves orphan segments rather than an index pointing at missing ones
+        for base in expired:
+            self._get_segment_path(base).unlink(missing_ok=True)
+
+    def _apply_retention(self, now: float) -> List[int]:
+        """
+        Drops the expired segments from the index, and returns their bases.
+        """
+        expired = []
+        total_size = sum(entry[2] for entry in self._index)
+        while len(self._index) > 1:
+            base, _, size, updated = self._index[0]
+            too_big = self.retention_bytes is not None and total_size > self.retention_bytes
+            too_old = self.retention_seconds is not None and now - updated > self.retention_seconds
+            if not too_big and not too_old:
+                break
+            self._index.pop(0)
+            expired.append(base)
+            total_size -= size
+        return expired
+
+    def _pending_changes(self) -> List[Change]:
+        committed = self.committed_offset
+        return [('append', committed + i, value) for i, value in enumerate(self._pending)]
+
+    def _clear_pending_changes(self):
+        self._pending.clear()
+        # The last segment grows on save, so its prefetched records are stale
+        with self._prefetched_lock:
+            wasted = len(self._prefetched_segments)
+            self._prefetched_segments.clear()
+        self._count_prefetch("wasted", wasted)
+
+    def _full_state_changes(self) -> Iterable[Change]:
+        for offset, value in zip(range(self.start_offset, self.end_offset), self._iter_range(self.start_offset, self.end_offset)):
+            yield ('append', offset, value)
+
+    def __len__(self):
+        return self.end_offset - self.start_offset
+
+    def __iter__(self):
+        return self._iter_range(self.start_offset, self.end_offset)
 
-    def _get_key_path(self, key: str) -> Path:
-        return self.save_path / f"{key}"
+    @staticmethod
+    def _write_json_atomic(path: Path, data: Any):
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data))
+        os.replace(tmp_path, path)
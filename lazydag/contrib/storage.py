@@ -0,0 +1,394 @@
+"""
+Key-value blob stores under which FS backed objects keep their data: the local
+filesystem, or an S3-compatible HTTP object store that several workers can share.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+import hashlib
+import hmac
+import http.client
+import os
+from pathlib import Path
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+import xml.etree.ElementTree as ET
+
+from lazydag.conf import settings
+
+
+class StorageError(Exception):
+    def __init__(self, method: str, path: str, status: int, body: bytes):
+        super().__init__(f"{method} {path} failed with status {status}: {body[:200]!r}")
+        self.status = status
+
+
+class Storage(ABC):
+    """
+    Flat mapping of keys to bytes. Keys starting with a dot are reserved for local
+    bookkeeping (e.g. the change feed) and are never listed.
+
+    The batch methods are what remote stores make fast; the defaults just loop.
+    """
+    @abstractmethod
+    def read(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def write(self, key: str, data: bytes):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def list(self) -> Iterator[str]:
+        pass
+
+    def read_many(self, keys: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        return {key: self.read(key) for key in keys}
+
+    def write_many(self, items: Dict[str, Optional[bytes]]):
+        """
+        Writes every item, deleting the keys mapped to None.
+        """
+        for key, data in items.items():
+            if data is None:
+                self.delete(key)
+            else:
+                self.write(key, data)
+
+    def clear(self):
+        self.write_many({key: None for key in list(self.list())})
+
+
+# POSIX only, where rename replaces atomically like os.replace
+_DIR_FD_SUPPORTED = {os.open, os.unlink, os.rename} <= os.supports_dir_fd
+_READ_SIZE = 1 << 16
+
+
+def _read_fd(fd: int) -> bytes:
+    data = os.read(fd, _READ_SIZE)
+    if len(data) < _READ_SIZE:
+        return data
+    chunks = [data]
+    while chunk := os.read(fd, 1 << 20):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def write(self, key: str, data: bytes):
+        # Replace atomically so that concurrent readers never see partial files
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.root / f".{key}.tmp"
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, self.root / key)
+
+    def delete(self, key: str):
+        (self.root / key).unlink(missing_ok=True)
+
+    # The batch methods open the files relative to a descriptor of the root, which
+    # saves resolving its path for each file, and skip the file objects: for small
+    # files, both cost more than the I/O itself
+
+    def read_many(self, keys: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        if not _DIR_FD_SUPPORTED:
+            return super().read_many(keys)
+        result = {}
+        try:
+            dir_fd = os.open(self.root, os.O_RDONLY)
+        except FileNotFoundError:
+            return dict.fromkeys(keys)
+        try:
+            for key in keys:
+                try:
+                    fd = os.open(key, os.O_RDONLY, dir_fd=dir_fd)
+                except FileNotFoundError:
+                    result[key] = None
+                    continue
+                try:
+                    result[key] = _read_fd(fd)
+                finally:
+                    os.close(fd)
+        finally:
+            os.close(dir_fd)
+        return result
+
+    def write_many(self, items: Dict[str, Optional[bytes]]):
+        if not items:
+            return
+        if not _DIR_FD_SUPPORTED:
+            return super().write_many(items)
+        self.root.mkdir(parents=True, exist_ok=True)
+        dir_fd = os.open(self.root, os.O_RDONLY)
+        try:
+            for key, data in items.items():
+                if data is None:
+                    try:
+                        os.unlink(key, dir_fd=dir_fd)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                tmp_key = f".{key}.tmp"
+                fd = os.open(tmp_key, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666, dir_fd=dir_fd)
+                try:
+                    view = memoryview(data)
+                    while view:
+                        view = view[os.write(fd, view):]
+                finally:
+                    os.close(fd)
+                os.rename(tmp_key, key, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def list(self) -> Iterator[str]:
+        if not self.root.exists():
+            return
+        for file in self.root.iterdir():
+            # Skip temporary files of an ongoing write and the reserved keys
+            if not file.name.startswith(".") and file.is_file():
+                yield file.name
+
+
+class _ConnectionPool:
+    """
+    Keep-alive HTTP connections to one host, reused across requests and threads.
+    At most `size` requests are in flight at once.
+    """
+    def __init__(self, endpoint: str, size: int, timeout: float):
+        url = urlsplit(endpoint)
+        self._connection_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        self.host = url.hostname
+        self.port = url.port
+        self.netloc = url.netloc
+        self._timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self.connections_opened = 0
+
+    def request(self, method: str, path: str, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        with self._slots:
+            conn, reused = self._acquire()
+            try:
+                try:
+                    response = self._send(conn, method, path, body, headers or {})
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                    if not reused:
+                        raise
+                    # The server closed an idle connection, nothing reached it
+                    conn.close()
+                    conn = self._new_connection()
+                    response = self._send(conn, method, path, body, headers or {})
+                data = response.read()
+            except Exception:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+
+    def _acquire(self) -> Tuple[http.client.HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            return self._new_connection(), False
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        self.connections_opened += 1
+        return self._connection_class(self.host, self.port, timeout=self._timeout)
+
+    @staticmethod
+    def _send(conn: http.client.HTTPConnection, method: str, path: str, body: bytes, headers: Dict[str, str]) -> http.client.HTTPResponse:
+        conn.request(method, path, body=body, headers=headers)
+        return conn.getresponse()
+
+
+def _find_all(element: ET.Element, tag: str) -> List[ET.Element]:
+    # S3 responses are namespaced, stand-ins often aren't
+    return [e for e in element.iter() if e.tag == tag or e.tag.endswith("}" + tag)]
+
+
+def _find_text(element: ET.Element, tag: str) -> Optional[str]:
+    found = _find_all(element, tag)
+    return found[0].text if found else None
+
+
+class HTTPStorage(Storage):
+    """
+    Keys stored as objects of an S3-compatible bucket, under a prefix.
+
+    Requests go over a pool of keep-alive connections. Batch reads and writes run
+    concurrently on that pool, and values larger than `multipart_threshold` are
+    uploaded as concurrent multipart uploads. Requests are signed with AWS
+    signature v4 when credentials are given.
+    """
+    PART_SIZE = 8 << 20
+
+    def __init__(self, endpoint: str, bucket: str, prefix: str = "", access_key: Optional[str] = None,
+                 secret_key: Optional[str] = None, region: str = "us-east-1", concurrency: int = 16,
+                 part_size: int = PART_SIZE, multipart_threshold: Optional[int] = None, timeout: float = 30):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.part_size = part_size
+        self.multipart_threshold = multipart_threshold if multipart_threshold is not None else part_size
+        self._pool = _ConnectionPool(endpoint, concurrency, timeout)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="storage")
+        # Parts get their own threads, so that a batch of big writes can't starve them
+        self._part_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="storage-part")
+
+    def with_prefix(self, prefix: str) -> "HTTPStorage":
+        """
+        The same bucket under another prefix, sharing connections and threads.
+        """
+        storage = object.__new__(HTTPStorage)
+        storage.__dict__.update(self.__dict__)
+        storage.prefix = prefix
+        return storage
+
+    def read(self, key: str) -> Optional[bytes]:
+        status, _, data = self._request("GET", self._object_path(key), ok=(200, 404))
+        return data if status == 200 else None
+
+    def write(self, key: str, data: bytes):
+        if len(data) > self.multipart_threshold:
+            self._write_multipart(key, data)
+        else:
+            self._request("PUT", self._object_path(key), body=data)
+
+    def delete(self, key: str):
+        self._request("DELETE", self._object_path(key), ok=(200, 204, 404))
+
+    def list(self) -> Iterator[str]:
+        query = {"list-type": "2", "prefix": self.prefix, "delimiter": "/"}
+        while True:
+            _, _, data = self._request("GET", self._bucket_path(), query)
+            root = ET.fromstring(data)
+            for contents in _find_all(root, "Contents"):
+                key = _find_text(contents, "Key")[len(self.prefix):]
+                if key and not key.startswith("."):
+                    yield key
+            if _find_text(root, "IsTruncated") != "true":
+                return
+            query["continuation-token"] = _find_text(root, "NextContinuationToken")
+
+    def read_many(self, keys: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        keys = list(keys)
+        return dict(zip(keys, self._executor.map(self.read, keys)))
+
+    def write_many(self, items: Dict[str, Optional[bytes]]):
+        def write(item):
+            key, data = item
+            if data is None:
+                self.delete(key)
+            else:
+                self.write(key, data)
+        # Consuming the results re-raises the first failure
+        list(self._executor.map(write, items.items()))
+
+    def _write_multipart(self, key: str, data: bytes):
+        path = self._object_path(key)
+        _, _, response = self._request("POST", path, {"uploads": ""})
+        upload_id = _find_text(ET.fromstring(response), "UploadId")
+
+        def upload_part(part_number: int) -> str:
+            start = (part_number - 1) * self.part_size
+            part = data[start:start + self.part_size]
+            _, headers, _ = self._request("PUT", path, {"partNumber": str(part_number), "uploadId": upload_id}, part)
+            return headers["etag"]
+
+        part_numbers = range(1, (len(data) + self.part_size - 1) // self.part_size + 1)
+        try:
+            etags = list(self._part_executor.map(upload_part, part_numbers))
+            body = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{etag}</ETag></Part>"
+                for number, etag in zip(part_numbers, etags)
+            )
+            self._request("POST", path, {"uploadId": upload_id},
+                          f"<CompleteMultipartUpload>{body}</CompleteMultipartUpload>".encode())
+        except Exception:
+            self._request("DELETE", path, {"uploadId": upload_id}, ok=(200, 204, 404))
+            raise
+
+    def _bucket_path(self) -> str:
+        return "/" + quote(self.bucket, safe="-_.~")
+
+    def _object_path(self, key: str) -> str:
+        return self._bucket_path() + "/" + quote(self.prefix + key, safe="/-_.~")
+
+    def _request(self, method: str, path: str, query: Optional[Dict[str, str]] = None, body: bytes = b"",
+                 ok: Tuple[int, ...] = (200,)) -> Tuple[int, Dict[str, str], bytes]:
+        query_string = "&".join(
+            f"{quote(k, safe='-_.~')}={quote(v, safe='-_.~')}" for k, v in sorted((query or {}).items())
+        )
+        headers = self._sign(method, path, query_string, body) if self.access_key is not None else {}
+        full_path = f"{path}?{query_string}" if query_string else path
+        status, response_headers, data = self._pool.request(method, full_path, body, headers)
+        if status not in ok:
+            raise StorageError(method, full_path, status, data)
+        return status, response_headers, data
+
+    def _sign(self, method: str, path: str, query_string: str, body: bytes) -> Dict[str, str]:
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date = now.strftime("%Y%m%d")
+        payload_hash = hashlib.sha256(body).hexdigest()
+        headers = {"host": self._pool.netloc, "x-amz-content-sha256": payload_hash, "x-amz-date": amz_date}
+        signed_headers = ";".join(sorted(headers))
+        canonical_request = "\n".join([
+            method, path, query_string,
+            "".join(f"{name}:{headers[name]}\n" for name in sorted(headers)),
+            signed_headers, payload_hash,
+        ])
+        scope = f"{date}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join([
+            "AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(canonical_request.encode()).hexdigest(),
+        ])
+        key = ("AWS4" + self.secret_key).encode()
+        for part in (date, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+        headers["authorization"] = (
+            f"AWS4-HMAC-SHA256 Credential={self.access_key}/{scope}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+        return headers
+
+
+@lru_cache(maxsize=None)
+def _get_remote_storage() -> Optional[HTTPStorage]:
+    # One client per process, so that every object shares its connections
+    remote = settings.FS_OBJECTS.get("remote")
+    if remote is None:
+        return None
+    return HTTPStorage(**remote)
+
+
+def get_storage(obj_name: str, save_path: Path) -> Storage:
+    """
+    Returns the storage of an object: the bucket configured by
+    FS_OBJECTS["remote"] (the keyword arguments of HTTPStorage) under a prefix
+    named after the object if any, its save_path otherwise.
+    """
+    remote = _get_remote_storage()
+    if remote is None:
+        return LocalStorage(save_path)
+    return remote.with_prefix(f"{remote.prefix}{obj_name}/")
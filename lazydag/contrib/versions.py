@@ -0,0 +1,272 @@
+import hashlib
+import itertools
+import json
+import os
+from pathlib import Path
+import re
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from lazydag.conf import settings
+from lazydag.contrib.storage import LocalStorage
+
+
+class VersionStore:
+    """
+    Content-addressed history of the on-disk state of FS backed objects.
+
+    Each committed version of an object is a small manifest mapping the files under
+    its save_path to the hashes of their chunks. Chunks are stored once under
+    `chunks/`, named by their hash, and shared between versions and objects, so
+    keeping N versions costs roughly the size of the changes between them.
+
+    Chunk boundaries depend on the content around them rather than on offsets, so
+    inserting or removing bytes only changes the chunks around the edit, see
+    `chunk_boundaries`. Versions committed in the same pipeline step share a step
+    number, which `checkout` accepts to restore every object to a consistent point.
+    """
+    MIN_CHUNK_SIZE = 64 << 10
+    AVG_CHUNK_SIZE = 256 << 10
+    MAX_CHUNK_SIZE = 1 << 20
+    # Cuts are only considered after bytes of this class, which a regex finds at C
+    # speed, and made where the CRC of the preceding window matches a mask
+    _CUT_CANDIDATES = re.compile(b"[" + b"".join(re.escape(bytes([b])) for b in range(256) if b & 0x0F == 0x05) + b"]")
+    _CUT_WINDOW = 48
+    # Bounds the work on degenerate content (e.g. long runs of a candidate byte)
+    _MAX_CANDIDATES = 1 << 14
+    # Files modified more recently than this may change again without their
+    # (size, mtime) changing, due to the filesystem's timestamp granularity
+    RACY_WINDOW_NS = 2 * 10**9
+
+    def __init__(self, root: Path, keep: Optional[int] = None, min_chunk_size: int = MIN_CHUNK_SIZE,
+                 avg_chunk_size: int = AVG_CHUNK_SIZE, max_chunk_size: int = MAX_CHUNK_SIZE):
+        if not min_chunk_size < avg_chunk_size < max_chunk_size:
+            raise ValueError("Chunk sizes must satisfy min < avg < max")
+        self.root = Path(root)
+        self.keep = keep
+        self.min_chunk_size = min_chunk_size
+        self.avg_chunk_size = avg_chunk_size
+        self.max_chunk_size = max_chunk_size
+        # One in 16 bytes is a candidate, so this makes chunks average avg_chunk_size
+        self._cut_mask = (1 << max(0, ((avg_chunk_size - min_chunk_size) // 16).bit_length() - 1)) - 1
+        # (size, mtime_ns) -> chunk hashes of files we've already hashed, per path
+        self._stat_cache: Dict[Path, Tuple[Tuple[int, int], List[str]]] = {}
+
+    def check_objects(self, objects: Iterable[Any]):
+        """
+        Raises ValueError if some of the objects keep their data out of their
+        save_path, e.g. on a remote storage, since their versions would miss it.
+        """
+        remote = []
+        for obj in objects:
+            storage = getattr(obj, "storage", None)
+            if storage is None:
+                continue
+            if not isinstance(storage, LocalStorage) or storage.root.resolve() != Path(obj.save_path).resolve():
+                remote.append(obj.name)
+        if remote:
+            raise ValueError(
+                f"Objects {', '.join(sorted(remote))} aren't stored under their save_path, so they can't be "
+                "versioned; unset FS_OBJECTS['versions_dir'] or store them locally"
+            )
+
+    def track_objects(self, objects: Iterable[Any]):
+        """
+        Checks the objects (see `check_objects`) and has them pickle their data
+        stably, so that their versions share most of their chunks.
+        """
+        objects = list(objects)
+        self.check_objects(objects)
+        for obj in objects:
+            if hasattr(obj, "stable_pickling"):
+                obj.stable_pickling = True
+
+    def next_step(self) -> int:
+        """
+        Allocates the number of a pipeline step, for the commits made in it.
+        """
+        step_path = self.root / "last_step"
+        step = int(step_path.read_text()) + 1 if step_path.exists() else 1
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(step_path, str(step).encode())
+        return step
+
+    def commit(self, obj_name: str, save_path: Path, step: Optional[int] = None) -> int:
+        """
+        Record the current contents of save_path as a new version of the object,
+        made in the given step. Returns the new version, or the latest one if
+        nothing changed since.
+        """
+        files = {}
+        for file in sorted(save_path.rglob("*")):
+            if file.is_file():
+                files[file.relative_to(save_path).as_posix()] = self._store_file(file)
+
+        versions = self.versions(obj_name)
+        if versions and self._read_manifest(obj_name, versions[-1])["files"] == files:
+            return versions[-1]
+
+        version = versions[-1] + 1 if versions else 1
+        manifest = {"version": version, "created": time.time(), "step": step, "files": files}
+        manifest_path = self._get_manifest_path(obj_name, version)
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_atomic(manifest_path, json.dumps(manifest).encode())
+
+        if self.keep is not None:
+            for old_version in versions[:max(0, len(versions) + 1 - self.keep)]:
+                self._get_manifest_path(obj_name, old_version).unlink()
+        return version
+
+    def checkout(self, obj_name: str, version: Optional[int], save_path: Path, step: Optional[int] = None):
+        """
+        Restore save_path to the given version of the object, or to the version it
+        had at the end of the given step.
+        """
+        if step is not None:
+            version = self.version_at_step(obj_name, step)
+        manifest = self._read_manifest(obj_name, version)
+        save_path.mkdir(parents=True, exist_ok=True)
+        for file in list(save_path.rglob("*")):
+            if file.is_file() and file.relative_to(save_path).as_posix() not in manifest["files"]:
+                file.unlink()
+        for rel_path, hashes in manifest["files"].items():
+            file = save_path / rel_path
+            file.parent.mkdir(parents=True, exist_ok=True)
+            with file.open("wb") as f:
+                for digest in hashes:
+                    f.write(self._get_chunk_path(digest).read_bytes())
+
+    def versions(self, obj_name: str) -> List[int]:
+        manifest_dir = self.root / "manifests" / obj_name
+        if not manifest_dir.exists():
+            return []
+        return sorted(int(file.stem) for file in manifest_dir.glob("*.json"))
+
+    def version_at_step(self, obj_name: str, step: int) -> int:
+        """
+        The latest version committed in or before the step. Versions committed
+        without a step number count as older than any step.
+        """
+        for version in reversed(self.versions(obj_name)):
+            if (self._read_manifest(obj_name, version).get("step") or 0) <= step:
+                return version
+        raise ValueError(f"Object {obj_name} has no version at step {step}")
+
+    def version_info(self, obj_name: str, version: int) -> dict:
+        manifest = self._read_manifest(obj_name, version)
+        hashes = {digest for file_hashes in manifest["files"].values() for digest in file_hashes}
+        return {
+            "version": version,
+            "created": manifest["created"],
+            "step": manifest.get("step"),
+            "files": len(manifest["files"]),
+            "chunks": len(hashes),
+        }
+
+    def prune(self, keep: int, obj_names: Optional[List[str]] = None) -> int:
+        """
+        Keep only the latest `keep` versions of the given objects (all by default),
+        then delete the chunks no remaining version refers to.
+        Returns the number of deleted chunks.
+        """
+        if obj_names is None:
+            manifests_root = self.root / "manifests"
+            obj_names = [d.name for d in manifests_root.iterdir()] if manifests_root.exists() else []
+        for obj_name in obj_names:
+            versions = self.versions(obj_name)
+            for version in versions[:max(0, len(versions) - keep)]:
+                self._get_manifest_path(obj_name, version).unlink()
+        return self.gc()
+
+    def gc(self) -> int:
+        referenced: Set[str] = set()
+        for manifest_path in (self.root / "manifests").glob("*/*.json"):
+            manifest = json.loads(manifest_path.read_text())
+            for hashes in manifest["files"].values():
+                referenced.update(hashes)
+
+        removed = 0
+        for chunk_path in (self.root / "chunks").glob("*/*"):
+            if chunk_path.name not in referenced:
+                chunk_path.unlink()
+                removed += 1
+        return removed
+
+    def _store_file(self, file: Path) -> List[str]:
+        stat_key = self._stat_key(file)
+        cached = self._stat_cache.get(file)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+
+        hashes = []
+        data = file.read_bytes()
+        start = 0
+        for end in self.chunk_boundaries(data):
+            chunk = data[start:end]
+            start = end
+            digest = hashlib.sha256(chunk).hexdigest()
+            chunk_path = self._get_chunk_path(digest)
+            # Identical chunks are shared, never rewritten
+            if not chunk_path.exists():
+                chunk_path.parent.mkdir(parents=True, exist_ok=True)
+                self._write_atomic(chunk_path, chunk)
+            hashes.append(digest)
+        if time.time_ns() - stat_key[1] > self.RACY_WINDOW_NS:
+            self._stat_cache[file] = (stat_key, hashes)
+        return hashes
+
+    def chunk_boundaries(self, data: bytes) -> List[int]:
+        """
+        End offsets of the chunks of data. A chunk ends after a candidate byte whose
+        preceding window hashes to zero under the mask, and is between the min and
+        max chunk sizes long (except for the last one).
+        """
+        boundaries = []
+        start, size = 0, len(data)
+        while start < size:
+            end = min(size, start + self.max_chunk_size)
+            cut = end
+            if end - start > self.min_chunk_size:
+                candidates = self._CUT_CANDIDATES.finditer(data, start + self.min_chunk_size - 1, end)
+                for match in itertools.islice(candidates, self._MAX_CANDIDATES):
+                    position = match.end()
+                    if not zlib.crc32(data[position - self._CUT_WINDOW:position]) & self._cut_mask:
+                        cut = position
+                        break
+            boundaries.append(cut)
+            start = cut
+        return boundaries
+
+    def _read_manifest(self, obj_name: str, version: int) -> dict:
+        manifest_path = self._get_manifest_path(obj_name, version)
+        if not manifest_path.exists():
+            raise ValueError(f"Version {version} of object {obj_name} does not exist")
+        return json.loads(manifest_path.read_text())
+
+    def _get_manifest_path(self, obj_name: str, version: int) -> Path:
+        return self.root / "manifests" / obj_name / f"{version:08d}.json"
+
+    def _get_chunk_path(self, digest: str) -> Path:
+        return self.root / "chunks" / digest[:2] / digest
+
+    @staticmethod
+    def _stat_key(file: Path) -> Tuple[int, int]:
+        stat = file.stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+
+def get_version_store() -> Optional[VersionStore]:
+    """
+    Returns the version store configured by FS_OBJECTS["versions_dir"], if any.
+    """
+    versions_dir = settings.FS_OBJECTS.get("versions_dir")
+    if versions_dir is None:
+        return None
+    return VersionStore(Path(versions_dir), keep=settings.FS_OBJECTS.get("versions_keep"))
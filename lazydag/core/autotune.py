@@ -0,0 +1,138 @@
+"""
+Adaptive parallelism: resizes the resource class pools of a running scheduler,
+see `Scheduler(autotuner=...)`.
+"""
+import json
+import math
+from pathlib import Path
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class ClassSample:
+    """
+    What a resource class did during one step.
+    """
+    def __init__(self, capacity: int, runs: int, busy_time: float, queue_wait: float):
+        self.capacity = capacity
+        self.runs = runs
+        self.busy_time = busy_time
+        self.queue_wait = queue_wait
+
+
+class _ClassState:
+    def __init__(self):
+        self.samples: List[Tuple[float, ClassSample]] = []
+        # Capacity and mean makespan before the last grow, until it is evaluated
+        self.trial: Optional[Tuple[int, float]] = None
+        # A grow that didn't pay off isn't retried above this capacity for a while
+        self.ceiling: Optional[int] = None
+        self.ceiling_until = 0
+
+
+class Autotuner:
+    """
+    Grows the pool of a resource class while its polls queue up for workers, and
+    shrinks it while its workers sit idle. Every decision is made on a window of
+    `window` busy steps, and the gap between the thresholds keeps it from
+    oscillating:
+
+      grow: queue wait is more than `grow_queue_wait` of the step, and the step is
+            slower than `target_latency` (when given; otherwise throughput is the
+            target and any queueing counts)
+      shrink: workers are busy less than `low_utilization` of the time, polls
+            wait for a worker less than `idle_queue_wait` of the step (dispatching
+            always takes a little), and the step is well within `target_latency`
+            if given
+
+    Classes that ran nothing in a window are left as they are.
+
+    A grow is kept only if the next window's steps are at least `min_gain`
+    faster; otherwise it is reverted and the class isn't grown past that size for
+    `retry_after` steps, which stops CPU-bound classes from growing uselessly.
+    Capacities stay within `bounds` per class, (1, 4 times the initial capacity)
+    for classes without bounds. Decisions are printed, kept in `decisions`, and
+    appended to `log_path` as JSON lines if given.
+    """
+    def __init__(self, target_latency: Optional[float] = None, bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+                 window: int = 5, grow_queue_wait: float = 0.1, idle_queue_wait: float = 0.01, low_utilization: float = 0.3,
+                 min_gain: float = 0.05, retry_after: int = 100, log_path: Optional[Path] = None):
+        self.target_latency = target_latency
+        self.bounds: Dict[str, Tuple[int, int]] = dict(bounds or {})
+        self.window = window
+        self.grow_queue_wait = grow_queue_wait
+        self.idle_queue_wait = idle_queue_wait
+        self.low_utilization = low_utilization
+        self.min_gain = min_gain
+        self.retry_after = retry_after
+        self.log_path = log_path
+        self.decisions: List[Dict[str, Any]] = []
+        self._states: Dict[str, _ClassState] = {}
+        self._steps = 0
+
+    def observe(self, makespan: float, samples: Dict[str, ClassSample]) -> Dict[str, int]:
+        """
+        Records a step and returns the new capacities of the classes to resize.
+        """
+        self._steps += 1
+        resizes = {}
+        for name, sample in samples.items():
+            if name not in self.bounds:
+                self.bounds[name] = (1, 4 * sample.capacity)
+            state = self._states.setdefault(name, _ClassState())
+            state.samples.append((makespan, sample))
+            if len(state.samples) < self.window:
+                continue
+            capacity = self._decide(name, state)
+            state.samples = []
+            if capacity is not None:
+                resizes[name] = capacity
+        return resizes
+
+    def _decide(self, name: str, state: _ClassState) -> Optional[int]:
+        capacity = state.samples[-1][1].capacity
+        total_time = sum(makespan for makespan, _ in state.samples)
+        mean_makespan = total_time / len(state.samples)
+        runs = sum(sample.runs for _, sample in state.samples)
+        busy = sum(sample.busy_time for _, sample in state.samples)
+        wait = sum(sample.queue_wait for _, sample in state.samples)
+        if runs == 0:
+            # Unused, nothing tells how big the class should be
+            state.trial = None
+            return None
+        utilization = busy / (capacity * total_time) if total_time > 0 else 0
+        # Average wait for a worker, relative to the step
+        queue_share = wait / runs / mean_makespan if runs and mean_makespan > 0 else 0
+        metrics = {"makespan": mean_makespan, "utilization": utilization, "queue_share": queue_share}
+        low, high = self.bounds[name]
+
+        if state.trial is not None:
+            old_capacity, old_makespan = state.trial
+            state.trial = None
+            if mean_makespan > old_makespan * (1 - self.min_gain):
+                state.ceiling, state.ceiling_until = old_capacity, self._steps + self.retry_after
+                return self._log(name, capacity, old_capacity, f"growing from {old_capacity} didn't speed up the steps", metrics)
+
+        ceiling = state.ceiling if state.ceiling is not None and self._steps < state.ceiling_until else high
+        too_slow = self.target_latency is None or mean_makespan > self.target_latency
+        if queue_share > self.grow_queue_wait and too_slow and capacity < min(high, ceiling):
+            new_capacity = min(high, ceiling, max(capacity + 1, math.ceil(capacity * 1.5)))
+            state.trial = (capacity, mean_makespan)
+            return self._log(name, capacity, new_capacity, "polls are queueing for workers", metrics)
+
+        fast_enough = self.target_latency is None or mean_makespan < self.target_latency * 0.8
+        idle_queue = total_time > 0 and wait / total_time < self.idle_queue_wait
+        if utilization < self.low_utilization and idle_queue and fast_enough and capacity > low:
+            return self._log(name, capacity, capacity - 1, "workers are mostly idle", metrics)
+        return None
+
+    def _log(self, name: str, old: int, new: int, reason: str, metrics: Dict[str, float]) -> int:
+        decision = {"time": time.time(), "class": name, "from": old, "to": new, "reason": reason, **metrics}
+        self.decisions.append(decision)
+        print(f"Autotune: {name} workers {old} -> {new}, {reason} "
+              f"(step {metrics['makespan'] * 1000:.1f}ms, {metrics['utilization']:.0%} utilization, "
+              f"{metrics['queue_share']:.0%} queue wait)")
+        if self.log_path is not None:
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(decision) + "\n")
+        return new
@@ -3,7 +3,10 @@ it's hard to decide on the files for these codes
 I'll write them here for now
 """
 import importlib
+import itertools
 from pathlib import Path
+import sys
+from typing import Any
 from lazydag.conf import settings
 
 
@@ -15,3 +18,42 @@ def scaffold_data_dir(data_root: Path):
 def get_processes_and_objects():
     module = importlib.import_module(settings.PY_MODULE)
     return module.processes, module.objects
+
+
+def approximate_size(value: Any, samples: int = 100) -> int:
+    """
+    Approximate deep size in bytes of a value. The items of big containers are
+    sampled, and the size of the sample is extrapolated to the whole container.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        sample = list(itertools.islice(value.items(), samples))
+    elif isinstance(value, (list, tuple)):
+        sample = value[::max(1, len(value) // samples)]
+    elif isinstance(value, (set, frozenset)):
+        sample = list(itertools.islice(value, samples))
+    else:
+        return _deep_size(value, depth=3)
+    if not sample:
+        return size
+    sample_size = sum(_deep_size(item, depth=3) for item in sample)
+    return size + sample_size * len(value) // len(sample)
+
+
+def _deep_size(value: Any, depth: int) -> int:
+    size = sys.getsizeof(value)
+    if depth == 0:
+        return size
+    if isinstance(value, dict):
+        return size + sum(_deep_size(k, depth - 1) + _deep_size(v, depth - 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(_deep_size(item, depth - 1) for item in value)
+    return size
+
+
+def format_size(num_bytes: float) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if abs(num_bytes) < 1024:
+            return f"{num_bytes:.1f}{unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f}TB"
@@ -1,14 +1,32 @@
 from abc import ABC
+import copy
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 
 class Object(ABC):
     """
     Base class for all objects.
     """
+    # Objects that don't keep their state across runs can have the scheduler
+    # recompute it on start, by re-running their producer from scratch
+    rebuild_on_start: bool = False
+    # Called with the object after it loaded state from disk, set by the scheduler
+    # to keep the pipeline within its memory budget
+    on_load: Optional[Callable[["Object"], None]] = None
 
     def __init__(self, name: str):
         self.name = name
 
+    def clone(self, name: str) -> "Object":
+        """
+        An empty copy of the object, as constructed, under another name, e.g. for
+        the variants of a parameter sweep (see lazydag.core.sweep). Called before
+        the pipeline starts.
+        """
+        clone = copy.copy(self)
+        clone.name = name
+        return clone
+
     def on_add_to_pipeline(self):
         """
         This function is called once the object is added to the pipeline.
@@ -27,12 +45,115 @@ class Object(ABC):
         """
         pass
 
+    def preload(self):
+        """
+        This function may be called after on_pipeline_start, typically from a
+        background thread, to load the state of the object ahead of its first access.
+        It must be safe to call concurrently with the object being accessed.
+        """
+        pass
+
+    def prefetch(self, keys: Iterable[Any]):
+        """
+        This function is called from a background thread with the keys (or ranges
+        of indices/offsets, depending on the object) a process is about to read, see
+        `Process.prefetch`. The object may load their committed values ahead of
+        time. By default, the whole object is preloaded.
+        """
+        self.preload()
+
+    def prefetch_stats(self) -> Optional[Dict[str, int]]:
+        """
+        Counters of the prefetched reads since the pipeline started: "prefetched",
+        "hits" (prefetched values that were read), "misses" (values read without a
+        prefetch) and "wasted" (prefetched values dropped without being read),
+        or None if the object doesn't track them.
+        """
+        return None
+
     def on_pipeline_end(self):
         """
         This function is called once the pipeline execution ends.
         """
         pass
 
+    def memory_footprint(self) -> int:
+        """
+        Approximate number of bytes the object currently holds in memory.
+        """
+        return 0
+
+    def spill(self, target: Optional[int] = None) -> int:
+        """
+        This function is called when the pipeline is over its memory budget.
+        The object should drop whatever in-memory state it can recover from disk on
+        its next access, coldest first, until it freed about `target` bytes if given,
+        and return the approximate number of bytes it freed.
+        """
+        return 0
+
+    def changed(self) -> bool:
+        """
+        Whether the object has unsaved changes.
+        """
+        return False
+
+    def change_count(self) -> int:
+        """
+        Number of unsaved changes, e.g. for batching trigger policies.
+        """
+        return 1 if self.changed() else 0
+
+    def pending_changes(self) -> Optional[List[Tuple[Any, ...]]]:
+        """
+        The unsaved changes, in the order they were made, or None if the object
+        doesn't track them. Used to record the output of source processes.
+        """
+        return None
+
+    def apply_changes(self, changes: Iterable[Tuple[Any, ...]]):
+        """
+        Makes the changes returned by `pending_changes`, e.g. when replaying a
+        recorded run.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't apply recorded changes")
+
+    def forget_consumer(self, consumer: str):
+        """
+        Drops whatever the object remembers about what the consumer has already read,
+        so that the consumer starts over on its next read.
+        """
+        pass
+
+    def consumer_offset(self, consumer: str) -> Optional[int]:
+        """
+        Position of the consumer in the changes of the object, as the next save
+        persists it, for objects that remember what their consumers read.
+        """
+        return None
+
+    def restore_consumer_offset(self, consumer: str, offset: int):
+        """
+        Moves the consumer forward to an offset saved along with its outputs (see
+        `set_input_offsets`), in case the object's own record of it lags behind,
+        e.g. after a crash between the two saves.
+        """
+        pass
+
+    def set_input_offsets(self, offsets: Dict[str, int]):
+        """
+        Sets the offsets of the object's producer in its inputs, by input object
+        name, for the next save to persist atomically with the data if the object
+        can, so that a restart never applies the same changes twice.
+        """
+        pass
+
+    def saved_input_offsets(self) -> Dict[str, int]:
+        """
+        The input offsets persisted with the saved data, see `set_input_offsets`.
+        """
+        return {}
+
     def save(self):
         """
         This function is called once one iteration of the pipeline is completed.
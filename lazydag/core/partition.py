@@ -0,0 +1,142 @@
+"""
+Views used to run the poll of a partitioned process once per shard, see
+`Process.partition_by`.
+"""
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+import zlib
+
+from .object import Object
+
+
+def shard_of(key: Any, num_shards: int) -> int:
+    # Stable across runs, unlike hash() of strings
+    return zlib.crc32(str(key).encode()) % num_shards
+
+
+def split_keys(obj: Object, num_shards: int) -> List[List[Any]]:
+    """
+    The keys of a dict-like object, split by shard in a single pass.
+    """
+    shards: List[List[Any]] = [[] for _ in range(num_shards)]
+    for key in obj.keys():
+        shards[shard_of(key, num_shards)].append(key)
+    return shards
+
+
+class ShardView:
+    """
+    Read view of the part of an object assigned to one shard.
+
+    Dict-like objects (the ones with `keys`) are split by a stable hash of their
+    keys, and their changes are filtered the same way; `keys` is the shard's part
+    of `split_keys`, which the scheduler computes once for all the shards. Other
+    objects are split into contiguous ranges of their indices (offsets for
+    streams, which start at `start_offset`); the shard's global indices are in
+    `index_range`. Indexing takes global keys or indices, and only those of the
+    shard. Anything else is delegated to the object.
+    """
+    def __init__(self, obj: Object, shard: int, num_shards: int, keys: Optional[List[Any]] = None):
+        self._obj = obj
+        self.shard = shard
+        self.num_shards = num_shards
+        self._keyed = hasattr(obj, "keys")
+        if self._keyed:
+            self._keys = keys if keys is not None else split_keys(obj, num_shards)[shard]
+        else:
+            size = len(obj)
+            base = getattr(obj, "start_offset", 0)
+            self.index_range = range(base + size * shard // num_shards, base + size * (shard + 1) // num_shards)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._obj, name)
+
+    def _owns(self, key: Any) -> bool:
+        return shard_of(key, self.num_shards) == self.shard
+
+    def _check(self, key: Any):
+        owned = self._owns(key) if self._keyed else key in self.index_range
+        if not owned:
+            raise KeyError(f"{key!r} doesn't belong to shard {self.shard} of {self._obj}")
+
+    def __getitem__(self, key: Any) -> Any:
+        self._check(key)
+        return self._obj[key] if self._keyed else self._obj.get(key)
+
+    def __setitem__(self, key: Any, value: Any):
+        self._check(key)
+        self._obj.set(key, value)
+
+    def keys(self) -> Iterator[Any]:
+        return iter(self._keys)
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        return ((key, self._obj.get(key)) for key in self.keys())
+
+    def values(self) -> Iterator[Any]:
+        return (self._obj.get(key) for key in self.keys())
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._keyed:
+            return self.keys()
+        return (self._obj.get(idx) for idx in self.index_range)
+
+    def __len__(self):
+        if self._keyed:
+            return len(self._keys)
+        return len(self.index_range)
+
+    def __contains__(self, key: Any):
+        return self._owns(key) and key in self._obj
+
+    def iter_changes(self, consumer: str) -> Iterator[Tuple]:
+        if not self._keyed:
+            raise NotImplementedError("Changes of index-partitioned objects can't be split into shards")
+        for change in self._obj.iter_changes(consumer):
+            if change[0] == "clear" or self._owns(change[1]):
+                yield change
+
+
+class ShardWriter:
+    """
+    Output of one shard: reads go to the object, writes are buffered until every
+    shard is done and then replayed shard by shard, see `merge_shards`.
+    """
+    MUTATORS = {"set", "remove", "insert", "push", "clear", "append", "extend", "set_many", "remove_many"}
+
+    def __init__(self, obj: Object):
+        self._obj = obj
+        self.ops: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        if name in self.MUTATORS:
+            return lambda *args, **kwargs: self.ops.append((name, args, kwargs))
+        return getattr(self._obj, name)
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._obj[key]
+
+    def __setitem__(self, key: Any, value: Any):
+        self.ops.append(("set", (key, value), {}))
+
+    def __len__(self):
+        return len(self._obj)
+
+    def __iter__(self):
+        return iter(self._obj)
+
+    def __contains__(self, key: Any):
+        return key in self._obj
+
+
+def merge_shards(obj: Object, writers: Iterable[ShardWriter]):
+    """
+    Applies the writes of all shards to the object, in shard order, so the result
+    doesn't depend on which shard finished first. Shards usually reset their part
+    of the output with a clear, so clears are applied once, before anything else.
+    """
+    ops = [op for writer in writers for op in writer.ops]
+    if any(name == "clear" for name, _, _ in ops):
+        obj.clear()
+    for name, args, kwargs in ops:
+        if name != "clear":
+            getattr(obj, name)(*args, **kwargs)
@@ -2,3 +2,6 @@ from lazydag.conf import settings
 
 def get_pipeline_path():
     return settings.DATA_ROOT / "configs" / "pipeline.yaml"
+
+def get_pipeline_cache_path():
+    return settings.DATA_ROOT / "configs" / "pipeline.cache"
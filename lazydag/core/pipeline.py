@@ -1,6 +1,11 @@
 from typing import Dict, List, Optional, Set
 from pathlib import Path
-import yaml
+import hashlib
+import pickle
+
+# Part of the key of the cached pipelines, bump it when the attributes of Pipeline
+# change so that the pipelines cached by older versions are parsed again
+_CACHE_FORMAT = 1
 
 class Pipeline:
     def __init__(self):
@@ -8,26 +13,51 @@ class Pipeline:
         self.objects = dict()
 
     @classmethod
-    def from_yaml_file(cls, path: Path):
+    def from_yaml_file(cls, path: Path, cache_path: Optional[Path] = None):
+        """
+        Parses the pipeline from a yaml file. If cache_path is given, the parsed
+        pipeline is cached there, keyed on the contents of the yaml file and
+        _CACHE_FORMAT.
+        """
         if not path.exists():
             return None
 
+        raw = path.read_bytes()
+        digest = (_CACHE_FORMAT, hashlib.blake2b(raw, digest_size=16).digest())
+        if cache_path is not None and cache_path.exists():
+            try:
+                with open(cache_path, "rb") as f:
+                    cached_digest, pipeline = pickle.load(f)
+                if cached_digest == digest:
+                    return pipeline
+            except Exception:
+                # A corrupt or outdated cache is simply rebuilt
+                pass
+
+        # yaml is only needed on a cache miss, so it is imported lazily
+        import yaml
         self = cls()
-        with open(path, "r") as f:
-            cfg = yaml.safe_load(f)
+        cfg = yaml.load(raw, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
         for obj in cfg["objects"]:
             self.add_object(obj)
         for proc_name, proc in cfg["processes"].items():
             self.add_process(proc_name, inputs=proc.get("inputs", {}), outputs=proc.get("outputs", {}))
+
+        if cache_path is not None:
+            tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                pickle.dump((digest, self), f)
+            tmp_path.replace(cache_path)
         return self
 
     def to_yaml_file(self, path: Path):
+        import yaml
         data = {
             "objects": sorted(self.objects.keys()),
             "processes": self.processes,
         }
         with open(path, "w") as f:
-            yaml.safe_dump(data, f)
+            yaml.dump(data, f, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper))
 
     def add_object(self, name: str):
         if name in self.objects:
@@ -107,6 +137,39 @@ class Pipeline:
             raise ValueError("Graph contains a cycle")
         return topological_order
 
+    def upstream_processes(self, process_name: str) -> Set[Optional[str]]:
+        return {self.objects[obj]["producer"] for obj in self.processes[process_name]["inputs"].values()}
+
+    def downstream_processes(self, process_name: str) -> Set[str]:
+        return {
+            consumer
+            for obj in self.processes[process_name]["outputs"].values()
+            for consumer in self.objects[obj]["consumers"]
+        }
+
+    def linear_chains(self) -> List[List[str]]:
+        """
+        Returns the maximal chains of at least two processes in which every process
+        is the only consumer of its predecessor and only reads from it.
+        """
+        successor = {}
+        for proc in self.processes:
+            downstream = self.downstream_processes(proc)
+            if len(downstream) != 1:
+                continue
+            consumer = next(iter(downstream))
+            if self.upstream_processes(consumer) == {proc}:
+                successor[proc] = consumer
+
+        heads = set(successor) - set(successor.values())
+        chains = []
+        for head in sorted(heads):
+            chain = [head]
+            while chain[-1] in successor:
+                chain.append(successor[chain[-1]])
+            chains.append(chain)
+        return chains
+
     def process_inputs(self, process_name: str) -> Dict[str, str]:
         return self.processes[process_name]["inputs"]
 
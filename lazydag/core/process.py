@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import List
+import copy
+from typing import Any, Dict, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .trigger import TriggerPolicy
 
 class Process(ABC):
     """
@@ -9,10 +13,41 @@ class Process(ABC):
     inputs: List[str] = []
     outputs: List[str] = []
     has_daemon: bool = False
+    # Data-parallel execution: when set to an input port, the scheduler splits that
+    # input into `partitions` shards (by key for dict-like objects, by index range
+    # otherwise) and polls each shard concurrently. Writes to the outputs are
+    # buffered per shard and applied in shard order once all shards are done.
+    partition_by: Optional[str] = None
+    partitions: int = 1
+    # When set, the process is only polled in the steps its trigger policy allows,
+    # see lazydag.core.trigger.TriggerPolicy. Changes to side inputs never trigger
+    # a poll on their own, with or without a policy. Inputs that changed since the
+    # last poll report `changed()` when the process is finally polled.
+    trigger: Optional["TriggerPolicy"] = None
+    side_inputs: List[str] = []
+    # Polls run on the worker pool of their resource class ("default", "cpu", "io"
+    # or a custom class from RESOURCE_CLASSES), so that e.g. processes waiting on
+    # I/O don't take the workers of CPU-bound ones. A poll holds `resource_weight`
+    # slots of the class capacity while it runs.
+    resource_class: str = "default"
+    resource_weight: int = 1
 
     def __init__(self, name: str):
         self.name = name
 
+    def clone(self, name: str, **parameters: Any) -> "Process":
+        """
+        A copy of the process under another name, with the given attributes set,
+        e.g. for the variants of a parameter sweep (see lazydag.core.sweep). Called
+        before the pipeline starts. Processes holding state that can't be deep
+        copied, like locks or queues, should override it.
+        """
+        clone = copy.deepcopy(self)
+        clone.name = name
+        for attr, value in parameters.items():
+            setattr(clone, attr, value)
+        return clone
+
     def on_add_to_pipeline(self):
         """
         Optional method for processes.
@@ -45,9 +80,23 @@ class Process(ABC):
         """
         Optional method for daemon processes.
         Run in a background thread. Has read access to outputs but should not modify them directly.
+        Since poll may modify the outputs concurrently, reads should go through a snapshot of
+        the object (e.g. `obj.snapshot()` for the contrib objects) rather than the object itself.
         """
         pass
 
+    def prefetch(self, **kwargs) -> Dict[str, Iterable[Any]]:
+        """
+        Optional method for processes.
+        Called on the scheduler's I/O pool at the start of each step, with the same
+        arguments as poll, possibly while the inputs are still being produced. Returns
+        the keys (or offset ranges for streams) the next poll will likely read, per
+        input port, so that their committed values are loaded ahead of time.
+        Since upstream processes may be writing meanwhile, predictions should only
+        rely on committed data (e.g. `get(key, old=True)`) or on the process's own state.
+        """
+        return {}
+
     def poll(self, **kwargs):
         """
         Execution logic. kwargs will contain arguments matching inputs and outputs keys.
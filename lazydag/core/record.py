@@ -0,0 +1,119 @@
+"""
+Recording the output of source processes, and replaying it instead of running
+them, see `lazydag run --record` and `--replay`.
+
+A recording has one file per source process, `<process>.changes`, made of
+pickled `(step, {output port: changes})` frames for the steps in which the
+process changed its outputs. The changes are those of `Object.pending_changes`.
+"""
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+
+from .object import Object
+
+Frame = Tuple[int, Dict[str, List[Tuple[Any, ...]]]]
+SUFFIX = ".changes"
+
+
+def read_frames(path: Path) -> Iterator[Frame]:
+    return (frame for frame, _ in _read_frames_with_ends(path))
+
+
+def _read_frames_with_ends(path: Path) -> Iterator[Tuple[Frame, int]]:
+    # Each frame with the offset it ends at, up to the first truncated frame
+    with open(path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f), f.tell()
+            except EOFError:
+                return
+            except pickle.UnpicklingError:
+                # A frame cut short by a crash while recording
+                print(f"Warning: {path} ends with a truncated frame, ignoring it")
+                return
+
+
+class Recorder:
+    """
+    Appends the changes of the source processes to the recording in `path`. Step
+    numbers continue those of the recording, so that runs can be recorded into
+    the same directory one after the other.
+    """
+    def __init__(self, path: Path, sources: Iterable[str]):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.step = 0
+        for file in self.path.glob(f"*{SUFFIX}"):
+            end = 0
+            for (step, _), end in _read_frames_with_ends(file):
+                self.step = max(self.step, step + 1)
+            # Appending after a truncated frame would make the new frames unreadable
+            if end < file.stat().st_size:
+                os.truncate(file, end)
+        self._files: Dict[str, IO[bytes]] = {name: open(self.path / f"{name}{SUFFIX}", "ab") for name in sources}
+
+    def record(self, proc_name: str, outputs: Dict[str, Object]):
+        changes = {}
+        for port, obj in outputs.items():
+            pending = obj.pending_changes()
+            if pending is None:
+                raise ValueError(f"Can't record {proc_name}: {obj} doesn't track its changes")
+            if pending:
+                changes[port] = pending
+        if changes:
+            pickle.dump((self.step, changes), self._files[proc_name], protocol=pickle.HIGHEST_PROTOCOL)
+
+    def end_step(self):
+        for f in self._files.values():
+            f.flush()
+        self.step += 1
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+
+
+class Replayer:
+    """
+    Feeds a recording back into the outputs of the source processes. Each step
+    applies the frames of the next recorded step that changed something, so idle
+    steps are skipped but the sources stay in step with each other.
+    """
+    def __init__(self, path: Path, sources: Iterable[str]):
+        self.path = Path(path)
+        self.steps = 0
+        self._frames: Dict[str, Iterator[Frame]] = {}
+        self._next: Dict[str, Frame] = {}
+        for name in sources:
+            file = self.path / f"{name}{SUFFIX}"
+            if not file.exists():
+                print(f"Warning: nothing recorded for {name}, it won't produce anything")
+                continue
+            self._frames[name] = read_frames(file)
+            self._advance(name)
+        self._position: Optional[int] = None
+
+    def _advance(self, proc_name: str):
+        frame = next(self._frames[proc_name], None)
+        if frame is None:
+            self._next.pop(proc_name, None)
+        else:
+            self._next[proc_name] = frame
+
+    def begin_step(self):
+        self._position = min((step for step, _ in self._next.values()), default=None)
+        if self._position is not None:
+            self.steps += 1
+
+    def apply(self, proc_name: str, outputs: Dict[str, Object]):
+        frame = self._next.get(proc_name)
+        if frame is None or frame[0] != self._position:
+            return
+        for port, changes in frame[1].items():
+            outputs[port].apply_changes(changes)
+        self._advance(proc_name)
+
+    def finished(self) -> bool:
+        return not self._next
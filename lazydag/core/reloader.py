@@ -0,0 +1,61 @@
+import importlib
+from pathlib import Path
+import sys
+import traceback
+from typing import Dict, List, Optional
+
+from .process import Process
+
+
+class ModuleReloader:
+    """
+    Watches the user's modules, i.e. the imported modules living under the project
+    directory, and reimports them when their source changes.
+    """
+    def __init__(self, module_name: str, root: Path):
+        self.module_name = module_name
+        self.root = root.resolve()
+        self._mtimes: Dict[str, int] = self._scan()
+
+    def _user_modules(self) -> Dict[str, Path]:
+        modules = {}
+        for name, module in list(sys.modules.items()):
+            file = getattr(module, "__file__", None)
+            if file is None:
+                continue
+            path = Path(file).resolve()
+            if path.is_relative_to(self.root) and "site-packages" not in path.parts:
+                modules[name] = path
+        return modules
+
+    def _scan(self) -> Dict[str, int]:
+        mtimes = {}
+        for name, path in self._user_modules().items():
+            try:
+                mtimes[name] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                pass
+        return mtimes
+
+    def check(self) -> Optional[List[Process]]:
+        """
+        Returns the new processes if any user module changed since the last check.
+        """
+        mtimes = self._scan()
+        changed = [name for name, mtime in mtimes.items() if self._mtimes.get(name) != mtime]
+        self._mtimes = mtimes
+        if not changed:
+            return None
+
+        try:
+            for name in changed:
+                if name != self.module_name:
+                    importlib.reload(sys.modules[name])
+            # The main module is reloaded last, so it instantiates the new classes
+            module = importlib.reload(sys.modules[self.module_name])
+        except Exception:
+            print("Error: failed to reload the pipeline modules, keeping the current processes")
+            traceback.print_exc()
+            return None
+        self._mtimes = self._scan()
+        return module.processes
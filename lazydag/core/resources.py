@@ -0,0 +1,110 @@
+"""
+Resource classes: separate worker pools and concurrency limits for kinds of
+processes, see `Process.resource_class`.
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+DEFAULT_CLASS = "default"
+# Capacities of the built-in classes, besides the default one which gets the
+# scheduler's parallelization
+BUILTIN_CLASSES: Dict[str, int] = {
+    "cpu": os.cpu_count() or 1,
+    "io": 16,
+}
+
+
+class ResourcePool:
+    """
+    Runs the work of one resource class. Each piece of work takes `weight` units of
+    the class capacity while it runs; work that doesn't fit waits in the queue of
+    the class, so that a class at its limit never holds up the other classes.
+    Work heavier than the whole capacity runs alone.
+    """
+    def __init__(self, name: str, capacity: int):
+        if capacity < 1:
+            raise ValueError(f"Resource class {name} needs a capacity of at least 1")
+        self.name = name
+        self.capacity = capacity
+        self.executor = ThreadPoolExecutor(max_workers=capacity, thread_name_prefix=f"{name}-worker")
+        self._threads = capacity
+        self.in_use = 0
+        self._queue: deque = deque()
+        self._lock = threading.Lock()
+        # Counters since the pipeline started
+        self.runs = 0
+        self.busy_time = 0.0
+        self.queue_wait = 0.0
+        self.max_queue_depth = 0
+
+    def enqueue(self, fn: Callable[..., Any], args: Tuple, weight: int):
+        self._queue.append((fn, args, weight, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+
+    def dispatch(self) -> List[Tuple[Future, int]]:
+        """
+        Starts the queued work that fits in the free capacity, in order. Returns the
+        futures with the weight to release once each is done.
+        """
+        started = []
+        while self._queue:
+            fn, args, weight, queued_at = self._queue[0]
+            if self.in_use > 0 and self.in_use + weight > self.capacity:
+                break
+            self._queue.popleft()
+            self.in_use += weight
+            self.queue_wait += time.perf_counter() - queued_at
+            started.append((self.executor.submit(self._run, fn, args, weight), weight))
+        return started
+
+    def resize(self, capacity: int):
+        """
+        Changes the capacity, taking effect on the next dispatch. Shrinking lets the
+        running work finish; growing past the threads of the executor replaces it.
+        """
+        if capacity < 1:
+            raise ValueError(f"Resource class {self.name} needs a capacity of at least 1")
+        self.capacity = capacity
+        if capacity > self._threads:
+            old_executor = self.executor
+            self.executor = ThreadPoolExecutor(max_workers=capacity, thread_name_prefix=f"{self.name}-worker")
+            self._threads = capacity
+            old_executor.shutdown(wait=False)
+
+    def counters(self) -> Tuple[int, float, float]:
+        with self._lock:
+            return self.runs, self.busy_time, self.queue_wait
+
+    def release(self, weight: int):
+        self.in_use -= weight
+
+    def _run(self, fn: Callable[..., Any], args: Tuple, weight: int):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.runs += 1
+                self.busy_time += (time.perf_counter() - start) * min(weight, self.capacity)
+
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        """
+        Usage of the class over `elapsed` seconds of running steps.
+        """
+        return {
+            "capacity": self.capacity,
+            "runs": self.runs,
+            "utilization": self.busy_time / (self.capacity * elapsed) if elapsed > 0 else 0,
+            "avg_queue_wait": self.queue_wait / self.runs if self.runs else 0,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+    def shutdown(self):
+        self.executor.shutdown()
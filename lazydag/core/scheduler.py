@@ -1,35 +1,178 @@
-from concurrent.futures import FIRST_COMPLETED, wait, ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait, Future, ThreadPoolExecutor
+import inspect
+import json
+import linecache
+from pathlib import Path
+import pickle
 import threading
 import time
-from typing import Dict, List, Set, Iterable
+from typing import Callable, Dict, List, Set, Iterable, Optional, Tuple, TYPE_CHECKING
 
 from .object import Object
 from .process import Process
 from .pipeline import Pipeline
+from .partition import ShardView, ShardWriter, merge_shards, split_keys
+from .trigger import TriggerPolicy, TriggerState
+from .autotune import Autotuner, ClassSample
+from .resources import BUILTIN_CLASSES, DEFAULT_CLASS, ResourcePool
+from .record import Recorder, Replayer
+from .misc import format_size
+
+if TYPE_CHECKING:
+    from lazydag.contrib.versions import VersionStore
+    from .reloader import ModuleReloader
+
+
+class _ChangedView:
+    """
+    Wraps an input of a process that has to recompute: it reports a change even if
+    the object itself didn't change in this step.
+    """
+    def __init__(self, obj: Object):
+        self._obj = obj
+
+    def __getattr__(self, name: str):
+        return getattr(self._obj, name)
+
+    def changed(self) -> bool:
+        return True
+
+    def __len__(self):
+        return len(self._obj)
+
+    def __iter__(self):
+        return iter(self._obj)
+
+    def __getitem__(self, key):
+        return self._obj[key]
+
+    def __contains__(self, key):
+        return key in self._obj
+
+
+# Polls in the steps where a trigger input changed, for processes with side inputs only
+_DEFAULT_TRIGGER = TriggerPolicy()
+
+
+def _process_source(proc: Process) -> Optional[str]:
+    try:
+        return inspect.getsource(type(proc))
+    except (OSError, TypeError):
+        return None
+
+
+def _process_fingerprint(proc: Process) -> Tuple[Optional[str], Optional[bytes]]:
+    """
+    The source of the class of a process and its state as constructed, so that
+    edits of its parameters count as changes too. The state is left out if it
+    can't be pickled.
+    """
+    try:
+        state = pickle.dumps(vars(proc))
+    except Exception:
+        state = None
+    return _process_source(proc), state
 
 class Scheduler:
-    def __init__(self, pipeline: Pipeline, processes: Iterable[Process], objects: Iterable[Object], parallelization: int = 4):
+    def __init__(self, pipeline: Pipeline, processes: Iterable[Process], objects: Iterable[Object], parallelization: int = 4, io_parallelization: int = 8, version_store: Optional["VersionStore"] = None, fusion: bool = False, memory_budget: Optional[int] = None, trace_path: Optional[Path] = None, resource_classes: Optional[Dict[str, int]] = None, autotuner: Optional[Autotuner] = None, record_path: Optional[Path] = None, replay_path: Optional[Path] = None):
         self.pipeline: Pipeline = pipeline
         self.objects: Dict[str, Object] = {obj.name: obj for obj in objects}
         self.processes: Dict[str, Process] = {proc.name: proc for proc in processes}
-        self.daemons: List[threading.Thread] = []
-        self.thread_pool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=parallelization)
+        self.daemons: Dict[str, threading.Thread] = {}
+        # Capacity of each resource class, see Process.resource_class
+        self.resource_classes: Dict[str, int] = {DEFAULT_CLASS: parallelization, **BUILTIN_CLASSES, **(resource_classes or {})}
+        self.pools: Dict[str, ResourcePool] = {}
+        self._pool(DEFAULT_CLASS)
+        for proc in self.processes.values():
+            self._pool(proc.resource_class)
+        # Time spent running steps, over which the pools' utilization is measured
+        self._steps_time: float = 0
+        # Resizes the pools as the load shifts, see lazydag.core.autotune
+        self.autotuner: Optional[Autotuner] = autotuner
+        self.io_pool: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=io_parallelization, thread_name_prefix="io")
+        self.version_store: Optional["VersionStore"] = version_store
+        if version_store is not None:
+            version_store.track_objects(self.objects.values())
+        self.memory_budget: Optional[int] = memory_budget
+        self._last_memory_report: float = 0
+        self._memory_lock = threading.Lock()
+        # Tasks submitted in the current step and not finished yet, whose objects
+        # can't be spilled while they run
+        self._running_tasks: Set[str] = set()
+        self._running_lock = threading.Lock()
+        if memory_budget is not None:
+            for obj in self.objects.values():
+                obj.on_load = self._on_object_load
         self._assert_pipeline_consistent()
+        self._topological_order: List[str] = pipeline.topological_sort()
+        # Outputs of the consumers before their inputs, see step
+        self._save_order: List[str] = [
+            obj_name for proc_name in reversed(self._topological_order) for obj_name in pipeline.process_outputs(proc_name).values()
+        ]
+        self._save_order += [obj_name for obj_name in self.objects if pipeline.object_producer(obj_name) is None]
+        self.fusion: bool = fusion
+        self._plan_tasks(fusion)
+        self._shard_writers: Dict[str, List[Dict[str, ShardWriter]]] = {}
+        # Processes whose next poll must recompute everything, see reload_processes
+        self._invalidated: Set[str] = set()
+        self._process_fingerprints: Dict[str, Tuple[Optional[str], Optional[bytes]]] = {
+            name: _process_fingerprint(proc) for name, proc in self.processes.items()
+        }
+        # Durations of the polls of the current step, written to the trace, see lazydag.core.simulator
+        self.trace_path: Optional[Path] = trace_path
+        self._poll_durations: Dict[str, float] = {}
+        self._trace_lock = threading.Lock()
+        self._plan_prefetches()
+        # Changes seen by the processes with a trigger policy or side inputs since their last poll
+        self._trigger_states: Dict[str, TriggerState] = {}
+        # Guards the trigger states and the invalidated processes, which the workers
+        # of fused tasks update concurrently
+        self._trigger_lock = threading.Lock()
+        # Recording the outputs of the source processes, or replaying them instead
+        # of polling the sources, see lazydag.core.record
+        self._sources: List[str] = [name for name in self.processes if not self.pipeline.process_inputs(name)]
+        self.recorder: Optional[Recorder] = Recorder(record_path, self._sources) if record_path is not None else None
+        self.replayer: Optional[Replayer] = Replayer(replay_path, self._sources) if replay_path is not None else None
 
-    def start(self):
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        # The default class's executor, which the autotuner may replace
+        return self.pools[DEFAULT_CLASS].executor
+
+    def start(self, reloader: Optional["ModuleReloader"] = None):
         for obj in self.objects.values():
             obj.on_pipeline_start()
         for proc in self.processes.values():
             proc.on_pipeline_start()
+        self.restore_consumer_offsets()
+        self.rebuild_objects()
+
+        # Objects load on first access anyway, so preloading doesn't delay the first step
+        self.preload_objects()
 
-        self.start_daemons()
+        # Daemons feed the sources, which a replay takes over
+        if self.replayer is None:
+            self.start_daemons()
 
         # Main Loop
         try:
             while True:
+                if reloader is not None:
+                    processes = reloader.check()
+                    if processes is not None:
+                        self.reload_processes(processes)
+
                 if self.step():
                     print("-=-=-=-=-=-=-=-=-=-")
 
+                if self.replayer is not None:
+                    # Replays run as fast as the pipeline can go
+                    if self.replayer.finished():
+                        print(f"Replay finished after {self.replayer.steps} steps")
+                        break
+                    continue
+
                 # Sleep to avoid CPU spin? The user didn't specify.
                 # If we have run_daemons producing data, we want to pick it up fast.
                 # But minimal sleep is good practice.
@@ -43,51 +186,441 @@ class Scheduler:
             proc.on_pipeline_end()
 
         self.stop_daemons()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.print_memory_report()
+        self.print_prefetch_report()
+        self.print_resource_report()
+
+        if self.version_store is not None:
+            self.version_store.gc()
 
     def step(self):
         """
         Runs one iteration of the topological process loop.
+        Each task, i.e. a process or a fused chain of processes, is submitted once
+        all the objects it reads from other tasks have been produced.
         """
-        process_pending_inputs = {name: len(self.pipeline.process_inputs(name)) for name in self.processes}
-        ready_to_poll = lambda p: process_pending_inputs[p] == 0
-        poll = lambda p: self.thread_pool.submit(self._poll_process, p)
+        step_start = time.perf_counter()
+        counters = {name: pool.counters() for name, pool in self.pools.items()}
+        if self.replayer is not None:
+            self.replayer.begin_step()
+        prefetches = self.start_prefetches()
+        task_pending_inputs = dict(self._task_inputs_count)
+        ready = deque(task for task in self._tasks if task_pending_inputs[task] == 0)
+        # Running work, with the pool and the weight it holds
+        pending_futures: Dict[Future, Tuple[ResourcePool, int]] = {}
+        remaining_futures: Dict[str, int] = {}
 
-        pending_processes = set()
-        for proc_name, proc in self.processes.items():
-            if ready_to_poll(proc_name):
-                pending_processes.add(poll(proc_name))
-        while pending_processes:
-            done, pending_processes = wait(pending_processes, return_when=FIRST_COMPLETED)
+        def release(task: str):
+            for consumer in self._task_consumers[task]:
+                task_pending_inputs[consumer] -= 1
+                if task_pending_inputs[consumer] == 0:
+                    ready.append(consumer)
+
+        def submit_ready():
+            while ready:
+                task = ready.popleft()
+                # A skipped process doesn't change its outputs, so its consumers can go.
+                # The links of fused tasks are checked by the worker, as they run
+                due = len(self._tasks[task]) == 1
+                if due and not self._should_poll(task):
+                    release(task)
+                    continue
+                work = self._task_work(task, due)
+                remaining_futures[task] = len(work)
+                with self._running_lock:
+                    self._running_tasks.add(task)
+                pool, weight = self._task_resources(task)
+                for fn, args in work:
+                    pool.enqueue(fn, args, weight)
+            # Each class only waits for its own capacity
+            for pool in self.pools.values():
+                for future, weight in pool.dispatch():
+                    pending_futures[future] = (pool, weight)
+
+        submit_ready()
+        while pending_futures:
+            done, _ = wait(pending_futures, return_when=FIRST_COMPLETED)
             for future in done:
-                proc_name = future.result()
-                for out_obj in self.pipeline.process_outputs(proc_name).values():
-                    for consumer in self.pipeline.object_consumers(out_obj):
-                        process_pending_inputs[consumer] -= 1
-                        if ready_to_poll(consumer):
-                            pending_processes.add(poll(consumer))
+                pool, weight = pending_futures.pop(future)
+                pool.release(weight)
+                task = future.result()
+                remaining_futures[task] -= 1
+                if remaining_futures[task] > 0:
+                    continue
+                self._finish_task(task)
+                with self._running_lock:
+                    self._running_tasks.discard(task)
+                release(task)
+            submit_ready()
+
+        # Saving drops the values prefetched from the previous version
+        wait(prefetches)
+        if self.recorder is not None:
+            for proc_name in self._sources:
+                self.recorder.record(proc_name, self._output_objects(proc_name))
+            self.recorder.end_step()
+        changed_objects = [obj for obj in self.objects.values() if obj.changed()]
+        save_durations = {}
+        # Consumers first: an input persists the offsets of its consumers once their
+        # outputs are saved, with the offsets in them when they can hold them
+        for proc_name in reversed(self._topological_order):
+            offsets = {}
+            for obj_name in self.pipeline.process_inputs(proc_name).values():
+                offset = self.objects[obj_name].consumer_offset(proc_name)
+                if offset is not None:
+                    offsets[obj_name] = offset
+            for obj in self._output_objects(proc_name).values():
+                obj.set_input_offsets(offsets)
+        for obj_name in self._save_order:
+            save_start = time.perf_counter()
+            self.objects[obj_name].save()
+            save_durations[obj_name] = time.perf_counter() - save_start
+
+        # Idle steps tell nothing about the load, so only steps that changed something are traced
+        if self.trace_path is not None and changed_objects:
+            self._write_trace(save_durations)
+        self._poll_durations = {}
+        makespan = time.perf_counter() - step_start
+        self._steps_time += makespan
+        # Idle steps tell nothing about the load either
+        if self.autotuner is not None and changed_objects:
+            self._autotune(makespan, counters)
+
+        if self.version_store is not None:
+            versioned = [obj for obj in changed_objects if getattr(obj, "save_path", None) is not None]
+            if versioned:
+                # One step number for all of them, to roll the pipeline back consistently
+                step = self.version_store.next_step()
+                for obj in versioned:
+                    self.version_store.commit(obj.name, obj.save_path, step=step)
 
+        self.enforce_memory_budget()
+
+    def _write_trace(self, save_durations: Dict[str, float]):
+        record = {"time": time.time(), "polls": self._poll_durations, "saves": save_durations}
+        with open(self.trace_path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def _record_poll(self, proc_name: str, duration: float):
+        # Shards of a partitioned process add up, i.e. the trace has its total work
+        with self._trace_lock:
+            self._poll_durations[proc_name] = self._poll_durations.get(proc_name, 0) + duration
+
+    def _plan_prefetches(self):
+        # Processes that declare their reads, upstream first so that the processes
+        # that run first are warmed first
+        self._prefetching: List[str] = [
+            name for name in self.pipeline.topological_sort()
+            if type(self.processes[name]).prefetch is not Process.prefetch
+        ]
+
+    def start_prefetches(self) -> List[Future]:
+        """
+        Asks the processes that implement `Process.prefetch` what they are going to
+        read, and warms it on the I/O pool while the step runs.
+        """
+        return [self.io_pool.submit(self._prefetch_process, name) for name in self._prefetching]
+
+    def _prefetch_process(self, proc_name: str):
+        args = self._get_process_args(proc_name)
+        try:
+            for port, keys in self.processes[proc_name].prefetch(**args).items():
+                args[port].prefetch(keys)
+        except Exception as e:
+            # Prefetching is only an optimization, the poll reads whatever it needs anyway
+            print(f"Warning: prefetching for {proc_name} failed: {e!r}")
+
+    def prefetch_report(self) -> List[Tuple[str, Dict[str, int]]]:
+        """
+        Prefetch counters of the objects that were prefetched into, see `Object.prefetch_stats`.
+        """
+        report = []
+        for name, obj in self.objects.items():
+            stats = obj.prefetch_stats()
+            if stats is not None and stats["prefetched"] > 0:
+                report.append((name, stats))
+        return report
+
+    def print_prefetch_report(self):
+        report = self.prefetch_report()
+        if not report:
+            return
+        print("Prefetch:")
+        for name, stats in report:
+            reads = stats["hits"] + stats["misses"]
+            hit_rate = stats["hits"] / reads if reads else 0
+            print(f"    {name}: {hit_rate:.0%} hit rate, {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['wasted']} of {stats['prefetched']} prefetched unused")
+
+    def _pool(self, resource_class: str) -> ResourcePool:
+        pool = self.pools.get(resource_class)
+        if pool is None:
+            if resource_class not in self.resource_classes:
+                raise ValueError(f"Unknown resource class {resource_class}, set its capacity in RESOURCE_CLASSES")
+            pool = self.pools[resource_class] = ResourcePool(resource_class, self.resource_classes[resource_class])
+        return pool
+
+    def _autotune(self, makespan: float, counters: Dict[str, Tuple[int, float, float]]):
+        samples = {}
+        for name, pool in self.pools.items():
+            runs, busy_time, queue_wait = pool.counters()
+            old_runs, old_busy_time, old_queue_wait = counters.get(name, (0, 0, 0))
+            samples[name] = ClassSample(pool.capacity, runs - old_runs, busy_time - old_busy_time, queue_wait - old_queue_wait)
+        for name, capacity in self.autotuner.observe(makespan, samples).items():
+            self.pools[name].resize(capacity)
+
+    def _task_resources(self, task: str) -> Tuple[ResourcePool, int]:
+        # The processes of a fused task share their class, see _plan_tasks
+        procs = [self.processes[proc_name] for proc_name in self._tasks[task]]
+        return self._pool(procs[0].resource_class), max(proc.resource_weight for proc in procs)
+
+    def resource_report(self) -> List[Tuple[str, Dict[str, float]]]:
+        """
+        Usage of each resource class since the start, see `ResourcePool.report`.
+        """
+        return [(name, pool.report(self._steps_time)) for name, pool in self.pools.items()]
+
+    def print_resource_report(self):
+        print("Resource classes:")
+        for name, stats in self.resource_report():
+            print(f"    {name}: {stats['utilization']:.0%} utilization of {stats['capacity']} slots, "
+                  f"{stats['runs']} runs, {stats['avg_queue_wait'] * 1000:.1f}ms average queue wait, "
+                  f"{stats['max_queue_depth']} max queue depth")
+
+    def memory_report(self) -> List[Tuple[str, int]]:
+        """
+        Approximate memory footprint of each object, largest first.
+        """
+        footprints = [(name, obj.memory_footprint()) for name, obj in self.objects.items()]
+        return sorted(footprints, key=lambda item: item[1], reverse=True)
+
+    def print_memory_report(self, top: int = 5):
+        report = self.memory_report()
+        total = sum(size for _, size in report)
+        budget = f" of {format_size(self.memory_budget)}" if self.memory_budget is not None else ""
+        print(f"Memory: {format_size(total)}{budget}, top consumers:")
+        for name, size in report[:top]:
+            print(f"    {name}: {format_size(size)}")
+
+    def enforce_memory_budget(self, report_interval: float = 60, keep: Iterable[str] = ()):
+        """
+        Asks the largest objects, except those in `keep`, to spill to disk until the
+        pipeline fits in its memory budget. Spilled state is paged back in on access,
+        so going over the budget makes the pipeline slower rather than getting it
+        killed.
+        """
+        if self.memory_budget is None:
+            return
+        keep = set(keep)
+        with self._memory_lock:
+            report = self.memory_report()
+            total = sum(size for _, size in report)
+            if total <= self.memory_budget:
+                return
+            for name, size in report:
+                if name in keep:
+                    continue
+                obj = self.objects[name]
+                obj.spill(total - self.memory_budget)
+                # What the object still holds, rather than what it says it freed,
+                # since dropping values other references keep alive frees nothing
+                total -= size - obj.memory_footprint()
+                if total <= self.memory_budget:
+                    break
+
+            if total > self.memory_budget and time.monotonic() - self._last_memory_report > report_interval:
+                self._last_memory_report = time.monotonic()
+                print("Warning: still over the memory budget after spilling")
+                self.print_memory_report()
+
+    def _on_object_load(self, obj: Object):
+        """
+        Objects load as they are accessed during the step, so the budget is enforced
+        then too, sparing the objects of the running tasks, which may be using them.
+        """
+        with self._running_lock:
+            tasks = list(self._running_tasks)
+        in_use = {
+            obj_name
+            for task in tasks
+            for proc_name in self._tasks[task]
+            for obj_name in [*self.pipeline.process_inputs(proc_name).values(), *self.pipeline.process_outputs(proc_name).values()]
+        }
+        self.enforce_memory_budget(keep=in_use | {obj.name})
+
+    def preload_objects(self):
         for obj in self.objects.values():
-            obj.save()
+            self.io_pool.submit(self._preload_object, obj)
+
+    def _preload_object(self, obj: Object):
+        obj.preload()
+        load_time = getattr(obj, "load_time", None)
+        if load_time is not None:
+            print(f"Loaded {obj} in {load_time:.3f}s")
 
     def start_daemons(self):
         for name, proc in self.processes.items():
             if proc.has_daemon:
-                # Pass inputs/outputs as kwargs?
-                # "It has read access to its outputs... but we guarantee it will not change it."
-                # We pass the same objects.
-                kwargs = self._get_process_args(name)
-
-                # Daemon thread
-                t = threading.Thread(target=proc.run_daemon, kwargs=kwargs, name=f"daemon-{name}", daemon=True)
-                t.start()
-                self.daemons.append(t)
+                self._start_daemon(name)
         return
 
+    def _start_daemon(self, name: str):
+        proc = self.processes[name]
+        # Pass inputs/outputs as kwargs?
+        # "It has read access to its outputs... but we guarantee it will not change it."
+        # We pass the same objects.
+        kwargs = self._get_process_args(name)
+
+        # Daemon thread
+        t = threading.Thread(target=proc.run_daemon, kwargs=kwargs, name=f"daemon-{name}", daemon=True)
+        t.start()
+        self.daemons[name] = t
+
     def stop_daemons(self):
-        for t in self.daemons:
+        for t in self.daemons.values():
             t.join()
         return
 
+    def reload_processes(self, processes: Iterable[Process], daemon_timeout: float = 5) -> List[str]:
+        """
+        Swaps in the new instances of the processes whose class source or state as
+        constructed changed, and returns their names. Objects and the other processes, daemons included, are
+        kept. The outputs of the changed processes and everything downstream of them
+        are purged, and the processes downstream recompute from scratch.
+
+        A new instance that doesn't fit the pipeline, or whose `on_pipeline_start`
+        fails, is rejected with a warning and the old one keeps running. Changes to
+        the resource class or the partitioning of a process are applied by planning
+        the tasks again.
+        """
+        new_processes = {proc.name: proc for proc in processes}
+        if set(new_processes) != set(self.processes):
+            print("Warning: processes were added or removed, restart the pipeline to apply topology changes")
+            return []
+
+        linecache.checkcache()
+        changed = []
+        for name, proc in new_processes.items():
+            if proc is self.processes[name]:
+                continue
+            # Taken before on_pipeline_start, like the recorded one
+            fingerprint = _process_fingerprint(proc)
+            if fingerprint == self._process_fingerprints[name]:
+                continue
+            error = self._check_process(name, proc)
+            if error is None:
+                try:
+                    # Started before the old instance stops, so that a failure leaves it running
+                    proc.on_pipeline_start()
+                except Exception as e:
+                    error = f"on_pipeline_start failed: {e!r}"
+            if error is not None:
+                # The fingerprint isn't recorded, so the next edit of the process is tried again
+                print(f"Warning: not reloading {name}, {error}; keeping the current instance")
+                continue
+            self._process_fingerprints[name] = fingerprint
+            changed.append(name)
+        if not changed:
+            return []
+
+        replan = False
+        for name in changed:
+            old_proc, new_proc = self.processes[name], new_processes[name]
+            old_proc.on_pipeline_end()
+            daemon = self.daemons.pop(name, None)
+            if daemon is not None:
+                daemon.join(daemon_timeout)
+                if daemon.is_alive():
+                    print(f"Warning: the daemon of {name} didn't stop, it keeps running in the background")
+
+            replan = replan or any(
+                getattr(old_proc, attr) != getattr(new_proc, attr)
+                for attr in ("resource_class", "partition_by", "partitions")
+            )
+            self.processes[name] = new_proc
+            if new_proc.has_daemon and self.replayer is None:
+                self._start_daemon(name)
+
+        self._assert_pipeline_consistent()
+        if replan:
+            self._plan_tasks(self.fusion)
+        self._invalidate(changed)
+        self._plan_prefetches()
+        print(f"Reloaded processes: {', '.join(sorted(changed))}")
+        return changed
+
+    def _check_process(self, name: str, proc: Process) -> Optional[str]:
+        """
+        Why a new instance of the process can't replace the current one, if it can't.
+        """
+        if proc.name != name:
+            return f"it is named {proc.name}"
+        if set(proc.inputs) != set(self.pipeline.process_inputs(name)) or \
+                set(proc.outputs) != set(self.pipeline.process_outputs(name)):
+            return "its inputs or outputs changed, restart the pipeline to apply topology changes"
+        if proc.partition_by is not None and proc.partition_by not in proc.inputs:
+            return f"it is partitioned by {proc.partition_by}, which is not an input"
+        if not isinstance(proc.partitions, int) or proc.partitions < 1:
+            return f"it has {proc.partitions!r} partitions"
+        try:
+            self._pool(proc.resource_class)
+        except ValueError as e:
+            return str(e)
+        return None
+
+    def restore_consumer_offsets(self):
+        """
+        Moves the processes forward in the change feeds of their inputs to the
+        offsets saved with their outputs, which are ahead if the pipeline stopped
+        between saving the outputs and the inputs, so that no change is applied
+        twice. Only the processes the feeds already know are looked at, since
+        reading the offsets may cost a read of the outputs.
+        """
+        for proc_name in self.processes:
+            inputs = self.pipeline.process_inputs(proc_name).values()
+            if all(self.objects[obj_name].consumer_offset(proc_name) is None for obj_name in inputs):
+                continue
+            for obj in self._output_objects(proc_name).values():
+                for obj_name, offset in obj.saved_input_offsets().items():
+                    if obj_name in inputs:
+                        self.objects[obj_name].restore_consumer_offset(proc_name, offset)
+
+    def rebuild_objects(self):
+        """
+        Re-runs the producers of the objects that ask for it (see
+        `Object.rebuild_on_start`) from scratch in the next step. Their consumers
+        keep their state, they see the rebuilt objects as changed.
+        """
+        producers = {
+            self.pipeline.object_producer(name) for name, obj in self.objects.items() if obj.rebuild_on_start
+        }
+        producers.discard(None)
+        if producers:
+            self._invalidate(producers, downstream=False)
+
+    def _invalidate(self, proc_names: Iterable[str], downstream: bool = True):
+        invalidated = set()
+        stack = list(proc_names)
+        while stack:
+            proc_name = stack.pop()
+            if proc_name in invalidated:
+                continue
+            invalidated.add(proc_name)
+            if downstream:
+                stack.extend(self.pipeline.downstream_processes(proc_name))
+
+        for proc_name in invalidated:
+            for obj_name in self.pipeline.process_outputs(proc_name).values():
+                obj = self.objects[obj_name]
+                obj.purge()
+                obj.on_pipeline_start()
+            for obj_name in self.pipeline.process_inputs(proc_name).values():
+                self.objects[obj_name].forget_consumer(proc_name)
+        with self._trigger_lock:
+            self._invalidated |= invalidated
+
     def _assert_pipeline_consistent(self):
         """
         Assert that the pipeline is consistent with the processes and objects.
@@ -104,21 +637,174 @@ class Scheduler:
             assert obj_name == obj.name
             assert obj_name in self.pipeline.objects
 
+    def _plan_tasks(self, fusion: bool):
+        """
+        Groups the processes into the tasks submitted to the thread pool. With fusion,
+        every linear chain of processes runs as a single task on a single worker,
+        which saves the submission and wake-up overhead of each link.
+        """
+        self._tasks: Dict[str, List[str]] = {name: [name] for name in self.processes}
+        if fusion:
+            for chain in self.pipeline.linear_chains():
+                # Partitioned processes need the whole pool, so they break chains, and
+                # so do changes of resource class
+                segments = [[]]
+                for proc_name in chain:
+                    if self._is_partitioned(proc_name):
+                        segments.append([])
+                        continue
+                    resource_class = self.processes[proc_name].resource_class
+                    if segments[-1] and self.processes[segments[-1][-1]].resource_class != resource_class:
+                        segments.append([])
+                    segments[-1].append(proc_name)
+                for segment in segments:
+                    if len(segment) < 2:
+                        continue
+                    for proc_name in segment:
+                        del self._tasks[proc_name]
+                    self._tasks[segment[0]] = segment
+        self._task_of: Dict[str, str] = {proc: task for task, procs in self._tasks.items() for proc in procs}
+
+        # Number of objects a task reads from other tasks, and the tasks reading
+        # each of its outputs (once per object)
+        self._task_inputs_count: Dict[str, int] = {}
+        self._task_consumers: Dict[str, List[str]] = {}
+        for task, procs in self._tasks.items():
+            inputs = {obj for proc in procs for obj in self.pipeline.process_inputs(proc).values()}
+            self._task_inputs_count[task] = len([
+                obj for obj in inputs if self._task_of.get(self.pipeline.object_producer(obj)) != task
+            ])
+            outputs = {obj for proc in procs for obj in self.pipeline.process_outputs(proc).values()}
+            self._task_consumers[task] = [
+                consumer_task
+                for obj in sorted(outputs)
+                for consumer_task in {self._task_of[c] for c in self.pipeline.object_consumers(obj)} - {task}
+            ]
+
+    def _should_poll(self, proc_name: str) -> bool:
+        """
+        Whether the process is polled in this step, according to its trigger policy.
+        Called once its inputs are produced, so that their changes can be counted.
+        """
+        proc = self.processes[proc_name]
+        if proc.trigger is None and not proc.side_inputs:
+            return True
+        # The recording already tells when the sources changed
+        if self.replayer is not None and proc_name in self._sources:
+            return True
+        now, wall_time = time.monotonic(), time.time()
+        # Counted outside the lock, objects may take a while to count their changes
+        counts = {}
+        for port, obj_name in self.pipeline.process_inputs(proc_name).items():
+            obj = self.objects[obj_name]
+            if obj.changed():
+                counts[port] = obj.change_count()
+
+        with self._trigger_lock:
+            state = self._trigger_states.get(proc_name)
+            if state is None:
+                state = self._trigger_states[proc_name] = TriggerState(wall_time)
+            has_triggers = False
+            for port in self.pipeline.process_inputs(proc_name):
+                is_trigger = port not in proc.side_inputs
+                has_triggers = has_triggers or is_trigger
+                if port in counts:
+                    state.changed_ports.add(port)
+                    if is_trigger:
+                        state.record(now, counts[port])
+            if not has_triggers:
+                state.record(now, 1)
+
+            policy = proc.trigger or _DEFAULT_TRIGGER
+            return proc_name in self._invalidated or policy.due(state, now, wall_time)
+
+    def _mark_polled(self, proc_name: str):
+        with self._trigger_lock:
+            self._invalidated.discard(proc_name)
+            state = self._trigger_states.get(proc_name)
+            if state is not None:
+                state.reset(time.monotonic(), time.time())
+
+    def _is_partitioned(self, proc_name: str) -> bool:
+        proc = self.processes[proc_name]
+        return proc.partition_by is not None and proc.partitions > 1
+
+    def _task_work(self, task: str, due: bool = False) -> List[Tuple[Callable, tuple]]:
+        """
+        The calls that run a task, each on a worker of the task's resource class.
+        `due` tells that the first process of the task was found due already.
+        """
+        if not self._is_partitioned(task):
+            return [(self._poll_task, (task, due))]
+
+        proc = self.processes[task]
+        args = self._get_process_args(task)
+        outputs = self.pipeline.process_outputs(task)
+        self._shard_writers[task] = []
+        partitioned = args[proc.partition_by]
+        # Listing the keys once for all the shards
+        shard_keys = split_keys(partitioned, proc.partitions) if hasattr(partitioned, "keys") else [None] * proc.partitions
+        work = []
+        for shard in range(proc.partitions):
+            shard_args = dict(args)
+            shard_args[proc.partition_by] = ShardView(partitioned, shard, proc.partitions, shard_keys[shard])
+            writers = {port: ShardWriter(args[port]) for port in outputs}
+            shard_args.update(writers)
+            self._shard_writers[task].append(writers)
+            work.append((self._poll_shard, (task, shard_args)))
+        return work
+
+    def _poll_shard(self, proc_name: str, args: Dict[str, object]):
+        start = time.perf_counter()
+        self.processes[proc_name].poll(**args)
+        self._record_poll(proc_name, time.perf_counter() - start)
+        return proc_name
+
+    def _finish_task(self, task: str):
+        shard_writers = self._shard_writers.pop(task, None)
+        if shard_writers is None:
+            return
+        self._mark_polled(task)
+        for port, obj_name in self.pipeline.process_outputs(task).items():
+            merge_shards(self.objects[obj_name], [writers[port] for writers in shard_writers])
+
+    def _poll_task(self, task: str, due: bool = False):
+        for i, proc_name in enumerate(self._tasks[task]):
+            if (due and i == 0) or self._should_poll(proc_name):
+                self._poll_process(proc_name)
+        return task
+
     def _poll_process(self, proc_name: str):
         """
         Poll a process and return the name of the process.
         """
         proc = self.processes[proc_name]
         args = self._get_process_args(proc_name)
-        proc.poll(**args)
+        start = time.perf_counter()
+        if self.replayer is not None and proc_name in self._sources:
+            self.replayer.apply(proc_name, self._output_objects(proc_name))
+        else:
+            proc.poll(**args)
+        self._record_poll(proc_name, time.perf_counter() - start)
+        self._mark_polled(proc_name)
 
         # Return the name of the process to track process in threadpool futures
         return proc_name
 
+    def _output_objects(self, proc_name: str) -> Dict[str, Object]:
+        return {port: self.objects[obj_name] for port, obj_name in self.pipeline.process_outputs(proc_name).items()}
+
     def _get_process_args(self, proc_name: str):
         kwargs = {}
+        with self._trigger_lock:
+            state = self._trigger_states.get(proc_name)
+            changed_ports = set(state.changed_ports) if state is not None else set()
+            invalidated = proc_name in self._invalidated
         for input_port, obj_name in self.pipeline.process_inputs(proc_name).items():
             kwargs[input_port] = self.objects[obj_name]
+            # Changes since the last poll may have been saved in the steps the process skipped
+            if invalidated or input_port in changed_ports:
+                kwargs[input_port] = _ChangedView(kwargs[input_port])
         for output_port, obj_name in self.pipeline.process_outputs(proc_name).items():
             kwargs[output_port] = self.objects[obj_name]
         return kwargs
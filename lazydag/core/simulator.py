@@ -0,0 +1,161 @@
+"""
+Discrete-event model of the scheduler, driven by the durations recorded with
+`Scheduler(trace_path=...)`, to predict how a pipeline behaves with a different
+number of workers or another scheduling policy without running it.
+"""
+from collections import deque
+import heapq
+import json
+from pathlib import Path
+import statistics
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .pipeline import Pipeline
+
+STATISTICS: Dict[str, Callable[[List[float]], float]] = {
+    "mean": statistics.fmean,
+    "median": statistics.median,
+    "max": max,
+}
+
+
+def load_trace(path: Path, statistic: str = "mean") -> Tuple[Dict[str, float], Dict[str, float]]:
+    """
+    Reads a trace and summarizes it as one poll duration per process and one save
+    duration per object, using the given statistic over the traced steps.
+    """
+    polls: Dict[str, List[float]] = {}
+    saves: Dict[str, List[float]] = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for name, duration in record["polls"].items():
+                polls.setdefault(name, []).append(duration)
+            for name, duration in record["saves"].items():
+                saves.setdefault(name, []).append(duration)
+    summarize = STATISTICS[statistic]
+    return (
+        {name: summarize(durations) for name, durations in polls.items()},
+        {name: summarize(durations) for name, durations in saves.items()},
+    )
+
+
+class SimulationResult:
+    def __init__(self, workers: int, policy: str, poll_time: float, save_time: float, busy_time: float):
+        self.workers = workers
+        self.policy = policy
+        self.poll_time = poll_time
+        self.save_time = save_time
+        self.busy_time = busy_time
+
+    @property
+    def makespan(self) -> float:
+        # Objects are saved one after the other once every process is done
+        return self.poll_time + self.save_time
+
+    @property
+    def throughput(self) -> float:
+        """
+        Steps per second.
+        """
+        return 1 / self.makespan if self.makespan > 0 else float("inf")
+
+    @property
+    def utilization(self) -> float:
+        """
+        Fraction of the poll phase the workers spend running processes.
+        """
+        if self.poll_time == 0:
+            return 0
+        return self.busy_time / (self.workers * self.poll_time)
+
+
+class Simulator:
+    """
+    Replays one step of the pipeline on a fixed number of workers, the way
+    `Scheduler.step` runs it: a process is ready once every object it reads has
+    been produced, and idle workers take ready processes in the order given by
+    the policy. Processes missing from the trace take no time.
+
+    Policies:
+      fifo: in the order they became ready, like the scheduler's thread pool
+      critical-path: longest remaining path to the end of the step first
+      longest-first: longest poll first
+    """
+    POLICIES = ("fifo", "critical-path", "longest-first")
+
+    def __init__(self, pipeline: Pipeline, poll_durations: Dict[str, float], save_durations: Dict[str, float], overhead: float = 0):
+        self.save_time = sum(save_durations.get(obj, 0) for obj in pipeline.objects)
+        # Processes are numbered in topological order, so the graph is a few flat lists
+        self.names = pipeline.topological_sort()
+        index = {name: i for i, name in enumerate(self.names)}
+        self.durations = [poll_durations.get(name, 0) + overhead for name in self.names]
+        self.successors: List[List[int]] = [[] for _ in self.names]
+        self.inputs_count = [0] * len(self.names)
+        for i, name in enumerate(self.names):
+            for obj in set(pipeline.process_inputs(name).values()):
+                producer = pipeline.object_producer(obj)
+                if producer is not None:
+                    self.inputs_count[i] += 1
+                    self.successors[index[producer]].append(i)
+
+        # Longest path from each process to the end of the step, itself included
+        self.rank = list(self.durations)
+        for i in reversed(range(len(self.names))):
+            if self.successors[i]:
+                self.rank[i] += max(self.rank[j] for j in self.successors[i])
+
+    def critical_path(self) -> Tuple[float, List[str]]:
+        """
+        Longest chain of dependent polls, and its length. No number of workers can
+        make the poll phase of a step shorter than that.
+        """
+        if not self.names:
+            return 0, []
+        sources = [i for i, count in enumerate(self.inputs_count) if count == 0]
+        current: Optional[int] = max(sources, key=self.rank.__getitem__)
+        length = self.rank[current]
+        path = []
+        while current is not None:
+            path.append(self.names[current])
+            current = max(self.successors[current], key=self.rank.__getitem__, default=None)
+        return length, path
+
+    def run(self, workers: int, policy: str = "fifo") -> SimulationResult:
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy {policy}, expected one of {', '.join(self.POLICIES)}")
+        if workers < 1:
+            raise ValueError("At least one worker is needed")
+
+        pending = list(self.inputs_count)
+        if policy == "fifo":
+            queue = deque()
+            push, pop = queue.append, queue.popleft
+        else:
+            # heapq is a min-heap, and ties are broken by topological order
+            priority = self.rank if policy == "critical-path" else self.durations
+            queue = []
+            push = lambda i: heapq.heappush(queue, (-priority[i], i))
+            pop = lambda: heapq.heappop(queue)[1]
+
+        for i, count in enumerate(pending):
+            if count == 0:
+                push(i)
+        now = 0.0
+        idle = workers
+        running: List[Tuple[float, int]] = []
+        while queue or running:
+            while queue and idle > 0:
+                i = pop()
+                heapq.heappush(running, (now + self.durations[i], i))
+                idle -= 1
+            now, i = heapq.heappop(running)
+            idle += 1
+            for j in self.successors[i]:
+                pending[j] -= 1
+                if pending[j] == 0:
+                    push(j)
+
+        return SimulationResult(workers, policy, now, self.save_time, sum(self.durations))
@@ -0,0 +1,127 @@
+"""
+Parameter sweeps: one pipeline running several variants of some processes,
+see `lazydag run --sweep`.
+"""
+import itertools
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from .object import Object
+from .pipeline import Pipeline
+from .process import Process
+
+
+def variant_name(name: str, variant: int) -> str:
+    return f"{name}@{variant}"
+
+
+class Sweep:
+    """
+    A grid of values for attributes of some processes, e.g.
+
+        parameters:
+          map_numbers:
+            divisor: [2, 3]
+            offset: [0, 10]
+
+    has 4 variants, one per combination. `expand` replicates the parameterized
+    processes and everything downstream of them, with the objects they produce,
+    once per variant. The processes upstream run once and their objects are
+    shared, so a sweep only computes and stores the varying part N times.
+    """
+    def __init__(self, parameters: Dict[str, Dict[str, List[Any]]]):
+        if not parameters:
+            raise ValueError("A sweep needs at least one parameterized process")
+        self.parameters = parameters
+        axes = [
+            (proc_name, attr, values)
+            for proc_name, attrs in parameters.items()
+            for attr, values in attrs.items()
+        ]
+        for proc_name, attr, values in axes:
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"Parameter {attr} of {proc_name} needs a non-empty list of values")
+        # Parameters of each process, for each variant
+        self.variants: List[Dict[str, Dict[str, Any]]] = []
+        for combination in itertools.product(*(values for _, _, values in axes)):
+            variant = {proc_name: {} for proc_name in parameters}
+            for (proc_name, attr, _), value in zip(axes, combination):
+                variant[proc_name][attr] = value
+            self.variants.append(variant)
+
+    @classmethod
+    def from_yaml_file(cls, path: Path) -> "Sweep":
+        import yaml
+        with open(path) as f:
+            cfg = yaml.safe_load(f)
+        return cls(cfg.get("parameters", {}))
+
+    def replicated(self, pipeline: Pipeline) -> Set[str]:
+        """
+        The parameterized processes and their descendants.
+        """
+        replicated = set()
+        stack = list(self.parameters)
+        while stack:
+            proc_name = stack.pop()
+            if proc_name in replicated:
+                continue
+            replicated.add(proc_name)
+            stack.extend(pipeline.downstream_processes(proc_name))
+        return replicated
+
+    def expand(self, pipeline: Pipeline, processes: Iterable[Process], objects: Iterable[Object]) -> Tuple[Pipeline, List[Process], List[Object]]:
+        """
+        Builds the pipeline of the sweep, with `variant_name(name, i)` copies of the
+        replicated processes and of their outputs for the i-th variant. The copies
+        are added to the pipeline, i.e. their `on_add_to_pipeline` is called.
+        """
+        processes = {proc.name: proc for proc in processes}
+        objects = {obj.name: obj for obj in objects}
+        for proc_name, attrs in self.parameters.items():
+            if proc_name not in processes:
+                raise ValueError(f"Process {proc_name} does not exist")
+            for attr in attrs:
+                if not hasattr(processes[proc_name], attr):
+                    raise ValueError(f"Process {proc_name} has no attribute {attr}")
+
+        replicated = self.replicated(pipeline)
+        replicated_objects = {
+            obj_name for proc_name in replicated for obj_name in pipeline.process_outputs(proc_name).values()
+        }
+
+        expanded = Pipeline()
+        new_objects = [obj for name, obj in objects.items() if name not in replicated_objects]
+        new_processes = [proc for name, proc in processes.items() if name not in replicated]
+        for obj in new_objects:
+            expanded.add_object(obj.name)
+        for proc in new_processes:
+            expanded.add_process(proc.name, pipeline.process_inputs(proc.name), pipeline.process_outputs(proc.name))
+
+        def rename(obj_name: str, variant: int) -> str:
+            return variant_name(obj_name, variant) if obj_name in replicated_objects else obj_name
+
+        for variant, parameters in enumerate(self.variants):
+            for obj_name in sorted(replicated_objects):
+                clone = objects[obj_name].clone(variant_name(obj_name, variant))
+                clone.on_add_to_pipeline()
+                expanded.add_object(clone.name)
+                new_objects.append(clone)
+            for proc_name in sorted(replicated):
+                clone = processes[proc_name].clone(variant_name(proc_name, variant), **parameters.get(proc_name, {}))
+                clone.on_add_to_pipeline()
+                expanded.add_process(
+                    clone.name,
+                    inputs={port: rename(obj_name, variant) for port, obj_name in pipeline.process_inputs(proc_name).items()},
+                    outputs={port: rename(obj_name, variant) for port, obj_name in pipeline.process_outputs(proc_name).items()},
+                )
+                new_processes.append(clone)
+        return expanded, new_processes, new_objects
+
+    def print_variants(self):
+        print(f"Sweep of {len(self.variants)} variants:")
+        for variant, parameters in enumerate(self.variants):
+            description = ", ".join(
+                f"{proc_name}.{attr}={value!r}" for proc_name, attrs in parameters.items() for attr, value in attrs.items()
+            )
+            print(f"    @{variant}: {description}")
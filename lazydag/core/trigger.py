@@ -0,0 +1,147 @@
+"""
+Trigger policies decide in which steps a process is polled, see `Process.trigger`.
+"""
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+
+class CronSchedule:
+    """
+    A cron expression: minute, hour, day of month, month and day of week (0 or 7
+    is Sunday). Fields accept *, numbers, ranges (a-b), steps (*/n, a-b/n) and
+    comma separated lists of those. As in cron, when both days are restricted, a
+    time matches if either of them does.
+    """
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+    def __init__(self, expression: str):
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression {expression!r} must have 5 fields")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, weekdays = (
+            self._parse_field(part, low, high) for part, (low, high) in zip(parts, self.FIELDS)
+        )
+        # Sunday is both 0 and 7, datetime's is 6 with Monday as 0
+        self.weekdays = {(day - 1) % 7 for day in weekdays}
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in field.split(","):
+            range_part, _, step = item.partition("/")
+            if range_part == "*":
+                start, end = low, high
+            elif "-" in range_part:
+                start, end = (int(x) for x in range_part.split("-"))
+            else:
+                # "a/n" runs from a to the end of the range
+                start = int(range_part)
+                end = high if step else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Cron field {field!r} is out of range {low}-{high}")
+            values.update(range(start, end + 1, int(step) if step else 1))
+        return values
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = moment.weekday() in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, timestamp: float) -> float:
+        """
+        First matching minute strictly after the given time, as a timestamp.
+        """
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression {self.expression!r} never matches")
+
+
+class TriggerState:
+    """
+    What happened to the inputs of a process since it was last polled.
+    """
+    def __init__(self, wall_time: float):
+        self.last_run: Optional[float] = None
+        self.last_run_wall_time = wall_time
+        # Next time the cron schedule of the policy matches, once computed
+        self.next_cron: Optional[float] = None
+        # Number of changes to the trigger inputs, and when the first and last ones came in
+        self.pending_changes = 0
+        self.first_change: Optional[float] = None
+        self.last_change: Optional[float] = None
+        # Input ports that changed, side inputs included
+        self.changed_ports: Set[str] = set()
+
+    def record(self, now: float, changes: int):
+        if changes <= 0:
+            return
+        if self.first_change is None:
+            self.first_change = now
+        self.last_change = now
+        self.pending_changes += changes
+
+    def reset(self, now: float, wall_time: float):
+        self.last_run = now
+        self.last_run_wall_time = wall_time
+        self.next_cron = None
+        self.pending_changes = 0
+        self.first_change = None
+        self.last_change = None
+        self.changed_ports.clear()
+
+
+class TriggerPolicy:
+    """
+    When a process with pending changes on its trigger inputs is polled. Every
+    given condition must hold:
+
+      min_interval: seconds since the last poll
+      debounce: seconds without new changes
+      batch_size: number of pending changes
+      cron: a cron expression (see CronSchedule) matched since the last poll
+
+    max_delay overrides them all once the oldest pending change is that old, so
+    that batching or debouncing never delays changes indefinitely. Processes
+    without trigger inputs (sources) count every step as one change.
+    """
+    def __init__(self, min_interval: Optional[float] = None, debounce: Optional[float] = None,
+                 batch_size: Optional[int] = None, cron: Optional[str] = None, max_delay: Optional[float] = None):
+        self.min_interval = min_interval
+        self.debounce = debounce
+        self.batch_size = batch_size
+        self.cron = CronSchedule(cron) if cron is not None else None
+        self.max_delay = max_delay
+
+    def due(self, state: TriggerState, now: float, wall_time: float) -> bool:
+        if state.pending_changes == 0:
+            return False
+        if self.max_delay is not None and now - state.first_change >= self.max_delay:
+            return True
+        if self.min_interval is not None and state.last_run is not None and now - state.last_run < self.min_interval:
+            return False
+        if self.debounce is not None and now - state.last_change < self.debounce:
+            return False
+        if self.batch_size is not None and state.pending_changes < self.batch_size:
+            return False
+        if self.cron is not None:
+            if state.next_cron is None:
+                state.next_cron = self.cron.next_after(state.last_run_wall_time)
+            if state.next_cron > wall_time:
+                return False
+        return True
@@ -0,0 +1,47 @@
+import pytest
+import typer
+from lazydag.cli import objects as objects_cli
+from lazydag.contrib.objects import FSListObject
+from lazydag.contrib.versions import VersionStore
+
+def _setup(tmp_path, monkeypatch, keep=None):
+    store = VersionStore(tmp_path / "versions", keep=keep)
+    old = FSListObject("old", save_path=tmp_path / "old")
+    new = FSListObject("new", save_path=tmp_path / "new")
+    for obj in (old, new):
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    monkeypatch.setattr(objects_cli, "_get_store", lambda: store)
+    monkeypatch.setattr(objects_cli, "get_processes_and_objects", lambda: ([], [old, new]))
+    return store, old, new
+
+def _save(store, obj, value, step):
+    obj.push(value)
+    obj.save()
+    store.commit(obj.name, obj.save_path, step=step)
+
+def test_rollback(tmp_path, monkeypatch):
+    store, old, new = _setup(tmp_path, monkeypatch)
+    _save(store, old, 1, step=1)
+    _save(store, old, 2, step=2)
+    _save(store, new, 3, step=2)
+
+    objects_cli.rollback(None, 1)
+    old.on_pipeline_start()
+    new.on_pipeline_start()
+    assert list(old) == [1]
+    assert list(new) == []
+
+def test_rollback_past_pruned_versions(tmp_path, monkeypatch):
+    store, old, new = _setup(tmp_path, monkeypatch, keep=1)
+    _save(store, old, 1, step=1)
+    _save(store, old, 2, step=2)
+    _save(store, new, 3, step=2)
+
+    with pytest.raises(typer.Exit):
+        objects_cli.rollback(None, 1)
+    # The current data is left alone
+    old.on_pipeline_start()
+    new.on_pipeline_start()
+    assert list(old) == [1, 2]
+    assert list(new) == [3]
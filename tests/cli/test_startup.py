@@ -0,0 +1,13 @@
+import subprocess
+import sys
+
+def test_cli_import_is_lazy():
+    # Heavy modules must only be imported by the commands that need them
+    code = (
+        "import sys\n"
+        "import lazydag.cli.main\n"
+        "heavy = {'yaml', 'lazydag.core.scheduler', 'lazydag.contrib.objects', 'settings'}\n"
+        "print(sorted(heavy & set(sys.modules)))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
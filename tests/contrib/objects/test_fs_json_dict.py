@@ -132,3 +132,50 @@ def test_fs_json_dict_non_existent(tmp_path):
     
     with pytest.raises(KeyError):
         obj.get("missing")
+
+def test_fs_json_dict_snapshot(tmp_path):
+    with open(tmp_path / "key1", "w") as f:
+        json.dump("v1", f)
+
+    obj = FSJsonDictObject("test_dict", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+
+    snapshot = obj.snapshot()
+    obj.set("key1", "v1_new")
+    obj.set("key2", "v2")
+    # Uncommitted changes are invisible
+    assert snapshot.get("key1") == "v1"
+    obj.save()
+
+    # So are the committed ones made after pinning
+    assert snapshot.get("key1") == "v1"
+    with pytest.raises(KeyError):
+        snapshot.get("key2")
+    assert set(snapshot.keys()) == {"key1"}
+
+    new_snapshot = obj.snapshot()
+    assert new_snapshot.get("key1") == "v1_new"
+    assert set(new_snapshot.keys()) == {"key1", "key2"}
+
+def test_fs_json_dict_bulk(tmp_path):
+    obj = FSJsonDictObject("test_dict", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.set_many([f"k{i}" for i in range(5)], range(5))
+    obj.save()
+    assert json.loads((tmp_path / "k3").read_text()) == 3
+
+    obj.set_many(["k0"], [10])
+    obj.remove_many(["k1"])
+    assert obj.get_many(["k0", "k2"]) == [10, 2]
+    assert obj.get_many(["k0", "k1"], old=True) == [0, 1]
+    with pytest.raises(KeyError):
+        obj.get_many(["k1"])
+    obj.save()
+    assert not (tmp_path / "k1").exists()
+
+    # Every key is validated, including ones hiding the separator
+    for keys in [["ok", "bad key"], ["ok\nok"], ["ok", 1], [""]]:
+        with pytest.raises(ValueError):
+            obj.set_many(keys, [0] * len(keys))
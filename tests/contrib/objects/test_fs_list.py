@@ -0,0 +1,186 @@
+import pickle
+import pytest
+from lazydag.contrib.objects import FSListObject
+
+def test_fs_list_basic(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+
+    obj.push(1)
+    obj.push(2)
+    obj.set(0, 10)
+    assert list(obj) == [10, 2]
+    assert obj.changed() is True
+
+    obj.save()
+    assert obj.changed() is False
+    with open(tmp_path / "data.pkl", "rb") as f:
+        assert list(pickle.load(f)) == [10, 2]
+
+def test_fs_list_lazy_loading(tmp_path):
+    with open(tmp_path / "data.pkl", "wb") as f:
+        pickle.dump([1, 2, 3], f)
+
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+
+    # Nothing is read from disk until the first access
+    assert not obj.is_loaded()
+    assert obj.load_time is None
+    assert obj.changed() is False
+    obj.save()
+    assert not obj.is_loaded()
+
+    # Only the accessed copy is loaded
+    assert len(obj) == 3
+    assert not obj.is_loaded()
+    assert obj.load_time is not None
+
+    # Old and current views don't share state
+    obj.set(0, 100)
+    assert obj.get(0) == 100
+    assert obj.get(0, old=True) == 1
+    assert obj.is_loaded()
+
+def test_fs_list_preload(tmp_path):
+    with open(tmp_path / "data.pkl", "wb") as f:
+        pickle.dump(["a"], f)
+
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.preload()
+    assert obj.is_loaded()
+
+    # Restarting the pipeline drops the in-memory state again
+    obj.on_pipeline_start()
+    assert not obj.is_loaded()
+    assert obj[0] == "a"
+
+def test_fs_list_snapshot(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.push(1)
+    obj.save()
+
+    snapshot = obj.snapshot()
+    assert snapshot.version == 1
+    obj.push(2)
+    obj.set(0, 10)
+    obj.save()
+
+    # The pinned version is unaffected by later commits
+    assert list(snapshot) == [1]
+    assert list(obj.snapshot()) == [10, 2]
+
+def test_fs_list_change_feed(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.push(1)
+    obj.save()
+
+    # A new consumer gets the whole state
+    assert list(obj.iter_changes("consumer")) == [("clear",), ("insert", 0, 1)]
+    obj.ack("consumer")
+    obj.save()
+
+    obj.push(2)
+    obj.save()
+
+    obj.set(0, 10)
+    obj.remove(1)
+    # Committed changes since the ack, followed by the pending ones
+    assert list(obj.iter_changes("consumer")) == [("insert", 1, 2), ("set", 0, 10), ("remove", 1, 2)]
+    obj.ack("consumer")
+    obj.save()
+    assert list(obj.iter_changes("consumer")) == []
+
+    # Offsets survive restarts
+    obj.push(3)
+    obj.save()
+    obj.on_pipeline_start()
+    assert list(obj.iter_changes("consumer")) == [("insert", 1, 3)]
+    assert list(obj.iter_changes("other"))[0] == ("clear",)
+
+def test_fs_list_spill(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    for i in range(1000):
+        obj.push(i)
+    obj.save()
+    obj.push(1000)
+
+    footprint = obj.memory_footprint()
+    assert footprint > 0
+    # Only the committed copy can be spilled while there are unsaved changes
+    assert obj.spill() > 0
+    assert obj.memory_footprint() < footprint
+    assert len(obj) == 1001
+    assert obj.get(1000, old=False) == 1000
+
+    # Spilled state is paged back in on access
+    assert obj.get(0, old=True) == 0
+    assert len(obj.snapshot()) == 1000
+    obj.save()
+
+    assert obj.spill() > 0
+    assert obj.memory_footprint() == 0
+    assert obj[1000] == 1000
+
+def test_fs_list_spill_cold_first(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.extend(range(1000))
+    obj.save()
+    obj.preload()
+
+    # A small target only costs the committed copy
+    assert obj.spill(target=1) > 0
+    assert "_data" not in obj.__dict__
+    assert "_current" in obj.__dict__
+    assert obj.get(999, old=True) == 999
+
+def test_fs_list_bulk(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.extend(range(5))
+    obj.save()
+    assert list(obj.iter_changes("consumer"))[1:] == [("insert", i, i) for i in range(5)]
+    obj.ack("consumer")
+    obj.save()
+
+    obj.set_many([0, 2], [10, 12])
+    obj.remove_many([1, 3])
+    assert obj.get_many([0, 1, 2]) == [10, 12, 4]
+    assert obj.get_many([0], old=True) == [0]
+    obj.save()
+    # Each bulk call is one batch, read back as individual changes
+    assert list(obj.iter_changes("consumer")) == [
+        ("set", 0, 10), ("set", 2, 12), ("remove", 3, 3), ("remove", 1, 1),
+    ]
+    with pytest.raises(ValueError):
+        obj.set_many([3], [0])
+
+
+def test_fs_list_keeps_references(tmp_path):
+    obj = FSListObject("test_list", save_path=tmp_path)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    shared = {"x": 1}
+    cyclic = []
+    cyclic.append(cyclic)
+    obj.push(shared)
+    obj.push(shared)
+    obj.push(cyclic)
+    obj.save()
+
+    obj.on_pipeline_start()
+    assert obj[0] is obj[1]
+    assert obj[2][0] is obj[2]
@@ -0,0 +1,89 @@
+import pytest
+from lazydag.contrib.objects import FSStreamObject
+from lazydag.contrib.storage import LocalStorage
+
+def _make_stream(tmp_path, **kwargs):
+    obj = FSStreamObject("test_stream", save_path=tmp_path, **kwargs)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    return obj
+
+def test_fs_stream_append_and_read(tmp_path):
+    obj = _make_stream(tmp_path)
+    assert obj.append("a") == 0
+    assert obj.append("b") == 1
+    assert obj.changed() is True
+
+    # Unsaved records are readable too
+    assert obj.read("consumer", max_records=1) == [(0, "a")]
+    obj.save()
+    assert obj.changed() is False
+
+    obj.extend(["c", "d"])
+    assert obj.read("consumer") == [(1, "b"), (2, "c"), (3, "d")]
+    assert obj.read("consumer") == []
+    assert obj.get(2) == "c"
+    obj.save()
+
+    # Records and cursors survive restarts
+    obj.on_pipeline_start()
+    assert list(obj) == ["a", "b", "c", "d"]
+    assert obj.lag("consumer") == 0
+    assert obj.read("other") == [(0, "a"), (1, "b"), (2, "c"), (3, "d")]
+
+def test_fs_stream_retention(tmp_path):
+    obj = _make_stream(tmp_path, segment_bytes=1, retention_bytes=1)
+    for i in range(3):
+        obj.append(i)
+        obj.save()
+
+    # Every save rolls a segment, only the last one is retained
+    assert obj.start_offset == 2
+    assert list(obj) == [2]
+    assert len(list((tmp_path / "segments").iterdir())) == 1
+    assert obj.read("consumer") == [(2, 2)]
+    assert obj.append(3) == 3
+
+def test_fs_stream_retention_writes_index_first(tmp_path, monkeypatch):
+    obj = _make_stream(tmp_path, segment_bytes=1, retention_bytes=1)
+    obj.append(0)
+    obj.save()
+    obj.append(1)
+
+    def crash(path, data):
+        raise OSError("crash")
+
+    # The expired segment outlives a crash before the index is written
+    monkeypatch.setattr(obj, "_write_json_atomic", crash)
+    with pytest.raises(OSError):
+        obj.save()
+    monkeypatch.undo()
+    obj.on_pipeline_start()
+    assert list(obj) == [0]
+
+def test_fs_stream_rejects_other_storage(tmp_path):
+    FSStreamObject("test_stream", save_path=tmp_path, storage=LocalStorage(tmp_path))
+    with pytest.raises(ValueError, match="locally"):
+        FSStreamObject("test_stream", save_path=tmp_path, storage=LocalStorage(tmp_path / "shared"))
+
+def test_fs_stream_change_feed(tmp_path):
+    obj = _make_stream(tmp_path)
+    obj.append("a")
+    assert list(obj.iter_changes("consumer")) == [("clear",), ("append", 0, "a")]
+    obj.ack("consumer")
+    obj.save()
+    obj.append("b")
+    obj.save()
+    assert list(obj.iter_changes("consumer")) == [("append", 1, "b")]
+
+def test_fs_stream_prefetch(tmp_path):
+    obj = _make_stream(tmp_path, segment_bytes=1)
+    for i in range(3):
+        obj.append(i)
+        obj.save()
+
+    obj.on_pipeline_start()
+    obj.prefetch([range(0, 2)])
+    assert obj.read("consumer") == [(0, 0), (1, 1), (2, 2)]
+    # Two segments were prefetched, the third one had to be read on demand
+    assert obj.prefetch_stats() == {"prefetched": 2, "hits": 2, "misses": 1, "wasted": 0}
@@ -0,0 +1,44 @@
+from lazydag.contrib.memory import DictObject, ListObject
+
+def test_list_object():
+    obj = ListObject("test_list")
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    obj.push(1)
+    obj.push(2)
+    assert obj.changed() is True
+    obj.save()
+    assert obj.changed() is False
+
+    snapshot = obj.snapshot()
+    obj.set(0, 10)
+    obj.extend([3])
+    # The committed copy is only shared until the next change
+    assert list(obj) == [10, 2, 3]
+    assert obj.get(0, old=True) == 1
+    assert list(snapshot) == [1, 2]
+    obj.save()
+    obj.clear()
+    assert list(obj) == []
+    assert list(obj.snapshot()) == [10, 2, 3]
+
+    # Nothing survives a restart
+    obj.save()
+    obj.on_pipeline_start()
+    assert list(obj) == []
+
+def test_dict_object_change_feed():
+    obj = DictObject("test_dict")
+    obj.on_pipeline_start()
+    obj.set("a", 1)
+    obj.save()
+    assert list(obj.iter_changes("consumer")) == [("clear",), ("set", "a", 1)]
+    obj.ack("consumer")
+    obj.save()
+
+    obj.set_many(["b", "c"], [2, 3])
+    obj.save()
+    obj.remove("a")
+    assert list(obj.iter_changes("consumer")) == [("set", "b", 2), ("set", "c", 3), ("remove", "a")]
+    assert obj.get("a", old=True) == 1
+    assert dict(obj.items()) == {"b": 2, "c": 3}
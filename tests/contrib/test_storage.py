@@ -0,0 +1,173 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from urllib.parse import parse_qs, unquote, urlsplit
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from lazydag.contrib.objects import FSJsonDictObject, FSListObject
+from lazydag.contrib.storage import HTTPStorage, LocalStorage, StorageError
+
+NS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+class FakeS3Handler(BaseHTTPRequestHandler):
+    """
+    The subset of the S3 API used by HTTPStorage, kept in memory.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _parse(self):
+        url = urlsplit(self.path)
+        _, bucket, *key = unquote(url.path).split("/", 2)
+        return bucket, key[0] if key else None, {k: v[0] for k, v in parse_qs(url.query, keep_blank_values=True).items()}
+
+    def _reply(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        bucket, key, query = self._parse()
+        if key is None:
+            keys = sorted(k for k in self.server.store if k.startswith(query["prefix"]) and "/" not in k[len(query["prefix"]):])
+            start = int(query.get("continuation-token", 0))
+            page = keys[start:start + self.server.page_size]
+            truncated = start + len(page) < len(keys)
+            body = f'<ListBucketResult xmlns="{NS}"><IsTruncated>{str(truncated).lower()}</IsTruncated>'
+            body += "".join(f"<Contents><Key>{k}</Key></Contents>" for k in page)
+            if truncated:
+                body += f"<NextContinuationToken>{start + len(page)}</NextContinuationToken>"
+            self._reply(200, (body + "</ListBucketResult>").encode())
+        elif key in self.server.store:
+            self._reply(200, self.server.store[key])
+        else:
+            self._reply(404, b"<Error><Code>NoSuchKey</Code></Error>")
+
+    def do_PUT(self):
+        bucket, key, query = self._parse()
+        body = self._body()
+        if "uploadId" in query:
+            self.server.uploads[query["uploadId"]][int(query["partNumber"])] = body
+            self._reply(200, headers={"ETag": f'"{query["partNumber"]}"'})
+        else:
+            self.server.store[key] = body
+            self._reply(200)
+
+    def do_POST(self):
+        bucket, key, query = self._parse()
+        body = self._body()
+        if "uploads" in query:
+            upload_id = str(len(self.server.uploads))
+            self.server.uploads[upload_id] = {}
+            self._reply(200, f'<InitiateMultipartUploadResult xmlns="{NS}"><UploadId>{upload_id}</UploadId></InitiateMultipartUploadResult>'.encode())
+        else:
+            parts = self.server.uploads.pop(query["uploadId"])
+            numbers = [int(e.text) for e in ET.fromstring(body).iter("PartNumber")]
+            self.server.store[key] = b"".join(parts[n] for n in numbers)
+            self.server.multipart_parts.append(len(numbers))
+            self._reply(200, b"<CompleteMultipartUploadResult/>")
+
+    def do_DELETE(self):
+        bucket, key, query = self._parse()
+        self.server.store.pop(key, None)
+        self._reply(204)
+
+
+@pytest.fixture
+def s3_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeS3Handler)
+    server.store = {}
+    server.uploads = {}
+    server.multipart_parts = []
+    server.requests = []
+    server.connections = 0
+    server.page_size = 1000
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _storage(server, **kwargs):
+    return HTTPStorage(f"http://127.0.0.1:{server.server_port}", "bucket", prefix="obj/", **kwargs)
+
+def test_local_storage(tmp_path):
+    storage = LocalStorage(tmp_path)
+    storage.write_many({"a": b"1", "b": b"2"})
+    (tmp_path / ".feed").mkdir()
+    assert sorted(storage.list()) == ["a", "b"]
+    assert storage.read_many(["a", "c"]) == {"a": b"1", "c": None}
+    storage.clear()
+    assert list(storage.list()) == []
+
+def test_http_storage(s3_server):
+    storage = _storage(s3_server, access_key="key", secret_key="secret", concurrency=4)
+    storage.write("a", b"1")
+    storage.write_many({f"k{i}": str(i).encode() for i in range(50)})
+    assert s3_server.store["obj/a"] == b"1"
+    assert storage.read("a") == b"1"
+    assert storage.read("missing") is None
+    assert storage.read_many(["k1", "k2", "missing"]) == {"k1": b"1", "k2": b"2", "missing": None}
+
+    # Keep-alive connections are reused across requests and threads
+    assert storage._pool.connections_opened <= 4
+    assert s3_server.connections == storage._pool.connections_opened
+
+    s3_server.page_size = 7
+    assert sorted(storage.list()) == sorted(["a"] + [f"k{i}" for i in range(50)])
+    storage.write_many({"a": None})
+    assert storage.read("a") is None
+    with pytest.raises(StorageError):
+        storage._request("GET", storage._object_path("missing"))
+
+def test_http_storage_multipart(s3_server):
+    storage = _storage(s3_server, part_size=1000)
+    data = bytes(range(256)) * 20
+    storage.write("big", data)
+    assert s3_server.multipart_parts == [6]
+    assert storage.read("big") == data
+
+def test_objects_on_http_storage(s3_server, tmp_path):
+    storage = _storage(s3_server)
+    obj = FSJsonDictObject("test_dict", save_path=tmp_path / "dict", storage=storage)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    for i in range(100):
+        obj.set(f"k{i}", i)
+    obj.save()
+    assert s3_server.store["obj/k5"] == b"5"
+
+    # A scan fetches keys in concurrent batches instead of one by one
+    obj.on_pipeline_start()
+    assert dict(obj.items()) == {f"k{i}": i for i in range(100)}
+    s3_server.requests.clear()
+    assert obj.get("k99") == 99
+    assert s3_server.requests == []
+
+    lst = FSListObject("test_list", save_path=tmp_path / "list", storage=storage.with_prefix("list/"))
+    lst.on_add_to_pipeline()
+    lst.on_pipeline_start()
+    lst.push(1)
+    lst.save()
+    lst.on_pipeline_start()
+    assert list(lst) == [1]
+    assert "list/data.pkl" in s3_server.store
+
+    obj.purge()
+    assert sorted(s3_server.store) == ["list/data.pkl"]
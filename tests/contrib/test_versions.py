@@ -0,0 +1,110 @@
+import pytest
+from lazydag.contrib.objects import FSListObject
+from lazydag.contrib.versions import VersionStore
+
+def test_version_store_commit_and_checkout(tmp_path):
+    store = VersionStore(tmp_path / "versions")
+    obj_path = tmp_path / "obj"
+    obj_path.mkdir()
+
+    (obj_path / "a").write_bytes(b"aaaabbbb")
+    assert store.commit("obj", obj_path) == 1
+    # Nothing changed, no new version
+    assert store.commit("obj", obj_path) == 1
+
+    (obj_path / "a").write_bytes(b"aaaacccc")
+    (obj_path / "b").write_bytes(b"bbbb")
+    assert store.commit("obj", obj_path) == 2
+    assert store.versions("obj") == [1, 2]
+
+    # Chunks are shared between versions and files
+    chunks = list((tmp_path / "versions" / "chunks").glob("*/*"))
+    assert len(chunks) == 3
+
+    store.checkout("obj", 1, obj_path)
+    assert (obj_path / "a").read_bytes() == b"aaaabbbb"
+    assert not (obj_path / "b").exists()
+
+    store.checkout("obj", 2, obj_path)
+    assert (obj_path / "a").read_bytes() == b"aaaacccc"
+    assert (obj_path / "b").read_bytes() == b"bbbb"
+
+    with pytest.raises(ValueError):
+        store.checkout("obj", 3, obj_path)
+
+def test_version_store_retention(tmp_path):
+    store = VersionStore(tmp_path / "versions", keep=2)
+    obj_path = tmp_path / "obj"
+    obj_path.mkdir()
+    for content in [b"1111", b"2222", b"3333"]:
+        (obj_path / "data").write_bytes(content)
+        store.commit("obj", obj_path)
+    assert store.versions("obj") == [2, 3]
+
+    # Chunk of version 1 is no longer referenced
+    assert store.gc() == 1
+    assert store.prune(keep=1) == 1
+    assert store.versions("obj") == [3]
+
+def test_version_store_dedups_head_edits(tmp_path):
+    store = VersionStore(tmp_path / "versions", min_chunk_size=1 << 10, avg_chunk_size=4 << 10, max_chunk_size=16 << 10)
+    chunks_path = tmp_path / "versions" / "chunks"
+    lst = FSListObject("lst", save_path=tmp_path / "lst")
+    store.track_objects([lst])
+    lst.on_add_to_pipeline()
+    lst.on_pipeline_start()
+    for i in range(20000):
+        lst.push({"id": i, "value": i * 0.5})
+    lst.save()
+    store.commit("lst", lst.save_path)
+    initial = len(list(chunks_path.glob("*/*")))
+    assert initial > 50
+
+    # Removing or inserting at the head only rewrites the chunks around it
+    lst.on_pipeline_start()
+    lst.remove(0)
+    lst.save()
+    store.commit("lst", lst.save_path)
+    after_remove = len(list(chunks_path.glob("*/*")))
+    assert after_remove - initial <= 3
+
+    lst.on_pipeline_start()
+    lst.insert(0, {"id": -1, "value": 0.0})
+    lst.save()
+    store.commit("lst", lst.save_path)
+    assert len(list(chunks_path.glob("*/*"))) - after_remove <= 3
+
+    store.checkout("lst", 2, lst.save_path)
+    lst.on_pipeline_start()
+    assert lst[0] == {"id": 1, "value": 0.5}
+    assert len(lst) == 19999
+
+def test_version_store_checkout_step(tmp_path):
+    store = VersionStore(tmp_path / "versions")
+    a_path, b_path = tmp_path / "a", tmp_path / "b"
+    a_path.mkdir()
+    b_path.mkdir()
+    for content in [b"1", b"2", b"3"]:
+        step = store.next_step()
+        (a_path / "data").write_bytes(content)
+        store.commit("a", a_path, step=step)
+        # b only changes in the first step
+        (b_path / "data").write_bytes(b"b")
+        store.commit("b", b_path, step=step)
+    assert store.version_at_step("a", 2) == 2
+    assert store.version_at_step("b", 3) == 1
+
+    store.checkout("a", None, a_path, step=2)
+    assert (a_path / "data").read_bytes() == b"2"
+    with pytest.raises(ValueError):
+        store.version_at_step("a", 0)
+
+def test_version_store_rejects_remote_objects(tmp_path):
+    from lazydag.contrib.storage import LocalStorage
+
+    store = VersionStore(tmp_path / "versions")
+    local = FSListObject("local", save_path=tmp_path / "local")
+    store.check_objects([local])
+    elsewhere = FSListObject("elsewhere", save_path=tmp_path / "elsewhere", storage=LocalStorage(tmp_path / "shared"))
+    with pytest.raises(ValueError, match="elsewhere"):
+        store.check_objects([local, elsewhere])
@@ -0,0 +1,103 @@
+import time
+
+from lazydag.contrib.objects import FSListObject
+from lazydag.core.autotune import Autotuner, ClassSample
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.process import Process
+from lazydag.core.scheduler import Scheduler
+
+
+def _feed(tuner, steps, makespan, capacity, runs=10, busy=None, wait=0.0):
+    busy = capacity * makespan if busy is None else busy
+    decisions = {}
+    for _ in range(steps):
+        decisions.update(tuner.observe(makespan, {"io": ClassSample(capacity, runs, busy, wait)}))
+    return decisions
+
+
+def test_autotuner_grows_while_queueing():
+    tuner = Autotuner(window=3, bounds={"io": (1, 8)})
+    # Half a step of waiting per poll
+    assert _feed(tuner, 2, 1.0, 4, wait=5.0) == {}
+    assert _feed(tuner, 1, 1.0, 4, wait=5.0) == {"io": 6}
+    # Faster steps keep the grow, and the bound caps the next one
+    assert _feed(tuner, 3, 0.5, 6, wait=2.5) == {"io": 8}
+    assert _feed(tuner, 3, 0.4, 8, wait=2.0) == {}
+    assert [d["to"] for d in tuner.decisions] == [6, 8]
+
+
+def test_autotuner_reverts_useless_grow():
+    tuner = Autotuner(window=2, retry_after=8)
+    assert _feed(tuner, 2, 1.0, 2, wait=5.0) == {"io": 3}
+    assert _feed(tuner, 2, 1.0, 3, wait=5.0) == {"io": 2}
+    assert "didn't speed up" in tuner.decisions[-1]["reason"]
+    # Still queueing, but not retried until retry_after steps passed
+    assert _feed(tuner, 4, 1.0, 2, wait=5.0) == {}
+    assert _feed(tuner, 4, 1.0, 2, wait=5.0) == {"io": 3}
+
+
+def test_autotuner_shrinks_idle_classes_with_hysteresis():
+    tuner = Autotuner(window=2, bounds={"io": (2, 8)})
+    # Between the thresholds nothing changes
+    assert _feed(tuner, 4, 1.0, 4, busy=2.0) == {}
+    assert _feed(tuner, 2, 1.0, 4, busy=0.4) == {"io": 3}
+    assert _feed(tuner, 2, 1.0, 3, busy=0.3) == {"io": 2}
+    assert _feed(tuner, 2, 1.0, 2, busy=0.2) == {}
+
+
+def test_autotuner_latency_target():
+    tuner = Autotuner(window=2, target_latency=2.0)
+    # Queueing, but within the target
+    assert _feed(tuner, 2, 1.0, 4, wait=5.0) == {}
+    assert _feed(tuner, 2, 3.0, 4, wait=15.0) == {"io": 6}
+
+
+class IOSleepProcess(Process):
+    inputs = []
+    outputs = ["output_nums"]
+    resource_class = "io"
+
+    def poll(self, output_nums):
+        time.sleep(0.02)
+        output_nums.push(len(output_nums))
+
+
+def test_scheduler_autotune(tmp_path, capsys):
+    pipeline = Pipeline()
+    objects = [FSListObject(f"o{i}", save_path=tmp_path / f"o{i}") for i in range(4)]
+    for i, obj in enumerate(objects):
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+        pipeline.add_process(f"p{i}", inputs={}, outputs={"output_nums": obj.name})
+    processes = [IOSleepProcess(f"p{i}") for i in range(4)]
+    log_path = tmp_path / "autotune.jsonl"
+    scheduler = Scheduler(pipeline, processes, objects, resource_classes={"io": 1},
+                          autotuner=Autotuner(window=2, log_path=log_path))
+    for _ in range(4):
+        scheduler.step()
+    assert scheduler.pools["io"].capacity > 1
+    assert "Autotune: io workers 1 -> 2" in capsys.readouterr().out
+    assert log_path.read_text().count("\n") == len(scheduler.autotuner.decisions)
+
+
+def test_autotuner_skips_unused_classes():
+    tuner = Autotuner(window=2)
+    assert _feed(tuner, 4, 1.0, 4, runs=0, busy=0.0) == {}
+
+
+def test_scheduler_autotune_shrinks_underused_pool(tmp_path):
+    pipeline = Pipeline()
+    obj = FSListObject("o", save_path=tmp_path / "o")
+    pipeline.add_object(obj.name)
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    pipeline.add_process("p", inputs={}, outputs={"output_nums": "o"})
+    # One poll at a time can't use 8 workers
+    scheduler = Scheduler(pipeline, [IOSleepProcess("p")], [obj], resource_classes={"io": 8},
+                          autotuner=Autotuner(window=2, bounds={"io": (1, 8)}))
+    for _ in range(20):
+        scheduler.step()
+    assert scheduler.pools["io"].capacity <= 4
+    # The default class ran nothing, so it was left alone
+    assert scheduler.pools["default"].capacity == 4
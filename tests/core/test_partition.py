@@ -0,0 +1,57 @@
+import pytest
+
+from lazydag.contrib.objects import FSDictObject, FSListObject, FSStreamObject
+from lazydag.core.partition import ShardView, ShardWriter, merge_shards, split_keys
+
+
+def _started(obj):
+    obj.on_add_to_pipeline()
+    obj.on_pipeline_start()
+    return obj
+
+
+def test_shard_view_indexing(tmp_path):
+    table = _started(FSDictObject("table", save_path=tmp_path / "table"))
+    for i in range(20):
+        table.set(f"key_{i}", i)
+    shard_keys = split_keys(table, 3)
+    views = [ShardView(table, shard, 3, keys) for shard, keys in enumerate(shard_keys)]
+    assert sorted(key for view in views for key in view.keys()) == sorted(table.keys())
+    for view in views:
+        for key in view.keys():
+            assert view[key] == table.get(key)
+    owner = next(view for view in views if "key_0" in view)
+    other = next(view for view in views if view is not owner)
+    with pytest.raises(KeyError):
+        other["key_0"]
+    owner["key_0"] = 100
+    assert table.get("key_0") == 100
+
+    nums = _started(FSListObject("nums", save_path=tmp_path / "nums"))
+    nums.extend(range(10))
+    view = ShardView(nums, 1, 2)
+    assert view.index_range == range(5, 10)
+    assert view[7] == 7
+    with pytest.raises(KeyError):
+        view[2]
+
+    writer = ShardWriter(nums)
+    writer[0] = -1
+    assert writer[0] == 0
+    merge_shards(nums, [writer])
+    assert nums[0] == -1
+
+
+def test_shard_view_trimmed_stream(tmp_path):
+    stream = _started(FSStreamObject("stream", save_path=tmp_path / "stream", segment_bytes=64, retention_bytes=200))
+    for i in range(40):
+        stream.append(f"record_{i:02d}_padding")
+        stream.save()
+    assert stream.start_offset > 0
+
+    views = [ShardView(stream, shard, 3) for shard in range(3)]
+    assert views[0].index_range.start == stream.start_offset
+    assert views[-1].index_range.stop == stream.end_offset
+    assert [record for view in views for record in view] == list(stream)
+    offset = views[1].index_range.start
+    assert views[1][offset] == stream.get(offset)
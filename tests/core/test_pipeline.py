@@ -0,0 +1,55 @@
+import pytest
+from lazydag.core.pipeline import Pipeline
+
+def _make_pipeline(spec):
+    pipeline = Pipeline()
+    for _, _, outputs in spec:
+        for obj in outputs:
+            pipeline.add_object(obj)
+    for name, inputs, outputs in spec:
+        pipeline.add_process(
+            name,
+            inputs={f"in_{i}": obj for i, obj in enumerate(inputs)},
+            outputs={f"out_{i}": obj for i, obj in enumerate(outputs)},
+        )
+    return pipeline
+
+def test_pipeline_linear_chains():
+    pipeline = _make_pipeline([
+        ("a", [], ["o_a"]),
+        ("b", ["o_a"], ["o_b"]),
+        ("c", ["o_b"], ["o_c"]),
+        # c fans out, so the chain stops there
+        ("d", ["o_c"], ["o_d"]),
+        ("e", ["o_c"], ["o_e"]),
+        # f reads from two processes, so it can't be fused with either
+        ("f", ["o_d", "o_e"], ["o_f"]),
+        ("g", ["o_f"], []),
+    ])
+    assert pipeline.linear_chains() == [["a", "b", "c"], ["f", "g"]]
+
+def test_pipeline_topological_sort_cycle():
+    pipeline = Pipeline()
+    pipeline.add_object("o_a")
+    pipeline.add_object("o_b")
+    pipeline.add_process("a", inputs={"in": "o_b"}, outputs={"out": "o_a"})
+    pipeline.add_process("b", inputs={"in": "o_a"}, outputs={"out": "o_b"})
+    with pytest.raises(ValueError, match="cycle"):
+        pipeline.topological_sort()
+
+def test_pipeline_yaml_cache(tmp_path, monkeypatch):
+    import pickle
+    from lazydag.core import pipeline as pipeline_module
+
+    path = tmp_path / "pipeline.yaml"
+    cache_path = tmp_path / "pipeline.pickle"
+    _make_pipeline([("a", [], ["o_a"]), ("b", ["o_a"], [])]).to_yaml_file(path)
+    first = Pipeline.from_yaml_file(path, cache_path=cache_path)
+    assert Pipeline.from_yaml_file(path, cache_path=cache_path).processes == first.processes
+
+    # A new cache format parses the yaml again and replaces the cached pipeline
+    monkeypatch.setattr(pipeline_module, "_CACHE_FORMAT", pipeline_module._CACHE_FORMAT + 1)
+    assert Pipeline.from_yaml_file(path, cache_path=cache_path).processes == first.processes
+    with open(cache_path, "rb") as f:
+        (cache_format, _), _ = pickle.load(f)
+    assert cache_format == pipeline_module._CACHE_FORMAT
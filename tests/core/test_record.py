@@ -0,0 +1,100 @@
+import pickle
+import random
+
+from lazydag.contrib.objects import FSDictObject, FSListObject
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.process import Process
+from lazydag.core.record import Recorder, read_frames
+from lazydag.core.scheduler import Scheduler
+
+
+class RandomSourceProcess(Process):
+    inputs = []
+    outputs = ["nums", "latest"]
+    has_daemon = True
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.rng = random.Random(42)
+        self.daemon_started = False
+        self.steps = 0
+
+    def run_daemon(self, nums, latest):
+        self.daemon_started = True
+
+    def poll(self, nums, latest):
+        self.steps += 1
+        # Some steps bring nothing
+        if self.steps % 3 == 0:
+            return
+        values = [self.rng.randint(0, 100) for _ in range(self.rng.randint(1, 5))]
+        nums.extend(values)
+        if len(nums) > 8:
+            nums.remove_many([0, 1])
+        nums.set_many([0], [-1])
+        latest.set("value", values[-1])
+        latest.remove("missing")
+
+
+class DoubleProcess(Process):
+    inputs = ["nums"]
+    outputs = ["doubled"]
+
+    def poll(self, nums, doubled):
+        if nums.changed():
+            doubled.clear()
+            for num in nums:
+                doubled.push(num * 2)
+
+
+def build_scheduler(path, **kwargs):
+    pipeline = Pipeline()
+    objects = [FSListObject("nums", save_path=path / "nums"), FSDictObject("latest", save_path=path / "latest"),
+               FSListObject("doubled", save_path=path / "doubled")]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    pipeline.add_process("source", inputs={}, outputs={"nums": "nums", "latest": "latest"})
+    pipeline.add_process("double", inputs={"nums": "nums"}, outputs={"doubled": "doubled"})
+    return Scheduler(pipeline, [RandomSourceProcess("source"), DoubleProcess("double")], objects, **kwargs)
+
+
+def test_record_and_replay(tmp_path):
+    recording = tmp_path / "recording"
+    recorded = build_scheduler(tmp_path / "recorded", record_path=recording)
+    for _ in range(9):
+        recorded.step()
+    recorded.recorder.close()
+    # Only the steps that changed something are recorded
+    assert [step for step, _ in read_frames(recording / "source.changes")] == [0, 1, 3, 4, 6, 7]
+    assert not (recording / "double.changes").exists()
+    # Recording again continues the step numbers
+    assert Recorder(recording, []).step == 8
+
+    replayed = build_scheduler(tmp_path / "replayed", replay_path=recording)
+    replayed.start()
+    source = replayed.processes["source"]
+    assert source.steps == 0 and not source.daemon_started
+    assert replayed.replayer.steps == 6
+    for name in ["nums", "latest", "doubled"]:
+        assert list(replayed.objects[name]) == list(recorded.objects[name])
+    assert replayed.objects["latest"]["value"] == recorded.objects["latest"]["value"]
+
+
+def test_record_after_truncated_frame(tmp_path):
+    recording = tmp_path / "recording"
+    recorded = build_scheduler(tmp_path / "recorded", record_path=recording)
+    for _ in range(2):
+        recorded.step()
+    recorded.recorder.close()
+    # A crash in the middle of writing a frame
+    path = recording / "source.changes"
+    frame = pickle.dumps((2, {"latest": [("set", "value", "x" * 100)]}))
+    path.write_bytes(path.read_bytes() + frame[:len(frame) // 2])
+
+    recorder = Recorder(recording, ["source"])
+    assert recorder.step == 2
+    recorder._files["source"].write(pickle.dumps((2, {"nums": [("clear",)]})))
+    recorder.close()
+    assert list(read_frames(path))[-1] == (2, {"nums": [("clear",)]})
@@ -0,0 +1,540 @@
+import time
+import pytest
+from lazydag.contrib.objects import FSListObject
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.process import Process
+from lazydag.core.scheduler import Scheduler
+from lazydag.core.trigger import TriggerPolicy
+
+
+class CountProcess(Process):
+    inputs = []
+    outputs = ["output_nums"]
+
+    def poll(self, output_nums):
+        output_nums.push(len(output_nums))
+
+
+class MapProcess(Process):
+    inputs = ["input_nums"]
+    outputs = ["output_nums"]
+
+    def poll(self, input_nums, output_nums):
+        for change in input_nums.iter_changes(self.name):
+            if change[0] == "clear":
+                output_nums.clear()
+            elif change[0] == "insert":
+                output_nums.insert(change[1], change[2] * 2)
+        input_nums.ack(self.name)
+
+
+class SumProcess(Process):
+    inputs = ["left", "right"]
+    outputs = ["output_nums"]
+
+    def poll(self, left, right, output_nums):
+        output_nums.clear()
+        for a, b in zip(left, right):
+            output_nums.push(a + b)
+
+
+def build_scheduler(tmp_path, **kwargs):
+    # count -> m0 -> m1 -> m2 -> sum, and count -> m3 -> sum
+    pipeline = Pipeline()
+    objects = [FSListObject(name, save_path=tmp_path / name) for name in ["nums", "o0", "o1", "o2", "o3", "total"]]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+    processes = [CountProcess("count"), SumProcess("sum")] + [MapProcess(f"m{i}") for i in range(4)]
+    pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+    pipeline.add_process("m0", inputs={"input_nums": "nums"}, outputs={"output_nums": "o0"})
+    pipeline.add_process("m1", inputs={"input_nums": "o0"}, outputs={"output_nums": "o1"})
+    pipeline.add_process("m2", inputs={"input_nums": "o1"}, outputs={"output_nums": "o2"})
+    pipeline.add_process("m3", inputs={"input_nums": "nums"}, outputs={"output_nums": "o3"})
+    pipeline.add_process("sum", inputs={"left": "o2", "right": "o3"}, outputs={"output_nums": "total"})
+    scheduler = Scheduler(pipeline, processes, objects, **kwargs)
+    for obj in scheduler.objects.values():
+        obj.on_pipeline_start()
+    return scheduler
+
+
+def test_scheduler_step(tmp_path):
+    scheduler = build_scheduler(tmp_path)
+    for _ in range(3):
+        scheduler.step()
+    assert list(scheduler.objects["nums"]) == [0, 1, 2]
+    assert list(scheduler.objects["o2"]) == [0, 8, 16]
+    assert list(scheduler.objects["total"]) == [0, 10, 20]
+
+
+def test_scheduler_fusion(tmp_path):
+    fused = build_scheduler(tmp_path / "fused", fusion=True)
+    assert fused._tasks["m0"] == ["m0", "m1", "m2"]
+    unfused = build_scheduler(tmp_path / "unfused")
+    for _ in range(5):
+        fused.step()
+        unfused.step()
+    for name, obj in fused.objects.items():
+        assert list(obj) == list(unfused.objects[name])
+
+
+class IdleProcess(Process):
+    inputs = []
+    outputs = ["output_dict"]
+
+
+class SquareProcess(Process):
+    inputs = ["input_dict"]
+    outputs = ["output_dict"]
+    partition_by = "input_dict"
+
+    def poll(self, input_dict, output_dict):
+        for key in input_dict.keys():
+            output_dict.set(key, input_dict[key] ** 2)
+
+
+def test_scheduler_partitions(tmp_path):
+    from lazydag.contrib.objects import FSDictObject
+
+    results = []
+    for partitions in [1, 4]:
+        pipeline = Pipeline()
+        objects = [FSDictObject(name, save_path=tmp_path / str(partitions) / name) for name in ["source", "squares"]]
+        for obj in objects:
+            pipeline.add_object(obj.name)
+            obj.on_add_to_pipeline()
+            obj.on_pipeline_start()
+        for i in range(100):
+            objects[0].set(f"key_{i}", i)
+        objects[0].save()
+
+        process = SquareProcess("square")
+        process.partitions = partitions
+        pipeline.add_process("idle", inputs={}, outputs={"output_dict": "source"})
+        pipeline.add_process("square", inputs={"input_dict": "source"}, outputs={"output_dict": "squares"})
+        scheduler = Scheduler(pipeline, [IdleProcess("idle"), process], objects)
+        scheduler.step()
+        results.append(list(scheduler.objects["squares"].items()))
+
+    assert sorted(results[0]) == sorted(results[1])
+    assert len(results[1]) == 100
+
+
+class NewRescanMapProcess(Process):
+    inputs = ["input_nums"]
+    outputs = ["output_nums"]
+
+    def poll(self, input_nums, output_nums):
+        if not input_nums.changed():
+            return
+        output_nums.clear()
+        for num in input_nums:
+            output_nums.push(num + 100)
+
+
+def test_scheduler_reload_processes(tmp_path):
+    scheduler = build_scheduler(tmp_path)
+    for _ in range(2):
+        scheduler.step()
+    assert list(scheduler.objects["total"]) == [0, 10]
+
+    # Unchanged code is not swapped
+    assert scheduler.reload_processes(list(scheduler.processes.values())) == []
+
+    processes = dict(scheduler.processes)
+    processes["m1"] = NewRescanMapProcess("m1")
+    assert scheduler.reload_processes(processes.values()) == ["m1"]
+    assert scheduler.processes["m1"] is processes["m1"]
+    # Outputs downstream of m1 are purged, upstream ones are kept
+    assert list(scheduler.objects["o1"]) == []
+    assert list(scheduler.objects["total"]) == []
+    assert list(scheduler.objects["o0"]) == [0, 2]
+
+    scheduler.step()
+    # m1 recomputed its whole output from o0, and the rest followed
+    assert list(scheduler.objects["o1"]) == [100, 102, 104]
+    assert list(scheduler.objects["o2"]) == [200, 204, 208]
+    assert list(scheduler.objects["total"]) == [200, 206, 212]
+
+
+class ScaleProcess(Process):
+    inputs = ["input_nums"]
+    outputs = ["output_nums"]
+
+    def __init__(self, name, factor):
+        super().__init__(name)
+        self.factor = factor
+
+    def poll(self, input_nums, output_nums):
+        if not input_nums.changed():
+            return
+        output_nums.clear()
+        for num in input_nums:
+            output_nums.push(num * self.factor)
+
+
+def test_scheduler_reload_edited_parameters(tmp_path):
+    pipeline = Pipeline()
+    objects = [FSListObject(name, save_path=tmp_path / name) for name in ["nums", "scaled"]]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+    pipeline.add_process("scale", inputs={"input_nums": "nums"}, outputs={"output_nums": "scaled"})
+    scheduler = Scheduler(pipeline, [CountProcess("count"), ScaleProcess("scale", factor=2)], objects)
+    for _ in range(2):
+        scheduler.step()
+    assert list(scheduler.objects["scaled"]) == [0, 2]
+
+    # Same code and parameters, fresh instances
+    assert scheduler.reload_processes([CountProcess("count"), ScaleProcess("scale", factor=2)]) == []
+
+    new_scale = ScaleProcess("scale", factor=3)
+    assert scheduler.reload_processes([CountProcess("count"), new_scale]) == ["scale"]
+    assert scheduler.processes["scale"] is new_scale
+    scheduler.step()
+    assert list(scheduler.objects["scaled"]) == [0, 3, 6]
+
+
+def test_scheduler_restart_with_memory_consumer_output(tmp_path):
+    from lazydag.contrib.memory import ListObject
+
+    def build():
+        pipeline = Pipeline()
+        nums = FSListObject("nums", save_path=tmp_path / "nums")
+        objects = [nums, ListObject("doubled", rebuild_on_start=True)]
+        for obj in objects:
+            pipeline.add_object(obj.name)
+            obj.on_add_to_pipeline()
+            obj.on_pipeline_start()
+        pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+        pipeline.add_process("double", inputs={"input_nums": "nums"}, outputs={"output_nums": "doubled"})
+        return Scheduler(pipeline, [CountProcess("count"), MapProcess("double")], objects)
+
+    scheduler = build()
+    for _ in range(2):
+        scheduler.step()
+
+    # The feed of nums knows "double", whose output has no saved offsets
+    scheduler = build()
+    scheduler.restore_consumer_offsets()
+    scheduler.rebuild_objects()
+    scheduler.step()
+    assert list(scheduler.objects["doubled"]) == [0, 2, 4]
+
+
+class CountingPolicy(TriggerPolicy):
+    def __init__(self):
+        super().__init__()
+        self.checks = 0
+
+    def due(self, state, now, wall_time):
+        self.checks += 1
+        return super().due(state, now, wall_time)
+
+
+def test_scheduler_checks_trigger_once(tmp_path):
+    scheduler = build_scheduler(tmp_path)
+    policy = scheduler.processes["m3"].trigger = CountingPolicy()
+    for _ in range(3):
+        scheduler.step()
+    assert policy.checks == 3
+    assert list(scheduler.objects["o3"]) == [0, 2, 4]
+
+
+def test_scheduler_restores_consumer_offsets(tmp_path):
+    scheduler = build_scheduler(tmp_path)
+    scheduler.step()
+    # Stopped after saving the outputs of m0 but before the offsets of nums
+    scheduler.objects["nums"]._feed.flush = lambda: None
+    scheduler.step()
+    assert list(scheduler.objects["o0"]) == [0, 2]
+
+    scheduler = build_scheduler(tmp_path)
+    scheduler.restore_consumer_offsets()
+    scheduler.step()
+    # m0 doesn't apply the changes of the second step again
+    assert list(scheduler.objects["o0"]) == [0, 2, 4]
+
+
+def test_scheduler_memory_budget_on_load(tmp_path):
+    scheduler = build_scheduler(tmp_path, memory_budget=1 << 30)
+    for _ in range(3):
+        scheduler.step()
+    for obj in scheduler.objects.values():
+        obj.preload()
+    assert scheduler.objects["o0"].memory_footprint() > 0
+
+    # Loading an object makes room for it by spilling the others
+    scheduler.memory_budget = 1
+    nums = scheduler.objects["nums"]
+    nums.spill()
+    nums.preload()
+    assert nums.memory_footprint() > 0
+    assert scheduler.objects["o0"].memory_footprint() == 0
+    assert list(scheduler.objects["o0"]) == [0, 2, 4]
+
+
+class BrokenMapProcess(MapProcess):
+    outputs = ["output_nums", "extra"]
+
+
+class CpuMapProcess(MapProcess):
+    resource_class = "cpu"
+
+
+def test_scheduler_reload_rejects_and_replans(tmp_path):
+    scheduler = build_scheduler(tmp_path, fusion=True)
+    scheduler.step()
+    old_m1 = scheduler.processes["m1"]
+
+    # A process that doesn't fit the pipeline is rejected, the old one keeps running
+    processes = dict(scheduler.processes)
+    processes["m1"] = BrokenMapProcess("m1")
+    assert scheduler.reload_processes(processes.values()) == []
+    assert scheduler.processes["m1"] is old_m1
+    assert list(scheduler.objects["o1"]) == [0]
+
+    # Moving m1 to another resource class splits the fused chain
+    assert scheduler._tasks["m0"] == ["m0", "m1", "m2"]
+    processes["m1"] = CpuMapProcess("m1")
+    assert scheduler.reload_processes(processes.values()) == ["m1"]
+    assert scheduler._tasks["m1"] == ["m1"]
+    assert "cpu" in scheduler.pools
+    scheduler.step()
+    assert list(scheduler.objects["o2"]) == [0, 8]
+
+
+PIPELINE_MODULE = """
+from lazydag.core.process import Process
+
+class SourceProcess(Process):
+    inputs = []
+    outputs = ["output_nums"]
+
+    def poll(self, output_nums):
+        output_nums.push({value})
+
+processes = [SourceProcess("source")]
+"""
+
+
+def test_module_reloader_swaps_edited_process(tmp_path, monkeypatch):
+    import importlib
+    import os
+    import sys
+    from lazydag.core.reloader import ModuleReloader
+
+    module_path = tmp_path / "reload_pipeline.py"
+    module_path.write_text(PIPELINE_MODULE.format(value=1))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = importlib.import_module("reload_pipeline")
+    try:
+        reloader = ModuleReloader("reload_pipeline", tmp_path)
+        assert reloader.check() is None
+
+        pipeline = Pipeline()
+        nums = FSListObject("nums", save_path=tmp_path / "nums")
+        pipeline.add_object(nums.name)
+        nums.on_add_to_pipeline()
+        pipeline.add_process("source", inputs={}, outputs={"output_nums": "nums"})
+        scheduler = Scheduler(pipeline, module.processes, [nums])
+        nums.on_pipeline_start()
+        scheduler.step()
+        assert list(nums) == [1]
+
+        module_path.write_text(PIPELINE_MODULE.format(value=2))
+        # Bytecode caches are keyed by mtime in seconds
+        mtime = module_path.stat().st_mtime_ns + 10**10
+        os.utime(module_path, ns=(mtime, mtime))
+        processes = reloader.check()
+        assert processes is not None
+        assert scheduler.reload_processes(processes) == ["source"]
+        assert scheduler.processes["source"] is processes[0]
+
+        # The output of the reloaded source was purged
+        scheduler.step()
+        assert list(nums) == [2]
+    finally:
+        sys.modules.pop("reload_pipeline", None)
+
+
+class SlowCountProcess(CountProcess):
+    def poll(self, output_nums):
+        time.sleep(0.05)
+        super().poll(output_nums)
+
+
+class LookupProcess(Process):
+    inputs = ["table", "input_nums"]
+    outputs = ["output_nums"]
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.steps = 0
+
+    def prefetch(self, table, input_nums, output_nums):
+        return {"table": [f"key_{self.steps}"]}
+
+    def poll(self, table, input_nums, output_nums):
+        output_nums.push(table.get(f"key_{self.steps}"))
+        self.steps += 1
+
+
+def test_scheduler_prefetch(tmp_path):
+    from lazydag.contrib.objects import FSJsonDictObject
+
+    pipeline = Pipeline()
+    table = FSJsonDictObject("table", save_path=tmp_path / "table")
+    objects = [table] + [FSListObject(name, save_path=tmp_path / name) for name in ["nums", "found"]]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    for i in range(10):
+        table.set(f"key_{i}", i * i)
+    table.save()
+
+    pipeline.add_process("idle", inputs={}, outputs={"output_dict": "table"})
+    pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+    pipeline.add_process("lookup", inputs={"table": "table", "input_nums": "nums"}, outputs={"output_nums": "found"})
+    scheduler = Scheduler(pipeline, [IdleProcess("idle"), SlowCountProcess("count"), LookupProcess("lookup")], objects)
+    for _ in range(3):
+        scheduler.step()
+
+    assert list(scheduler.objects["found"]) == [0, 1, 4]
+    # The table was read while count was still running
+    assert scheduler.prefetch_report() == [("table", {"prefetched": 3, "hits": 3, "misses": 0, "wasted": 0})]
+
+
+class RecordingProcess(Process):
+    inputs = ["trigger", "side"]
+    outputs = []
+    side_inputs = ["side"]
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.polls = []
+
+    def poll(self, trigger, side):
+        self.polls.append((trigger.changed(), side.changed()))
+
+
+def test_scheduler_trigger_policies(tmp_path):
+    from lazydag.contrib.objects import FSDictObject
+    from lazydag.core.trigger import TriggerPolicy
+
+    pipeline = Pipeline()
+    objects = [FSListObject("nums", save_path=tmp_path / "nums"), FSDictObject("still", save_path=tmp_path / "still")]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+    pipeline.add_process("idle", inputs={}, outputs={"output_dict": "still"})
+    pipeline.add_process("side", inputs={"trigger": "still", "side": "nums"}, outputs={})
+    pipeline.add_process("batched", inputs={"trigger": "nums", "side": "still"}, outputs={})
+    side = RecordingProcess("side")
+    batched = RecordingProcess("batched")
+    batched.trigger = TriggerPolicy(batch_size=3)
+    scheduler = Scheduler(pipeline, [CountProcess("count"), IdleProcess("idle"), side, batched], objects)
+
+    for _ in range(6):
+        scheduler.step()
+    # Changes to side inputs alone never trigger a poll
+    assert side.polls == []
+    # One change per step, polled every third step
+    assert batched.polls == [(True, False), (True, False)]
+
+    scheduler.objects["still"].set("key", 1)
+    scheduler.step()
+    # The side input changed in earlier steps, which the process gets to know
+    assert side.polls == [(True, True)]
+    assert batched.polls == [(True, False), (True, False)]
+    scheduler.step()
+    scheduler.step()
+    assert batched.polls[-1] == (True, True)
+    assert list(scheduler.objects["nums"]) == list(range(9))
+
+
+def test_scheduler_rebuild_objects(tmp_path):
+    from lazydag.contrib.memory import ListObject
+
+    pipeline = Pipeline()
+    objects = [
+        FSListObject("nums", save_path=tmp_path / "nums"),
+        ListObject("doubled", rebuild_on_start=True),
+        FSListObject("quadrupled", save_path=tmp_path / "quadrupled"),
+    ]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+    pipeline.add_process("m0", inputs={"input_nums": "nums"}, outputs={"output_nums": "doubled"})
+    pipeline.add_process("m1", inputs={"input_nums": "doubled"}, outputs={"output_nums": "quadrupled"})
+    scheduler = Scheduler(pipeline, [CountProcess("count"), MapProcess("m0"), MapProcess("m1")], objects)
+    for _ in range(3):
+        scheduler.step()
+    assert list(scheduler.objects["quadrupled"]) == [0, 4, 8]
+
+    # Restart: the in-memory object starts empty and its producer recomputes it
+    for obj in objects:
+        obj.on_pipeline_start()
+    assert list(scheduler.objects["doubled"]) == []
+    scheduler.rebuild_objects()
+    scheduler.step()
+    assert list(scheduler.objects["nums"]) == [0, 1, 2, 3]
+    assert list(scheduler.objects["doubled"]) == [0, 2, 4, 6]
+    assert list(scheduler.objects["quadrupled"]) == [0, 4, 8, 12]
+
+
+class SleepProcess(CountProcess):
+    def poll(self, output_nums):
+        time.sleep(0.1)
+        super().poll(output_nums)
+
+
+class IOSleepProcess(SleepProcess):
+    resource_class = "io"
+
+
+class IOMapProcess(MapProcess):
+    resource_class = "io"
+
+
+def test_scheduler_resource_classes(tmp_path):
+    pipeline = Pipeline()
+    objects = [FSListObject(name, save_path=tmp_path / name) for name in ["a", "b", "c", "d", "e"]]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+        obj.on_pipeline_start()
+    pipeline.add_process("cpu", inputs={}, outputs={"output_nums": "a"})
+    pipeline.add_process("io0", inputs={}, outputs={"output_nums": "b"})
+    pipeline.add_process("io1", inputs={}, outputs={"output_nums": "c"})
+    pipeline.add_process("m0", inputs={"input_nums": "a"}, outputs={"output_nums": "d"})
+    pipeline.add_process("m1", inputs={"input_nums": "d"}, outputs={"output_nums": "e"})
+    processes = [SleepProcess("cpu"), IOSleepProcess("io0"), IOSleepProcess("io1"), MapProcess("m0"), IOMapProcess("m1")]
+
+    with pytest.raises(ValueError):
+        Scheduler(pipeline, processes, objects, resource_classes={"io": 0})
+
+    scheduler = Scheduler(pipeline, processes, objects, parallelization=1, resource_classes={"io": 2}, fusion=True)
+    # Chains are only fused within a class
+    assert scheduler._tasks["cpu"] == ["cpu", "m0"]
+    assert scheduler._tasks["m1"] == ["m1"]
+    start = time.perf_counter()
+    scheduler.step()
+    # The I/O waits didn't take the only default worker
+    assert time.perf_counter() - start < 0.25
+    assert list(scheduler.objects["e"]) == [0]
+    report = dict(scheduler.resource_report())
+    assert report["io"]["runs"] == 3 and report["default"]["runs"] == 1
+
+    # A poll heavier than the free capacity waits for it
+    processes[1].resource_weight = 2
+    scheduler.step()
+    assert scheduler.pools["io"].max_queue_depth >= 1
+    assert list(scheduler.objects["b"]) == [0, 1]
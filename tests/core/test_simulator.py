@@ -0,0 +1,47 @@
+import json
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.simulator import Simulator, load_trace
+
+def _make_pipeline(spec):
+    pipeline = Pipeline()
+    for _, _, outputs in spec:
+        for obj in outputs:
+            pipeline.add_object(obj)
+    for name, inputs, outputs in spec:
+        pipeline.add_process(
+            name,
+            inputs={f"in_{i}": obj for i, obj in enumerate(inputs)},
+            outputs={f"out_{i}": obj for i, obj in enumerate(outputs)},
+        )
+    return pipeline
+
+def test_load_trace(tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+    with open(trace_path, "w") as f:
+        f.write(json.dumps({"time": 0, "polls": {"a": 1.0}, "saves": {"o": 0.5}}) + "\n")
+        f.write(json.dumps({"time": 1, "polls": {"a": 3.0, "b": 1.0}, "saves": {"o": 0.5}}) + "\n")
+    assert load_trace(trace_path) == ({"a": 2.0, "b": 1.0}, {"o": 0.5})
+    assert load_trace(trace_path, "max")[0] == {"a": 3.0, "b": 1.0}
+
+def test_simulator():
+    # a feeds a long chain and a few short independent processes
+    pipeline = _make_pipeline([
+        ("a", [], ["o_a"]),
+        ("long_0", ["o_a"], ["o_long_0"]),
+        ("long_1", ["o_long_0"], ["o_long_1"]),
+        ("short_0", ["o_a"], ["o_short_0"]),
+        ("short_1", ["o_a"], ["o_short_1"]),
+        ("sink", ["o_long_1", "o_short_0", "o_short_1"], []),
+    ])
+    polls = {"a": 1, "long_0": 2, "long_1": 2, "short_0": 3, "short_1": 3, "sink": 1}
+    simulator = Simulator(pipeline, polls, {"o_a": 0.5})
+
+    assert simulator.critical_path() == (6, ["a", "long_0", "long_1", "sink"])
+    assert simulator.run(1).poll_time == 12
+    assert simulator.run(1).makespan == 12.5
+    assert simulator.run(100).poll_time == 6
+    assert simulator.run(1).utilization == 1
+
+    # With two workers, the chain has to start first to finish on time
+    assert simulator.run(2, "critical-path").poll_time == 7
+    assert simulator.run(2, "longest-first").poll_time == 9
@@ -0,0 +1,92 @@
+import pytest
+
+from lazydag.contrib.memory import DictObject
+from lazydag.contrib.objects import FSListObject
+from lazydag.core.pipeline import Pipeline
+from lazydag.core.process import Process
+from lazydag.core.scheduler import Scheduler
+from lazydag.core.sweep import Sweep
+
+
+class CountProcess(Process):
+    inputs = []
+    outputs = ["output_nums"]
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.polls = 0
+
+    def poll(self, output_nums):
+        self.polls += 1
+        output_nums.push(len(output_nums))
+
+
+class ScaleProcess(Process):
+    inputs = ["input_nums"]
+    outputs = ["output_nums"]
+    factor = 1
+    offset = 0
+
+    def poll(self, input_nums, output_nums):
+        for change in input_nums.iter_changes(self.name):
+            if change[0] == "insert":
+                output_nums.insert(change[1], change[2] * self.factor + self.offset)
+        input_nums.ack(self.name)
+
+
+class LastProcess(Process):
+    inputs = ["input_nums"]
+    outputs = ["last"]
+
+    def poll(self, input_nums, last):
+        last.set("value", input_nums[len(input_nums) - 1])
+
+
+def build(tmp_path):
+    # count -> scale -> last, and count -> shared
+    pipeline = Pipeline()
+    objects = [FSListObject(name, save_path=tmp_path / name) for name in ["nums", "scaled", "other"]] + [DictObject("last")]
+    for obj in objects:
+        pipeline.add_object(obj.name)
+        obj.on_add_to_pipeline()
+    pipeline.add_process("count", inputs={}, outputs={"output_nums": "nums"})
+    pipeline.add_process("scale", inputs={"input_nums": "nums"}, outputs={"output_nums": "scaled"})
+    pipeline.add_process("last", inputs={"input_nums": "scaled"}, outputs={"last": "last"})
+    pipeline.add_process("shared", inputs={"input_nums": "nums"}, outputs={"output_nums": "other"})
+    processes = [CountProcess("count"), ScaleProcess("scale"), LastProcess("last"), ScaleProcess("shared")]
+    return pipeline, processes, objects
+
+
+def test_sweep(tmp_path):
+    sweep = Sweep({"scale": {"factor": [2, 3], "offset": [0, 100]}})
+    assert sweep.variants[1] == {"scale": {"factor": 2, "offset": 100}}
+
+    pipeline, processes, objects = sweep.expand(*build(tmp_path))
+    assert sorted(pipeline.processes) == ["count", "last@0", "last@1", "last@2", "last@3",
+                                          "scale@0", "scale@1", "scale@2", "scale@3", "shared"]
+    assert sorted(pipeline.objects) == ["last@0", "last@1", "last@2", "last@3", "nums", "other",
+                                        "scaled@0", "scaled@1", "scaled@2", "scaled@3"]
+    assert pipeline.process_inputs("scale@2") == {"input_nums": "nums"}
+    assert pipeline.process_outputs("last@2") == {"last": "last@2"}
+
+    scheduler = Scheduler(pipeline, processes, objects)
+    for obj in scheduler.objects.values():
+        obj.on_pipeline_start()
+    for _ in range(3):
+        scheduler.step()
+    # The upstream runs once for all the variants
+    assert scheduler.processes["count"].polls == 3
+    assert list(scheduler.objects["other"]) == [0, 1, 2]
+    assert list(scheduler.objects["scaled@0"]) == [0, 2, 4]
+    assert list(scheduler.objects["scaled@3"]) == [100, 103, 106]
+    assert (tmp_path / "scaled@3").is_dir()
+    assert [scheduler.objects[f"last@{i}"]["value"] for i in range(4)] == [4, 104, 6, 106]
+
+
+def test_sweep_validation(tmp_path):
+    with pytest.raises(ValueError):
+        Sweep({"scale": {"factor": []}})
+    with pytest.raises(ValueError):
+        Sweep({"missing": {"factor": [1]}}).expand(*build(tmp_path))
+    with pytest.raises(ValueError):
+        Sweep({"scale": {"typo": [1]}}).expand(*build(tmp_path / "typo"))
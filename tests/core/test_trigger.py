@@ -0,0 +1,49 @@
+from datetime import datetime
+import pytest
+from lazydag.core.trigger import CronSchedule, TriggerPolicy, TriggerState
+
+def _ts(*args):
+    return datetime(*args).timestamp()
+
+def test_cron_schedule():
+    every_15 = CronSchedule("*/15 * * * *")
+    assert every_15.next_after(_ts(2024, 1, 1, 10, 7)) == _ts(2024, 1, 1, 10, 15)
+    assert every_15.next_after(_ts(2024, 1, 1, 10, 15)) == _ts(2024, 1, 1, 10, 30)
+
+    # 2024-01-01 is a Monday, Sunday is both 0 and 7
+    sundays = CronSchedule("30 2 * * 0")
+    assert sundays.next_after(_ts(2024, 1, 1)) == _ts(2024, 1, 7, 2, 30)
+    assert CronSchedule("30 2 * * 7").next_after(_ts(2024, 1, 1)) == _ts(2024, 1, 7, 2, 30)
+    # Restricted days of month and of week match either
+    assert CronSchedule("0 0 15 * 5").next_after(_ts(2024, 1, 1)) == _ts(2024, 1, 5)
+    assert CronSchedule("0 9-17/4 1 3,6 *").next_after(_ts(2024, 1, 1)) == _ts(2024, 3, 1, 9)
+
+    for expression in ["* * * *", "60 * * * *", "5-1 * * * *"]:
+        with pytest.raises(ValueError):
+            CronSchedule(expression)
+
+def test_trigger_policy():
+    state = TriggerState(wall_time=0)
+    policy = TriggerPolicy(batch_size=3, debounce=1, max_delay=10)
+    assert not policy.due(state, now=0, wall_time=0)
+    state.record(now=0, changes=2)
+    state.record(now=1, changes=2)
+    # Enough changes, but the last ones are too recent
+    assert not policy.due(state, now=1.5, wall_time=1.5)
+    assert policy.due(state, now=2, wall_time=2)
+
+    state.reset(now=2, wall_time=2)
+    state.record(now=3, changes=1)
+    assert not policy.due(state, now=5, wall_time=5)
+    # Batches never wait longer than max_delay
+    assert policy.due(state, now=13, wall_time=13)
+
+    state = TriggerState(wall_time=_ts(2024, 1, 1, 10, 7))
+    state.record(now=0, changes=1)
+    hourly = TriggerPolicy(cron="0 * * * *", min_interval=5)
+    assert not hourly.due(state, now=0, wall_time=_ts(2024, 1, 1, 10, 59))
+    assert hourly.due(state, now=0, wall_time=_ts(2024, 1, 1, 11, 0))
+    state.reset(now=0, wall_time=_ts(2024, 1, 1, 11, 0))
+    state.record(now=1, changes=1)
+    assert not hourly.due(state, now=1, wall_time=_ts(2024, 1, 1, 12, 0))
+    assert hourly.due(state, now=5, wall_time=_ts(2024, 1, 1, 12, 0))